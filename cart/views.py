@@ -235,6 +235,9 @@ def reserve_stock_for_checkout(request):
     reservations_created = []
     errors = []
     
+    # Available stock for the whole cart in one query
+    available_stock = StockReservation.available_stock_for(item.product for item in cart_items)
+    
     for item in cart_items:
         product = item.product
         
@@ -244,7 +247,7 @@ def reserve_stock_for_checkout(request):
             continue
         
         # Check available stock (accounting for existing reservations)
-        available = StockReservation.get_available_stock(product)
+        available = available_stock.get(product.id, 0)
         
         if item.quantity > available:
             errors.append(
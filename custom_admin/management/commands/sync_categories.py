@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from home.categories import invalidate_category_nav
 from home.models import Category
 import os
 from django.conf import settings
@@ -50,10 +51,13 @@ class Command(BaseCommand):
                     }
                 )
                 
+                if not category.slug:
+                    category.save(update_fields=['slug'])
+
                 if created:
                     created_count += 1
                     self.stdout.write(
-                        self.style.SUCCESS(f'Created category: {category_name}')
+                        self.style.SUCCESS(f'Created category: {category_name} (/{category.slug}/)')
                     )
                 else:
                     updated_count += 1
@@ -61,6 +65,8 @@ class Command(BaseCommand):
                         self.style.WARNING(f'Category already exists: {category_name}')
                     )
 
+        invalidate_category_nav()
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'Sync complete! Created: {created_count}, Existing: {updated_count}'
@@ -70,4 +76,4 @@ class Command(BaseCommand):
         # List all categories
         self.stdout.write('\nAll categories:')
         for cat in Category.objects.all():
-            self.stdout.write(f'  - {cat.name} (ID: {cat.id})')
\ No newline at end of file
+            self.stdout.write(f'  - {cat.name} (ID: {cat.id}, slug: {cat.slug})')
\ No newline at end of file
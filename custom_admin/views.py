@@ -2,10 +2,12 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from django.core.paginator import Paginator
-from home.models import Order, Product, Category, Sale, Checkout
+from home.models import DailySalesRollup, Order, Product, Category, Sale, Checkout
+from home.services import SalesRollupService
 from payment.models import Payment
 from cart.models import Cart
 from home.forms import ProductForm
@@ -55,7 +57,6 @@ def sales_reports(request):
     Uses total_price instead of total_amount to prevent FieldError.
     """
     from datetime import datetime, timedelta
-    from django.db.models.functions import TruncDate
     import json
     
     # Get filter parameters
@@ -80,19 +81,22 @@ def sales_reports(request):
         
         sales = sales.order_by('-sale_date')
 
-        # ✅ FIXED: Use total_amount for Sale model
-        total_sales = sales.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-        sales_count = sales.count()
+        # Figures and charts are summed from the daily rollups
+        rollups = SalesRollupService.queryset(
+            timezone.localdate(start_date), statuses=[DailySalesRollup.SALE_STATUS]
+        )
+        if category_filter:
+            rollups = rollups.filter(category_id=category_filter)
+
+        totals = rollups.aggregate(total=Sum('revenue'), count=Sum('order_count'))
+        total_sales = totals['total'] or 0
+        sales_count = totals['count'] or 0
         average_sale = (total_sales / sales_count) if sales_count > 0 else 0
 
         # Get sales trend data
-        start_date = end_date - timedelta(days=date_range)
-        
-        daily_sales = sales.filter(sale_date__gte=start_date).annotate(
-            date=TruncDate('sale_date')
-        ).values('date').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
+        daily_sales = rollups.values('date').annotate(
+            total=Sum('revenue'),
+            count=Sum('order_count')
         ).order_by('date')
         
         # Prepare chart data
@@ -100,12 +104,12 @@ def sales_reports(request):
         chart_data = [float(item['total']) for item in daily_sales]
         
         # Get category distribution
-        category_sales = sales.values('product__category__name').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
+        category_sales = rollups.values('category__name').annotate(
+            total=Sum('revenue'),
+            count=Sum('order_count')
         ).order_by('-total')[:5]
         
-        category_labels = [item['product__category__name'] or 'Uncategorized' for item in category_sales]
+        category_labels = [item['category__name'] or 'Uncategorized' for item in category_sales]
         category_data = [float(item['total']) for item in category_sales]
 
         context = {
@@ -138,18 +142,22 @@ def sales_reports(request):
         
         orders = orders.order_by('-created_at')
         
-        total_sales = orders.aggregate(Sum('total_price'))['total_price__sum'] or 0
-        orders_count = orders.count()
+        rollups = SalesRollupService.queryset(
+            timezone.localdate(start_date),
+            statuses=[status_filter] if status_filter else SalesRollupService.order_statuses(),
+        )
+        if category_filter:
+            rollups = rollups.filter(category_id=category_filter)
+        
+        totals = rollups.aggregate(total=Sum('revenue'), count=Sum('order_count'))
+        total_sales = totals['total'] or 0
+        orders_count = totals['count'] or 0
         average_order = (total_sales / orders_count) if orders_count > 0 else 0
         
         # Get sales trend data
-        start_date = end_date - timedelta(days=date_range)
-        
-        daily_sales = orders.filter(created_at__gte=start_date).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            total=Sum('total_price'),
-            count=Count('id')
+        daily_sales = rollups.values('date').annotate(
+            total=Sum('revenue'),
+            count=Sum('order_count')
         ).order_by('date')
         
         # Prepare chart data
@@ -157,12 +165,12 @@ def sales_reports(request):
         chart_data = [float(item['total']) for item in daily_sales]
         
         # Get category distribution
-        category_sales = orders.values('product__category__name').annotate(
-            total=Sum('total_price'),
-            count=Count('id')
+        category_sales = rollups.values('category__name').annotate(
+            total=Sum('revenue'),
+            count=Sum('order_count')
         ).order_by('-total')[:5]
         
-        category_labels = [item['product__category__name'] or 'Uncategorized' for item in category_sales]
+        category_labels = [item['category__name'] or 'Uncategorized' for item in category_sales]
         category_data = [float(item['total']) for item in category_sales]
 
         context = {
@@ -465,15 +473,22 @@ def analytics_dashboard(request):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=30)
     
-    # Order statistics
-    total_orders = Order.objects.count()
-    recent_orders = Order.objects.filter(created_at__gte=start_date).count()
-    pending_orders = Order.objects.filter(status='pending').count()
-    completed_orders = Order.objects.filter(status='delivered').count()
-    
-    # Revenue statistics
-    total_revenue = Order.objects.aggregate(Sum('total_price'))['total_price__sum'] or 0
-    recent_revenue = Order.objects.filter(created_at__gte=start_date).aggregate(Sum('total_price'))['total_price__sum'] or 0
+    # Order and revenue statistics, in one pass over the daily rollups
+    recent = Q(date__gte=timezone.localdate(start_date))
+    order_stats = SalesRollupService.queryset(statuses=SalesRollupService.order_statuses()).aggregate(
+        total_orders=Sum('order_count'),
+        recent_orders=Sum('order_count', filter=recent),
+        pending_orders=Sum('order_count', filter=Q(status='pending')),
+        completed_orders=Sum('order_count', filter=Q(status='delivered')),
+        total_revenue=Sum('revenue'),
+        recent_revenue=Sum('revenue', filter=recent),
+    )
+    total_orders = order_stats['total_orders'] or 0
+    recent_orders = order_stats['recent_orders'] or 0
+    pending_orders = order_stats['pending_orders'] or 0
+    completed_orders = order_stats['completed_orders'] or 0
+    total_revenue = order_stats['total_revenue'] or 0
+    recent_revenue = order_stats['recent_revenue'] or 0
     
     # Product statistics
     total_products = Product.objects.count()
@@ -486,7 +501,10 @@ def analytics_dashboard(request):
     
     # Top selling products
     top_products = Product.objects.annotate(
-        total_sold=Sum('orders__quantity')
+        total_sold=Sum(
+            'sales_rollups__units',
+            filter=Q(sales_rollups__status__in=SalesRollupService.order_statuses())
+        )
     ).filter(total_sold__gt=0).order_by('-total_sold')[:5]
     
     context = {
@@ -534,11 +552,14 @@ def manage_payments(request):
             Q(phone_number__icontains=search_query)
         )
     
-    # Get counts for each status
-    pending_count = Payment.objects.filter(status='pending').count()
-    processing_count = Payment.objects.filter(status='processing').count()
-    completed_count = Payment.objects.filter(status='completed').count()
-    failed_count = Payment.objects.filter(status='failed').count()
+    # Get counts for each status in one GROUP BY
+    status_counts = dict(
+        Payment.objects.order_by().values('status').annotate(count=Count('id')).values_list('status', 'count')
+    )
+    pending_count = status_counts.get('pending', 0)
+    processing_count = status_counts.get('processing', 0)
+    completed_count = status_counts.get('completed', 0)
+    failed_count = status_counts.get('failed', 0)
     
     # Pagination
     paginator = Paginator(payments, 20)
@@ -617,14 +638,16 @@ def approve_payment(request, payment_id):
     payment.mark_as_completed()
     
     if checkout:
-        checkout.payment_status = 'completed'
-        checkout.save()
-        
-        # Update related orders to processing (only if not already delivered)
-        Order.objects.filter(checkout=checkout, status='pending').update(
-            status='processing',
-            updated_at=timezone.now()
-        )
+        with transaction.atomic():
+            checkout.payment_status = 'completed'
+            checkout.save()
+            
+            # Update related orders to processing (only if not already delivered)
+            SalesRollupService.move_status(
+                Order.objects.filter(checkout=checkout, status='pending'),
+                'processing',
+                updated_at=timezone.now()
+            )
     
     messages.success(request, f'Payment {payment.reference} has been approved and marked as completed!')
     return redirect('custom_admin:payment_detail', payment_id=payment_id)
@@ -653,14 +676,16 @@ def reject_payment(request, payment_id):
         ).first()
         
         if checkout:
-            checkout.payment_status = 'failed'
-            checkout.save()
-            
-            # Update related orders to cancelled
-            Order.objects.filter(checkout=checkout, status='pending').update(
-                status='cancelled',
-                updated_at=timezone.now()
-            )
+            with transaction.atomic():
+                checkout.payment_status = 'failed'
+                checkout.save()
+                
+                # Update related orders to cancelled
+                SalesRollupService.move_status(
+                    Order.objects.filter(checkout=checkout, status='pending'),
+                    'cancelled',
+                    updated_at=timezone.now()
+                )
         
         messages.warning(request, f'Payment {payment.reference} has been rejected!')
         return redirect('custom_admin:payment_detail', payment_id=payment_id)
@@ -1015,6 +1040,15 @@ def process_refund(request, refund_id):
             refund.approve_refund(request.user)
             refund.complete_refund()
             
+            # Return the refunded items to stock
+            refund.order.product.increase_stock(
+                refund.order.quantity,
+                reason=f'Refund for order #{refund.order.id}',
+                changed_by=request.user,
+                change_type='return',
+                order=refund.order
+            )
+            
             # Update payment status
             refund.payment.status = 'cancelled'
             refund.payment.save()
@@ -1053,11 +1087,14 @@ def manage_refunds(request):
     page_number = request.GET.get('page')
     refunds = paginator.get_page(page_number)
     
-    # Get counts
-    pending_count = Refund.objects.filter(status='pending').count()
-    approved_count = Refund.objects.filter(status='approved').count()
-    completed_count = Refund.objects.filter(status='completed').count()
-    rejected_count = Refund.objects.filter(status='rejected').count()
+    # Get counts in one GROUP BY
+    status_counts = dict(
+        Refund.objects.order_by().values('status').annotate(count=Count('id')).values_list('status', 'count')
+    )
+    pending_count = status_counts.get('pending', 0)
+    approved_count = status_counts.get('approved', 0)
+    completed_count = status_counts.get('completed', 0)
+    rejected_count = status_counts.get('rejected', 0)
     
     context = {
         'refunds': refunds,
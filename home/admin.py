@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as DefaultUserAdmin
-from .models import Product, Category, Checkout, Profile, Order, Sale, StockHistory, StockReservation, Store
+from django.db import transaction
+from . import stock_ledger
+from .suggest import mark_catalog_changed
+from .models import Product, Category, Checkout, Profile, Order, Sale, StockHistory, StockHistoryDaily, StockReservation, Store
 
 # Unregister the default UserAdmin
 User = get_user_model()
@@ -68,18 +71,24 @@ class ProductAdmin(admin.ModelAdmin):
 
     def mark_as_sold(self, request, queryset):
         updated = queryset.update(status='sold', stock=0)
+        # QuerySet.update() skips the save signals
+        mark_catalog_changed()
         self.message_user(request, f"{updated} product(s) marked as sold and stock set to 0.")
     mark_as_sold.short_description = "Mark selected products as sold and clear stock"
 
     def mark_as_active(self, request, queryset):
         updated = queryset.update(status='active')
+        # QuerySet.update() skips the save signals
+        mark_catalog_changed()
         self.message_user(request, f"{updated} product(s) marked as active.")
     mark_as_active.short_description = "Mark selected products as active"
 
     def reduce_stock(self, request, queryset):
-        for product in queryset:
-            if product.stock > 0:
-                product.reduce_stock(1)
+        # One history INSERT for the whole selection
+        with transaction.atomic(), stock_ledger.batch():
+            for product in queryset:
+                if product.stock > 0:
+                    product.reduce_stock(1)
         self.message_user(request, "Stock reduced by 1 for selected products with available stock.")
     reduce_stock.short_description = "Reduce stock by 1 for selected products"
 
@@ -89,7 +98,7 @@ class ProductAdmin(admin.ModelAdmin):
 # Register Category model
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'icon', 'created_by', 'created_at', 'updated_at', 'product_count']
+    list_display = ['name', 'slug', 'icon', 'created_by', 'created_at', 'updated_at', 'product_count']
     search_fields = ['name', 'description', 'created_by__username']
     list_filter = ['created_at', 'updated_at', 'created_by']
     ordering = ['name']
@@ -97,7 +106,14 @@ class CategoryAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     list_per_page = 20
     autocomplete_fields = ['created_by']
-    fields = ['name', 'description', 'image', 'icon', 'created_by', 'created_at', 'updated_at']
+    fields = ['name', 'slug', 'description', 'image', 'icon', 'created_by', 'created_at', 'updated_at']
+
+    def get_readonly_fields(self, request, obj=None):
+        # Slugs are in published URLs, and pre-0037 slugs would not pass
+        # SlugField validation on re-save
+        if obj is not None:
+            return [*self.readonly_fields, 'slug']
+        return self.readonly_fields
 
     def product_count(self, obj):
         return obj.products.count()
@@ -220,6 +236,26 @@ class StockHistoryAdmin(admin.ModelAdmin):
             'product', 'changed_by', 'order', 'reservation'
         )
 
+# Register StockHistoryDaily model
+@admin.register(StockHistoryDaily)
+class StockHistoryDailyAdmin(admin.ModelAdmin):
+    list_display = ['date', 'product', 'change_type', 'quantity_added', 'quantity_removed', 'change_count']
+    search_fields = ['product__name']
+    list_filter = ['change_type', 'date']
+    ordering = ['-date']
+    date_hierarchy = 'date'
+    list_per_page = 50
+    
+    def has_add_permission(self, request):
+        # Rollups are only written by compact_stock_history
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
 # Register StockReservation model
 @admin.register(StockReservation)
 class StockReservationAdmin(admin.ModelAdmin):
@@ -235,10 +271,34 @@ class StockReservationAdmin(admin.ModelAdmin):
     actions = ['mark_as_expired', 'mark_as_cancelled']
     
     def is_expired_display(self, obj):
-        return obj.is_expired()
+        # Unsaved reservations on the add form have no expiry yet
+        return obj.expires_at is not None and obj.is_expired()
     is_expired_display.short_description = 'Is Expired'
     is_expired_display.boolean = True
     
+    # Product.reserved_stock counts active reservations, so every change to
+    # product, quantity or status goes through the model's release helpers.
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            return [*self.readonly_fields, 'product', 'quantity', 'status']
+        return self.readonly_fields
+    
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not change and obj.status == 'active':
+                StockReservation.adjust_reserved_stock({obj.product_id: obj.quantity})
+    
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            obj.mark_as_cancelled()
+            super().delete_model(request, obj)
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            StockReservation._release_many(queryset.filter(status='active'), 'cancelled')
+            super().delete_queryset(request, queryset)
+    
     def mark_as_expired(self, request, queryset):
         count = 0
         for reservation in queryset:
@@ -0,0 +1,76 @@
+"""
+Cached category navigation.
+
+Category lists, slugs and image URLs are built once and kept in Django's
+cache, so pages that show category navigation or route by category slug do
+not query categories or call the storage backend for image URLs.
+
+The cache entry is dropped by the Category save/delete signals and by the
+sync_categories commands.
+"""
+
+from django.core.cache import cache
+from django.utils.text import slugify
+
+
+CATEGORY_NAV_CACHE_KEY = 'home:category_nav'
+DEFAULT_CATEGORY_ICON = 'fas fa-shopping-bag'
+
+
+def category_slug_for_name(name):
+    """
+    Default URL slug for a new category name.
+
+    Categories that existed before slugs were stored keep the looser slugs
+    migration 0037 derived for their old URLs.
+    """
+    return slugify(name) or 'category'
+
+
+def build_category_nav():
+    """
+    Build the navigation entry for every category.
+
+    Returns:
+        dict: ``categories`` (list of entry dicts ordered by name) and
+        ``by_slug`` (slug -> entry)
+    """
+    from home.models import Category
+
+    categories = []
+    for category in Category.objects.all():
+        categories.append({
+            'name': category.name,
+            'slug': category.slug,
+            'icon': category.icon or DEFAULT_CATEGORY_ICON,
+            'image': category.image.url if category.image else None,
+            'db_id': category.id,
+        })
+    return {
+        'categories': categories,
+        'by_slug': {entry['slug']: entry for entry in categories},
+    }
+
+
+def get_category_nav():
+    """Get the category navigation from the cache, building it on a miss."""
+    nav = cache.get(CATEGORY_NAV_CACHE_KEY)
+    if nav is None:
+        nav = build_category_nav()
+        cache.set(CATEGORY_NAV_CACHE_KEY, nav, None)
+    return nav
+
+
+def get_categories():
+    """Get the navigation entries for all categories, ordered by name."""
+    return get_category_nav()['categories']
+
+
+def get_category_by_slug(slug):
+    """Get the navigation entry for ``slug``, or None."""
+    return get_category_nav()['by_slug'].get(slug)
+
+
+def invalidate_category_nav():
+    """Drop the cached navigation after categories changed."""
+    cache.delete(CATEGORY_NAV_CACHE_KEY)
@@ -0,0 +1,94 @@
+"""
+Validators for conditional GET on product, guide and receipt views.
+
+Each function reads a handful of columns in one query and is passed to
+Django's ``condition`` decorator, which answers ``304 Not Modified`` when the
+client's If-None-Match / If-Modified-Since still match, before the view
+renders a template or builds a PDF.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+
+from home import page_cache
+from home.models import Checkout, PlatformGuide, Product
+from home.receipt_store import RECEIPT_LAYOUT_VERSION
+
+
+def _etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def product_etag(request, id):
+    """
+    Product page validator.
+
+    Covers the product row, its stock and rating columns, the catalog
+    version (categories and reviews shown on the page) and the viewer, since
+    the buttons differ for the seller and for anonymous visitors.
+    """
+    row = Product.objects.filter(pk=id).values_list(
+        'updated_at', 'stock', 'reserved_stock', 'rating_count', 'rating_avg',
+    ).first()
+    if row is None:
+        return None
+    return _etag(*row, page_cache.get_version(page_cache.CATALOG), request.user.pk or 0)
+
+
+def _guide_updated_at(request, slug):
+    # Memoized on the request; condition() asks for both validators
+    if not hasattr(request, '_guide_updated_at'):
+        request._guide_updated_at = PlatformGuide.objects.filter(
+            slug=slug, is_published=True
+        ).values_list('updated_at', flat=True).first()
+    return request._guide_updated_at
+
+
+def guide_last_modified(request, slug):
+    """
+    Guide page Last-Modified, for anonymous visitors only.
+
+    The header shows the signed-in user, which a date cannot capture, so
+    logged-in viewers are validated by the ETag alone.
+    """
+    if request.user.is_authenticated:
+        return None
+    return _guide_updated_at(request, slug)
+
+
+def guide_etag(request, slug):
+    updated_at = _guide_updated_at(request, slug)
+    if updated_at is None:
+        return None
+    # The guides version covers the related-guides list; the viewer covers
+    # the personalized header
+    return _etag(updated_at, page_cache.get_version(page_cache.GUIDES), request.user.pk or 0)
+
+
+def _receipt_state(request, checkout_id):
+    if not request.user.is_authenticated:
+        return None
+    if not hasattr(request, '_receipt_state'):
+        request._receipt_state = Checkout.objects.filter(pk=checkout_id, user=request.user).annotate(
+            order_count=Count('orders'),
+            orders_updated_at=Max('orders__updated_at'),
+        ).values_list(
+            'updated_at', 'orders_updated_at', 'order_count', 'payment_status', 'transaction_id',
+        ).first()
+    return request._receipt_state
+
+
+def receipt_last_modified(request, checkout_id):
+    state = _receipt_state(request, checkout_id)
+    if state is None:
+        return None
+    updated_at, orders_updated_at = state[0], state[1]
+    return max(updated_at, orders_updated_at) if orders_updated_at else updated_at
+
+
+def receipt_etag(request, checkout_id):
+    state = _receipt_state(request, checkout_id)
+    if state is None:
+        return None
+    return _etag(*state, RECEIPT_LAYOUT_VERSION)
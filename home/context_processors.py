@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from home.categories import get_categories
+
+
+def category_navigation(request):
+    """Expose the cached category list to every template as ``nav_categories``."""
+    return {'nav_categories': SimpleLazyObject(get_categories)}
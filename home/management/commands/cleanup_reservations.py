@@ -1,28 +1,107 @@
 """
 Management command to clean up expired stock reservations.
 Run with: python manage.py cleanup_reservations
-Can be scheduled to run periodically (e.g., every 5 minutes via cron)
+Can be scheduled to run periodically (e.g., every 5 minutes via cron),
+or run as a long-lived worker with: python manage.py cleanup_reservations --loop
 """
 
+import logging
+import time
+
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
 from home.models import StockReservation
 
 
+logger = logging.getLogger(__name__)
+
+# Cache key holding the metrics of the most recent sweep
+LAST_SWEEP_CACHE_KEY = 'reservation_reaper_last_sweep'
+
+
 class Command(BaseCommand):
     help = 'Clean up expired stock reservations'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Maximum reservations expired per transaction (default: 500)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and sweep every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Seconds between sweeps in --loop mode (default: 60)'
+        )
+        parser.add_argument(
+            '--rebuild-counters',
+            action='store_true',
+            help='Recompute Product.reserved_stock from active reservations before sweeping'
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write('Cleaning up expired stock reservations...')
-        
-        expired_count = StockReservation.cleanup_expired_reservations()
-        
-        if expired_count > 0:
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Successfully marked {expired_count} reservation(s) as expired'
+        batch_size = options['batch_size']
+
+        if options['rebuild_counters']:
+            updated = StockReservation.rebuild_reserved_stock()
+            self.stdout.write(f'Rebuilt reserved stock counters for {updated} product(s)')
+
+        if not options['loop']:
+            self.stdout.write('Cleaning up expired stock reservations...')
+            metrics = self.sweep(batch_size)
+            if metrics['expired'] > 0:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Successfully marked {metrics['expired']} reservation(s) as expired "
+                        f"in {metrics['batches']} batch(es)"
+                    )
+                )
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS('No expired reservations found')
                 )
-            )
-        else:
-            self.stdout.write(
-                self.style.SUCCESS('No expired reservations found')
-            )
+            return
+
+        self.stdout.write(f"Reaping expired reservations every {options['interval']}s (Ctrl+C to stop)...")
+        try:
+            while True:
+                close_old_connections()
+                metrics = self.sweep(batch_size)
+                if metrics['expired']:
+                    self.stdout.write(
+                        f"[{metrics['finished_at']}] expired {metrics['expired']} reservation(s) "
+                        f"across {metrics['products']} product(s)"
+                    )
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Reservation reaper stopped'))
+
+    def sweep(self, batch_size):
+        """Expire overdue reservations in bounded batches and record metrics."""
+        started = time.monotonic()
+        metrics = {'expired': 0, 'products': 0, 'history_rows': 0, 'batches': 0}
+
+        while True:
+            batch = StockReservation.expire_batch(batch_size)
+            if not batch['expired']:
+                break
+            metrics['batches'] += 1
+            for key in ('expired', 'products', 'history_rows'):
+                metrics[key] += batch[key]
+            if batch['expired'] < batch_size:
+                break
+
+        metrics['duration_ms'] = round((time.monotonic() - started) * 1000, 1)
+        metrics['finished_at'] = timezone.now().isoformat()
+        cache.set(LAST_SWEEP_CACHE_KEY, metrics, None)
+        logger.info('Reservation sweep: %s', metrics)
+        return metrics
@@ -0,0 +1,38 @@
+"""
+Management command to compact old stock history into daily rollups.
+Run with: python manage.py compact_stock_history
+Can be scheduled to run nightly via cron. Rows older than --keep-days are
+summed per product, day and change type into StockHistoryDaily and deleted.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from home.models import StockHistory
+
+
+class Command(BaseCommand):
+    help = 'Compact stock history older than --keep-days into daily per-product rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=90,
+            help='Days of raw stock history to keep (default: 90)'
+        )
+
+    def handle(self, *args, **options):
+        keep_days = options['keep_days']
+        if keep_days < 1:
+            raise CommandError('--keep-days must be at least 1')
+
+        self.stdout.write(f'Compacting stock history older than {keep_days} days...')
+        metrics = StockHistory.compact(keep_days)
+
+        if not metrics['days']:
+            self.stdout.write(self.style.SUCCESS('Nothing to compact.'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Compacted {metrics['rows_compacted']} rows from {metrics['days']} days "
+            f"into {metrics['rollup_rows']} daily rollups."
+        ))
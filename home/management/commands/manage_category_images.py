@@ -11,9 +11,9 @@ class Command(BaseCommand):
         parser.add_argument(
             '--action',
             type=str,
-            choices=['list', 'copy', 'setup'],
+            choices=['list', 'copy', 'setup', 'slugs'],
             default='list',
-            help='Action to perform: list (show current images), copy (copy image to category), setup (create sample images)'
+            help='Action to perform: list (show current images), copy (copy image to category), setup (create sample images), slugs (fill in missing category slugs)'
         )
         parser.add_argument(
             '--category',
@@ -41,6 +41,21 @@ class Command(BaseCommand):
             self.copy_image(static_images_path, options)
         elif options['action'] == 'setup':
             self.setup_sample_images(static_images_path)
+        elif options['action'] == 'slugs':
+            self.fill_slugs()
+
+    def fill_slugs(self):
+        """Generate slugs for categories that have none and list every slug"""
+        from home.categories import invalidate_category_nav
+        from home.models import Category
+
+        for category in Category.objects.all():
+            if not category.slug:
+                category.save(update_fields=['slug'])
+                self.stdout.write(self.style.SUCCESS(f"{category.name:20} -> {category.slug}"))
+            else:
+                self.stdout.write(f"{category.name:20} {category.slug}")
+        invalidate_category_nav()
 
     def list_categories(self, static_images_path):
         """List all categories and their current images"""
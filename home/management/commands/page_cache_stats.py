@@ -0,0 +1,29 @@
+"""
+Management command to show anonymous page cache hit/miss counters.
+Run with: python manage.py page_cache_stats
+Add --reset to zero the counters after printing them.
+"""
+
+from django.core.management.base import BaseCommand
+from home import page_cache
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters for the anonymous page cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after printing them'
+        )
+
+    def handle(self, *args, **options):
+        for namespace, stats in page_cache.get_stats().items():
+            self.stdout.write(
+                f"{namespace:10} hits={stats['hits']} misses={stats['misses']} "
+                f"hit_rate={stats['hit_rate']:.1%} version={stats['version']}"
+            )
+        if options['reset']:
+            page_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
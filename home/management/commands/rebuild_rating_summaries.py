@@ -0,0 +1,38 @@
+"""
+Management command to rebuild the denormalized product rating columns.
+Run with: python manage.py rebuild_rating_summaries
+Use it after bulk review imports or if the counters are suspected to have drifted.
+"""
+
+from django.core.management.base import BaseCommand
+from home.models import Product
+from home.services import ReviewStatsService
+
+
+class Command(BaseCommand):
+    help = 'Recompute Product rating_avg, rating_count and per-star counts from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product',
+            type=int,
+            action='append',
+            help='Only rebuild the given product id (can be repeated)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Products written per bulk update (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.all()
+        if options['product']:
+            queryset = queryset.filter(pk__in=options['product'])
+
+        self.stdout.write('Rebuilding product rating summaries...')
+        rebuilt = ReviewStatsService.rebuild(queryset, batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt rating summaries for {rebuilt} product(s)')
+        )
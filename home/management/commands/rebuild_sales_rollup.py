@@ -0,0 +1,37 @@
+"""
+Management command to rebuild the daily sales rollup table from orders and sales.
+Run with: python manage.py rebuild_sales_rollup
+Use --from/--to to rebuild only part of the history, e.g. after fixing data.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from home.services import SalesRollupService
+
+
+class Command(BaseCommand):
+    help = 'Recompute DailySalesRollup rows from Order and Sale rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from',
+            dest='date_from',
+            help='First day to rebuild, YYYY-MM-DD (default: all history)'
+        )
+        parser.add_argument(
+            '--to',
+            dest='date_to',
+            help='Last day to rebuild, YYYY-MM-DD (default: today)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options['date_from']) if options['date_from'] else None
+            date_to = date.fromisoformat(options['date_to']) if options['date_to'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        self.stdout.write('Rebuilding sales rollups...')
+        written = SalesRollupService.rebuild(date_from, date_to)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} rollup rows.'))
@@ -2,6 +2,7 @@ import os
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.contrib.auth.models import User
+from home.categories import invalidate_category_nav
 from home.models import Category
 
 
@@ -45,10 +46,13 @@ class Command(BaseCommand):
                     }
                 )
                 
+                if not category.slug:
+                    category.save(update_fields=['slug'])
+
                 if created:
                     categories_created += 1
                     self.stdout.write(
-                        self.style.SUCCESS(f'Created category: {category_name}')
+                        self.style.SUCCESS(f'Created category: {category_name} (/{category.slug}/)')
                     )
                 else:
                     categories_updated += 1
@@ -56,6 +60,8 @@ class Command(BaseCommand):
                         self.style.WARNING(f'Category already exists: {category_name}')
                     )
 
+        invalidate_category_nav()
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'Sync complete! Created: {categories_created}, '
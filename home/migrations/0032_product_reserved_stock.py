@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-17 15:48
+
+import home.models
+from django.db import migrations, models
+
+
+def backfill_reserved_stock(apps, schema_editor):
+    Product = apps.get_model('home', 'Product')
+    StockReservation = apps.get_model('home', 'StockReservation')
+    totals = (
+        StockReservation.objects.filter(status='active')
+        .values('product')
+        .annotate(total=models.Sum('quantity'))
+    )
+    for row in totals:
+        Product.objects.filter(pk=row['product']).update(reserved_stock=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0031_order_cancellation_reason_order_cancelled_by_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reserved_stock',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Total quantity held by active stock reservations', verbose_name='Reserved Stock'),
+        ),
+        migrations.RunPython(backfill_reserved_stock, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-17 15:49
+
+import home.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0032_product_reserved_stock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='stockreservation',
+            name='home_stockr_expires_00a524_idx',
+        ),
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+        migrations.AddIndex(
+            model_name='stockreservation',
+            index=models.Index(fields=['status', 'expires_at'], name='home_stockr_status_57e6b8_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.1.7 on 2026-10-17 15:53
+
+import home.models
+from django.db import migrations, models
+
+
+def backfill_rating_summary(apps, schema_editor):
+    Product = apps.get_model('home', 'Product')
+    Review = apps.get_model('home', 'Review')
+    aggregates = {
+        'rating_count': models.Count('id'),
+        'rating_verified_count': models.Count('id', filter=models.Q(is_verified_purchase=True)),
+    }
+    for star in range(1, 6):
+        aggregates[f'rating_{star}_count'] = models.Count('id', filter=models.Q(rating=star))
+    totals = Review.objects.order_by().values('product').annotate(
+        rating_avg=models.Avg('rating'), **aggregates
+    )
+    for row in totals:
+        Product.objects.filter(pk=row.pop('product')).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0033_stockreservation_status_expiry_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='1 Star Reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='2 Star Reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='3 Star Reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='4 Star Reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='5 Star Reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False, verbose_name='Average Rating'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Review Count'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_verified_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Verified Review Count'),
+        ),
+        migrations.RunPython(backfill_rating_summary, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+    ]
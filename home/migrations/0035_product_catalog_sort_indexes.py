@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-17 16:12
+
+import home.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0034_product_rating_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'approval_status', 'created_at', 'id'], name='home_produc_status_e87ff5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'approval_status', 'price', 'id'], name='home_produc_status_f4473d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'approval_status', 'rating_avg', 'rating_count', 'id'], name='home_produc_status_f104e8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'approval_status', 'rating_count', 'rating_avg', 'id'], name='home_produc_status_fb22e8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'approval_status', 'name', 'id'], name='home_produc_status_dba713_idx'),
+        ),
+    ]
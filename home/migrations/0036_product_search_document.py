@@ -0,0 +1,62 @@
+# Generated by Django 5.1.7 on 2026-10-17 16:40
+
+import home.models
+from django.db import migrations, models
+
+
+def backfill_search_documents(apps, schema_editor):
+    Product = apps.get_model('home', 'Product')
+    batch = []
+    for product in Product.objects.select_related('category').iterator(chunk_size=500):
+        category = product.category.name if product.category_id else ''
+        product.search_document = '\n'.join([product.name or '', product.description or '', category])
+        batch.append(product)
+        if len(batch) >= 500:
+            Product.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        Product.objects.bulk_update(batch, ['search_document'])
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Must match the expression built by home.search.PostgresSearchBackend
+        schema_editor.execute(
+            "CREATE INDEX home_product_search_gin ON home_product USING GIN "
+            "(to_tsvector('simple'::regconfig, COALESCE((search_document)::text, '')))"
+        )
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            "ALTER TABLE home_product ADD FULLTEXT INDEX home_product_search_ft (search_document)"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS home_product_search_gin")
+    elif vendor == 'mysql':
+        schema_editor.execute("ALTER TABLE home_product DROP INDEX home_product_search_ft")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0035_product_catalog_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Name, description and category name, indexed for full-text search', verbose_name='Search Document'),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.7 on 2026-10-17 17:20
+
+import home.models
+from django.db import migrations, models
+
+
+def backfill_category_slugs(apps, schema_editor):
+    Category = apps.get_model('home', 'Category')
+    taken = set()
+    for category in Category.objects.order_by('pk'):
+        # Same rule the category pages used to derive slugs from names
+        base = category.name.lower().replace(" ", "-").replace("'", "")[:110]
+        slug, suffix = base, 2
+        while slug in taken:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        taken.add(slug)
+        category.slug = slug
+        category.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0036_product_search_document'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=120, null=True, verbose_name='Slug'),
+        ),
+        migrations.RunPython(backfill_category_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='URL name, generated from the category name when left blank', max_length=120, unique=True, verbose_name='Slug'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-17 18:05
+
+import django.db.models.deletion
+import home.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0037_category_slug'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+        migrations.CreateModel(
+            name='StockHistoryDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('change_type', models.CharField(choices=[('initial', 'Initial Stock'), ('restock', 'Restocked'), ('sale', 'Sold'), ('return', 'Returned'), ('adjustment', 'Manual Adjustment'), ('reservation', 'Reserved'), ('reservation_released', 'Reservation Released'), ('damaged', 'Damaged/Lost')], max_length=30, verbose_name='Change Type')),
+                ('quantity_added', models.PositiveIntegerField(default=0, verbose_name='Quantity Added')),
+                ('quantity_removed', models.PositiveIntegerField(default=0, verbose_name='Quantity Removed')),
+                ('change_count', models.PositiveIntegerField(default=0, verbose_name='Number of Changes')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_history_daily', to='home.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Daily Stock History',
+                'verbose_name_plural': 'Daily Stock Histories',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'date', 'change_type'), name='unique_stock_history_daily')],
+            },
+        ),
+    ]
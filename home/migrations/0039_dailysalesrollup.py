@@ -0,0 +1,74 @@
+# Generated by Django 5.1.7 on 2026-10-17 18:40
+
+import django.db.models.deletion
+import home.models
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_sales_rollup(apps, schema_editor):
+    # Same grouping as SalesRollupService.rebuild, on historical models
+    Order = apps.get_model('home', 'Order')
+    Sale = apps.get_model('home', 'Sale')
+    DailySalesRollup = apps.get_model('home', 'DailySalesRollup')
+    dimensions = ('day', 'product_id', 'product__category_id', 'product__seller_id')
+    order_rows = Order.objects.order_by().annotate(day=TruncDate('created_at')).values(
+        *dimensions, 'status'
+    ).annotate(revenue=Sum('total_price'), units=Sum('quantity'), count=Count('id'))
+    sale_rows = Sale.objects.order_by().annotate(day=TruncDate('sale_date')).values(
+        *dimensions
+    ).annotate(revenue=Sum('total_amount'), units=Sum('quantity'), count=Count('id'))
+    DailySalesRollup.objects.bulk_create([
+        DailySalesRollup(
+            date=row['day'],
+            product_id=row['product_id'],
+            category_id=row['product__category_id'],
+            seller_id=row['product__seller_id'],
+            status=row.get('status', 'sale'),
+            revenue=row['revenue'] or Decimal('0'),
+            units=row['units'] or 0,
+            order_count=row['count'],
+        )
+        for row in [*order_rows, *sale_rows]
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0038_stockhistorydaily'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('status', models.CharField(max_length=20, verbose_name='Status')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14, verbose_name='Revenue')),
+                ('units', models.IntegerField(default=0, verbose_name='Units')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Orders')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales_rollups', to='home.category', verbose_name='Category')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='home.product', verbose_name='Product')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Seller')),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Rollup',
+                'verbose_name_plural': 'Daily Sales Rollups',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['status', 'date'], name='home_dailys_status_979828_idx'), models.Index(fields=['seller', 'date'], name='home_dailys_seller__ee9d4b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product', 'status'), name='unique_daily_sales_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_sales_rollup, migrations.RunPython.noop),
+    ]
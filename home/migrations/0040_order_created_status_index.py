@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-17 20:15
+
+import home.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0039_dailysalesrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkout',
+            name='phone_number',
+            field=models.CharField(max_length=20, validators=[home.models.validate_zambian_phone], verbose_name='Phone Number'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'status'], name='home_order_created_4e882d_idx'),
+        ),
+    ]
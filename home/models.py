@@ -7,6 +7,7 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 from decimal import Decimal
 from datetime import timedelta
+from home import stock_ledger
 
 import re
 from django.core.validators import RegexValidator
@@ -20,6 +21,7 @@ def validate_zambian_phone(value):
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name=_("Category Name"))
+    slug = models.SlugField(max_length=120, unique=True, blank=True, verbose_name=_("Slug"), help_text=_("URL name, generated from the category name when left blank"))
     description = models.TextField(blank=True, null=True, verbose_name=_("Description"))
     image = models.ImageField(upload_to='categories/%Y/%m/%d/', null=True, blank=True, verbose_name=_("Category Image"))
     icon = models.CharField(max_length=50, blank=True, null=True, verbose_name=_("Icon Class"), help_text=_("Font Awesome icon class (e.g., fas fa-gem)"))
@@ -30,6 +32,28 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the post_save signal tell a rename from other edits
+        if 'name' in field_names:
+            instance._loaded_name = instance.name
+        return instance
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = self._unique_slug()
+        super().save(*args, **kwargs)
+
+    def _unique_slug(self):
+        from home.categories import category_slug_for_name
+        base = category_slug_for_name(self.name)[:110]
+        slug, suffix = base, 2
+        while Category.objects.filter(slug=slug).exclude(pk=self.pk).exists():
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        return slug
+
     class Meta:
         ordering = ['name']
         verbose_name = _("Category")
@@ -99,6 +123,39 @@ class Product(models.Model):
         default=0,
         verbose_name=_("Stock Quantity")
     )
+    reserved_stock = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Reserved Stock"),
+        help_text=_("Total quantity held by active stock reservations")
+    )
+    rating_avg = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name=_("Average Rating")
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Review Count")
+    )
+    rating_verified_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Verified Review Count")
+    )
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("1 Star Reviews"))
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("2 Star Reviews"))
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("3 Star Reviews"))
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("4 Star Reviews"))
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("5 Star Reviews"))
+    search_document = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name=_("Search Document"),
+        help_text=_("Name, description and category name, indexed for full-text search")
+    )
     approval_status = models.CharField(
         max_length=20,
         choices=APPROVAL_CHOICES,
@@ -129,6 +186,19 @@ class Product(models.Model):
 
     def __str__(self):
         return self.name
+
+    # Columns that make up search_document
+    SEARCH_FIELDS = frozenset({'name', 'description', 'category', 'category_id'})
+
+    def save(self, *args, **kwargs):
+        from home.search import build_search_document
+        update_fields = kwargs.get('update_fields')
+        # Stock, rating and status saves leave the document (and its category query) alone
+        if update_fields is None or self.SEARCH_FIELDS & set(update_fields):
+            self.search_document = build_search_document(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'search_document'}
+        super().save(*args, **kwargs)
     
     def get_image_url(self):
         """Get the image URL, preferring uploaded image over static image."""
@@ -145,38 +215,28 @@ class Product(models.Model):
     
     def get_available_stock(self):
         """Get available stock after accounting for active reservations."""
-        # Import here to avoid circular import
-        from home.models import StockReservation
-        return StockReservation.get_available_stock(self)
+        return max(0, self.stock - self.reserved_stock)
+    
+    def get_review_stats(self):
+        """Get average, count, verified count and 1-5 distribution from the rating columns."""
+        from home.services import ReviewStatsService
+        return ReviewStatsService.for_product(self)
     
     def get_average_rating(self):
         """Get average rating for this product."""
-        from django.db.models import Avg
-        result = self.reviews.aggregate(Avg('rating'))
-        return round(result['rating__avg'] or 0, 1)
+        return self.get_review_stats()['average_rating']
     
     def get_rating_count(self):
         """Get total number of reviews for this product."""
-        return self.reviews.count()
+        return self.get_review_stats()['total_reviews']
     
     def get_rating_distribution(self):
         """Get distribution of ratings (1-5 stars)."""
-        distribution = {}
-        total = self.get_rating_count()
-        
-        for rating in range(1, 6):
-            count = self.reviews.filter(rating=rating).count()
-            percentage = (count / total * 100) if total > 0 else 0
-            distribution[rating] = {
-                'count': count,
-                'percentage': round(percentage, 1)
-            }
-        
-        return distribution
+        return self.get_review_stats()['distribution']
     
     def get_verified_review_count(self):
         """Get count of verified purchase reviews."""
-        return self.reviews.filter(is_verified_purchase=True).count()
+        return self.get_review_stats()['verified_count']
     
     def is_available_for_customers(self):
         """Check if the product is available for customers to see and purchase."""
@@ -209,40 +269,18 @@ class Product(models.Model):
         """Reduce stock by the specified quantity, with validation and history tracking."""
         if self.status != "active":
             raise ValueError(_(f"Cannot reduce stock for {self.name}. Status is '{self.status}', must be 'active'."))
-        if quantity > self.stock:
-            raise ValueError(_(f"Insufficient stock for {self.name}. Available: {self.stock}, Requested: {quantity}"))
-        
-        # Record history before changing stock
-        from home.models import StockHistory
-        StockHistory.record_change(
-            product=self,
-            change_type='sale',
-            quantity_change=-quantity,
-            reason=reason,
-            changed_by=changed_by,
-            order=order
-        )
         
-        self.stock -= quantity
-        self.save(update_fields=['stock'])
+        # Conditional UPDATE ... WHERE stock >= quantity, so concurrent
+        # buyers cannot both pass the check and oversell.
+        from home.services import StockService
+        if not StockService.decrement(self, quantity, reason=reason, changed_by=changed_by, order=order):
+            self.refresh_from_db(fields=['stock', 'status'])
+            raise ValueError(_(f"Insufficient stock for {self.name}. Available: {self.stock}, Requested: {quantity}"))
 
-    def increase_stock(self, quantity, reason=None, changed_by=None):
+    def increase_stock(self, quantity, reason=None, changed_by=None, change_type='restock', order=None):
         """Increase stock by the specified quantity with history tracking."""
-        if quantity < 0:
-            raise ValueError(_(f"Cannot increase stock by a negative quantity: {quantity}"))
-        
-        # Record history before changing stock
-        from home.models import StockHistory
-        StockHistory.record_change(
-            product=self,
-            change_type='restock',
-            quantity_change=quantity,
-            reason=reason,
-            changed_by=changed_by
-        )
-        
-        self.stock += quantity
-        self.save(update_fields=['stock'])
+        from home.services import StockService
+        StockService.increment(self, quantity, change_type=change_type, reason=reason, changed_by=changed_by, order=order)
 
     def mark_as_sold(self):
         """Mark the product as sold and set stock to 0."""
@@ -257,6 +295,12 @@ class Product(models.Model):
         indexes = [
             models.Index(fields=['seller', 'status']),
             models.Index(fields=['created_at']),
+            # One per option in home.sorting.PRODUCT_SORT_OPTIONS
+            models.Index(fields=['status', 'approval_status', 'created_at', 'id']),
+            models.Index(fields=['status', 'approval_status', 'price', 'id']),
+            models.Index(fields=['status', 'approval_status', 'rating_avg', 'rating_count', 'id']),
+            models.Index(fields=['status', 'approval_status', 'rating_count', 'rating_avg', 'id']),
+            models.Index(fields=['status', 'approval_status', 'name', 'id']),
         ]
 class Checkout(models.Model):
     class LocationChoices(models.TextChoices):
@@ -393,30 +437,56 @@ class Order(models.Model):
     def calculate_total(self):
         return self.product.price * self.quantity
 
+    # Stored values save() compares against to move stock and sales rollups
+    TRACKED_FIELDS = ('quantity', 'status', 'total_price', 'created_at')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered here so save() never has to read the row again.
+        instance._loaded_values = {
+            name: getattr(instance, name) for name in cls.TRACKED_FIELDS if name in field_names
+        }
+        return instance
+
     def save(self, *args, **kwargs):
-        with transaction.atomic():
-            if not self.pk:
-                self.total_price = self.calculate_total()
-                self.product.reduce_stock(self.quantity)
-            elif self.quantity != self._original_quantity():
-                diff = self.quantity - self._original_quantity()
-                if diff > 0:
-                    self.product.reduce_stock(diff)
-                elif diff < 0:
-                    self.product.stock += abs(diff)
-                    self.product.save()
-                self.total_price = self.calculate_total()
-            super().save(*args, **kwargs)
-
-    def _original_quantity(self):
-        if self.pk:
-            return Order.objects.get(pk=self.pk).quantity
-        return self.quantity
+        from home.services import SalesRollupService, StockService
+
+        adding = self._state.adding
+        previous = None if adding else self._original_values()
+        previous_quantity = 0 if adding else previous['quantity']
+        if adding or self.quantity != previous_quantity:
+            self.total_price = self.calculate_total()
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                # Saved first so the stock history row can link to the order
+                StockService.apply_order_quantity(self, previous_quantity)
+                SalesRollupService.record_order_change(self, previous)
+        except Exception:
+            if adding:
+                self.pk = None
+                self._state.adding = True
+            raise
+        self._remember_values()
+
+    def _remember_values(self):
+        self._loaded_values = {name: getattr(self, name) for name in self.TRACKED_FIELDS}
+
+    def _original_values(self):
+        if len(getattr(self, '_loaded_values', ())) != len(self.TRACKED_FIELDS):
+            # Only for instances built by hand or loaded with fields deferred
+            self._loaded_values = Order.objects.values(*self.TRACKED_FIELDS).get(pk=self.pk)
+        return self._loaded_values
 
     class Meta:
         ordering = ["-created_at"]
         verbose_name = _("Order")
         verbose_name_plural = _("Orders")
+        indexes = [
+            # Day-range reads that the sales rollups cannot answer
+            models.Index(fields=['created_at', 'status']),
+        ]
 
 class Sale(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="sales", verbose_name=_("Product"))
@@ -434,6 +504,43 @@ class Sale(models.Model):
         verbose_name = _("Sale")
         verbose_name_plural = _("Sales")
 
+class DailySalesRollup(models.Model):
+    """
+    Sales facts summed per day, product and status.
+    
+    Order lines are recorded under their order status and Sale rows under
+    SALE_STATUS. Category and seller are copied from the product so reports
+    can group by them without joins. Rows are kept up to date by
+    home.services.SalesRollupService and can be rebuilt with
+    ``python manage.py rebuild_sales_rollup``.
+    """
+    SALE_STATUS = 'sale'
+    
+    date = models.DateField(verbose_name=_("Date"))
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="sales_rollups", verbose_name=_("Product"))
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name="sales_rollups", verbose_name=_("Category"))
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sales_rollups", verbose_name=_("Seller"))
+    status = models.CharField(max_length=20, verbose_name=_("Status"))
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'), verbose_name=_("Revenue"))
+    units = models.IntegerField(default=0, verbose_name=_("Units"))
+    order_count = models.IntegerField(default=0, verbose_name=_("Orders"))
+    
+    def __str__(self):
+        return f"{self.date} {self.product_id} {self.status}: {self.revenue}"
+    
+    class Meta:
+        ordering = ["-date"]
+        verbose_name = _("Daily Sales Rollup")
+        verbose_name_plural = _("Daily Sales Rollups")
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product', 'status'], name='unique_daily_sales_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'date']),
+            models.Index(fields=['seller', 'date']),
+        ]
+
+
 class Review(models.Model):
     RATING_CHOICES = [
         (1, _("1 Star - Poor")),
@@ -481,6 +588,14 @@ class Review(models.Model):
 
     def __str__(self):
         return f"Review by {self.user.username} for {self.product.name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the rating summary signal rebuild the old product of a moved review
+        if 'product_id' in field_names:
+            instance._loaded_product_id = instance.product_id
+        return instance
     
     @classmethod
     def user_has_purchased(cls, user, product):
@@ -628,7 +743,9 @@ class StockReservation(models.Model):
         indexes = [
             models.Index(fields=['user', 'status']),
             models.Index(fields=['product', 'status']),
-            models.Index(fields=['expires_at', 'status']),
+            # Status first, so the reaper's range scan only walks active
+            # reservations instead of every hold that ever expired.
+            models.Index(fields=['status', 'expires_at']),
         ]
     
     def __str__(self):
@@ -640,21 +757,32 @@ class StockReservation(models.Model):
     
     def mark_as_expired(self):
         """Mark the reservation as expired."""
-        if self.status == 'active':
-            self.status = 'expired'
-            self.save(update_fields=['status', 'updated_at'])
+        self._release('expired')
     
     def mark_as_completed(self):
         """Mark the reservation as completed (order placed)."""
-        if self.status == 'active':
-            self.status = 'completed'
-            self.save(update_fields=['status', 'updated_at'])
+        self._release('completed')
     
     def mark_as_cancelled(self):
         """Mark the reservation as cancelled."""
-        if self.status == 'active':
-            self.status = 'cancelled'
-            self.save(update_fields=['status', 'updated_at'])
+        self._release('cancelled')
+    
+    def _release(self, status):
+        """Move an active reservation to a final status and release its hold."""
+        if self.status != 'active':
+            return
+        now = timezone.now()
+        with transaction.atomic():
+            # Lock and re-read the row so a stale instance can't release the
+            # wrong quantity, or release the same hold twice.
+            quantity = StockReservation.objects.select_for_update().filter(
+                pk=self.pk, status='active'
+            ).values_list('quantity', flat=True).first()
+            if quantity is not None:
+                StockReservation.objects.filter(pk=self.pk).update(status=status, updated_at=now)
+                StockReservation.adjust_reserved_stock({self.product_id: -quantity})
+        self.status = status
+        self.updated_at = now
     
     @classmethod
     def create_reservation(cls, user, product, quantity, expiry_minutes=15):
@@ -664,54 +792,186 @@ class StockReservation(models.Model):
         """
         expires_at = timezone.now() + timedelta(minutes=expiry_minutes)
         
-        # Check if there's an existing active reservation for this user and product
-        existing = cls.objects.filter(
-            user=user,
-            product=product,
-            status='active'
-        ).first()
-        
-        if existing:
-            # Update existing reservation
-            existing.quantity = quantity
-            existing.expires_at = expires_at
-            existing.save(update_fields=['quantity', 'expires_at', 'updated_at'])
-            return existing, False
-        else:
-            # Create new reservation
-            reservation = cls.objects.create(
+        with transaction.atomic():
+            # Check if there's an existing active reservation for this user and product
+            existing = cls.objects.select_for_update().filter(
                 user=user,
                 product=product,
-                quantity=quantity,
-                expires_at=expires_at
+                status='active'
+            ).first()
+            
+            if existing:
+                # Update existing reservation
+                delta = quantity - existing.quantity
+                existing.quantity = quantity
+                existing.expires_at = expires_at
+                existing.save(update_fields=['quantity', 'expires_at', 'updated_at'])
+                cls.adjust_reserved_stock({product.pk: delta})
+                return existing, False
+            else:
+                # Create new reservation
+                reservation = cls.objects.create(
+                    user=user,
+                    product=product,
+                    quantity=quantity,
+                    expires_at=expires_at
+                )
+                cls.adjust_reserved_stock({product.pk: quantity})
+                return reservation, True
+    
+    @classmethod
+    def adjust_reserved_stock(cls, deltas):
+        """
+        Apply changes to the denormalized Product.reserved_stock counters.
+        
+        Args:
+            deltas: Dictionary of product id to quantity change
+        
+        All products are updated with a single UPDATE.
+        """
+        from django.db.models import Case, When, F, Value
+        from django.db.models.functions import Greatest
+        
+        deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        Product.objects.filter(pk__in=deltas.keys()).update(
+            reserved_stock=Greatest(
+                Case(
+                    *[When(pk=product_id, then=F('reserved_stock') + delta) for product_id, delta in deltas.items()],
+                    output_field=models.IntegerField(),
+                ),
+                Value(0),
             )
-            return reservation, True
+        )
+    
+    @classmethod
+    def rebuild_reserved_stock(cls):
+        """Recompute every Product.reserved_stock counter from active reservations."""
+        from django.db.models import OuterRef, Subquery, Value
+        from django.db.models.functions import Coalesce
+        
+        reserved = cls.objects.filter(
+            product=OuterRef('pk'),
+            status='active'
+        ).values('product').annotate(total=models.Sum('quantity')).values('total')
+        return Product.objects.update(
+            reserved_stock=Coalesce(Subquery(reserved), Value(0))
+        )
     
     @classmethod
     def get_reserved_stock(cls, product):
         """Get the total quantity of active reservations for a product."""
-        return cls.objects.filter(
-            product=product,
-            status='active',
-            expires_at__gt=timezone.now()
-        ).aggregate(
-            total=models.Sum('quantity')
-        )['total'] or 0
+        return product.reserved_stock
     
     @classmethod
     def get_available_stock(cls, product):
         """Get the available stock after accounting for active reservations."""
-        reserved = cls.get_reserved_stock(product)
-        return max(0, product.stock - reserved)
+        return product.get_available_stock()
+    
+    @classmethod
+    def available_stock_for(cls, products):
+        """
+        Get available stock for many products with a single query.
+        
+        Args:
+            products: Iterable of Product instances or primary keys
+        
+        Returns:
+            dict: Product id to available quantity
+        """
+        product_ids = [getattr(product, 'pk', product) for product in products]
+        rows = Product.objects.filter(pk__in=product_ids).values_list('pk', 'stock', 'reserved_stock')
+        return {pk: max(0, stock - reserved) for pk, stock, reserved in rows}
+    
+    @classmethod
+    def complete_for_user(cls, user, product_ids):
+        """Mark a user's active reservations for the given products as completed."""
+        return cls._release_many(
+            cls.objects.filter(user=user, product_id__in=product_ids, status='active'),
+            'completed'
+        )
+    
+    @classmethod
+    def cleanup_expired_reservations(cls, batch_size=500):
+        """Mark all expired reservations as expired, one batch at a time."""
+        expired_count = 0
+        while True:
+            metrics = cls.expire_batch(batch_size)
+            expired_count += metrics['expired']
+            if metrics['expired'] < batch_size:
+                return expired_count
     
     @classmethod
-    def cleanup_expired_reservations(cls):
-        """Mark all expired reservations as expired."""
-        expired_count = cls.objects.filter(
-            status='active',
-            expires_at__lte=timezone.now()
-        ).update(status='expired', updated_at=timezone.now())
-        return expired_count
+    def expire_batch(cls, batch_size=500):
+        """
+        Expire up to ``batch_size`` overdue reservations.
+        
+        Releases their holds on Product.reserved_stock and records one
+        'reservation_released' StockHistory row per reservation with a single
+        bulk_create. Rows locked by a concurrent sweep are skipped.
+        
+        Returns:
+            dict: Metrics for the sweep (expired, products, history_rows)
+        """
+        from django.db import connection
+        
+        lock = {'skip_locked': connection.features.has_select_for_update_skip_locked}
+        if connection.features.has_select_for_update_of:
+            # Lock only the reservations; the product__stock join must not
+            # hold Product rows against checkout's stock UPDATEs
+            lock['of'] = ('self',)
+        with transaction.atomic():
+            rows = list(
+                cls.objects.select_for_update(**lock).filter(
+                    status='active',
+                    expires_at__lte=timezone.now()
+                ).order_by('expires_at').values_list(
+                    'pk', 'product_id', 'quantity', 'user_id', 'product__stock'
+                )[:batch_size]
+            )
+            if not rows:
+                return {'expired': 0, 'products': 0, 'history_rows': 0}
+            
+            cls.objects.filter(pk__in=[row[0] for row in rows]).update(
+                status='expired', updated_at=timezone.now()
+            )
+            deltas = {}
+            for _pk, product_id, quantity, _user_id, _stock in rows:
+                deltas[product_id] = deltas.get(product_id, 0) - quantity
+            cls.adjust_reserved_stock(deltas)
+            
+            # Physical stock is unchanged; the quantity goes back to available stock.
+            history = stock_ledger.record([
+                StockHistory(
+                    product_id=product_id,
+                    change_type='reservation_released',
+                    quantity_change=quantity,
+                    stock_before=stock,
+                    stock_after=stock,
+                    reason='Reservation expired',
+                    reservation_id=pk,
+                )
+                for pk, product_id, quantity, _user_id, stock in rows
+            ])
+        
+        return {'expired': len(rows), 'products': len(deltas), 'history_rows': len(history)}
+    
+    @classmethod
+    def _release_many(cls, queryset, status):
+        """Move active reservations to a final status and release their holds."""
+        with transaction.atomic():
+            rows = list(queryset.select_for_update().values_list('pk', 'product_id', 'quantity'))
+            if not rows:
+                return 0
+            cls.objects.filter(pk__in=[row[0] for row in rows]).update(
+                status=status, updated_at=timezone.now()
+            )
+            deltas = {}
+            for _pk, product_id, quantity in rows:
+                deltas[product_id] = deltas.get(product_id, 0) - quantity
+            cls.adjust_reserved_stock(deltas)
+        return len(rows)
 
 
 class StockHistory(models.Model):
@@ -813,12 +1073,12 @@ class StockHistory(models.Model):
             reservation: Related reservation (if applicable)
         
         Returns:
-            StockHistory instance
+            StockHistory instance (unsaved until flushed inside a ledger batch)
         """
         stock_before = product.stock
         stock_after = max(0, stock_before + quantity_change)
         
-        history = cls.objects.create(
+        history, = stock_ledger.record([cls(
             product=product,
             change_type=change_type,
             quantity_change=quantity_change,
@@ -828,7 +1088,7 @@ class StockHistory(models.Model):
             changed_by=changed_by,
             order=order,
             reservation=reservation
-        )
+        )])
         
         return history
     
@@ -842,25 +1102,155 @@ class StockHistory(models.Model):
             created_at__gte=cutoff_date
         ).select_related('changed_by', 'order', 'reservation')
     
+    @classmethod
+    def compact(cls, keep_days=90):
+        """
+        Roll history older than ``keep_days`` up into StockHistoryDaily.
+        
+        Works one day at a time. Each day's rollup rows are written and its
+        raw rows deleted in one transaction, so an interrupted run can just
+        be started again. Raw rows are deleted by primary-key range, which
+        works because the table is append-only.
+        
+        Returns:
+            dict: Metrics for the run (days, rows_compacted, rollup_rows)
+        """
+        from datetime import datetime
+        from django.db.models import Count, Max, Min, Sum
+        from django.db.models.functions import TruncDate
+        
+        cutoff = timezone.make_aware(
+            datetime.combine(timezone.localdate() - timedelta(days=keep_days), datetime.min.time())
+        )
+        groups = cls.objects.filter(created_at__lt=cutoff).annotate(
+            day=TruncDate('created_at')
+        ).values('day', 'product_id', 'change_type').annotate(
+            added=Sum('quantity_change', filter=models.Q(quantity_change__gt=0)),
+            removed=Sum('quantity_change', filter=models.Q(quantity_change__lt=0)),
+            changes=Count('id'),
+            first_pk=Min('pk'),
+            last_pk=Max('pk'),
+        ).order_by('day')
+        
+        days = {}
+        for group in groups:
+            days.setdefault(group['day'], []).append(group)
+        
+        metrics = {'days': 0, 'rows_compacted': 0, 'rollup_rows': 0}
+        for day, day_groups in days.items():
+            day_start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+            day_end = min(day_start + timedelta(days=1), cutoff)
+            with transaction.atomic():
+                existing = {
+                    (row.product_id, row.change_type): row
+                    for row in StockHistoryDaily.objects.select_for_update().filter(
+                        date=day, product_id__in={group['product_id'] for group in day_groups}
+                    )
+                }
+                to_create, to_update = [], []
+                for group in day_groups:
+                    row = existing.get((group['product_id'], group['change_type']))
+                    if row is None:
+                        row = StockHistoryDaily(product_id=group['product_id'], date=day, change_type=group['change_type'])
+                        to_create.append(row)
+                    else:
+                        to_update.append(row)
+                    row.quantity_added += group['added'] or 0
+                    row.quantity_removed += abs(group['removed'] or 0)
+                    row.change_count += group['changes']
+                StockHistoryDaily.objects.bulk_create(to_create)
+                StockHistoryDaily.objects.bulk_update(to_update, ['quantity_added', 'quantity_removed', 'change_count'])
+                
+                deleted, _ = cls.objects.filter(
+                    pk__gte=min(group['first_pk'] for group in day_groups),
+                    pk__lte=max(group['last_pk'] for group in day_groups),
+                    created_at__gte=day_start,
+                    created_at__lt=day_end,
+                ).delete()
+            
+            metrics['days'] += 1
+            metrics['rows_compacted'] += deleted
+            metrics['rollup_rows'] += len(day_groups)
+        return metrics
+    
     @classmethod
     def get_stock_summary(cls, product):
-        """Get a summary of stock changes for a product."""
+        """
+        Get a summary of stock changes for a product.
+        
+        Compacted days are read from StockHistoryDaily and only the recent,
+        uncompacted rows are aggregated here.
+        """
         from django.db.models import Sum, Count
         
-        summary = cls.objects.filter(product=product).aggregate(
+        recent = cls.objects.filter(product=product).aggregate(
             total_added=Sum('quantity_change', filter=models.Q(quantity_change__gt=0)),
             total_removed=Sum('quantity_change', filter=models.Q(quantity_change__lt=0)),
             total_changes=Count('id')
         )
+        compacted = StockHistoryDaily.objects.filter(product=product).aggregate(
+            total_added=Sum('quantity_added'),
+            total_removed=Sum('quantity_removed'),
+            total_changes=Sum('change_count')
+        )
         
         return {
-            'total_added': summary['total_added'] or 0,
-            'total_removed': abs(summary['total_removed'] or 0),
-            'total_changes': summary['total_changes'] or 0,
+            'total_added': (recent['total_added'] or 0) + (compacted['total_added'] or 0),
+            'total_removed': abs(recent['total_removed'] or 0) + (compacted['total_removed'] or 0),
+            'total_changes': (recent['total_changes'] or 0) + (compacted['total_changes'] or 0),
             'current_stock': product.stock
         }
 
 
+class StockHistoryDaily(models.Model):
+    """
+    Daily per-product rollup of compacted StockHistory rows.
+    
+    Written by the compact_stock_history command, which deletes the raw rows
+    it rolls up.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='stock_history_daily',
+        verbose_name=_('Product')
+    )
+    date = models.DateField(
+        verbose_name=_('Date')
+    )
+    change_type = models.CharField(
+        max_length=30,
+        choices=StockHistory.CHANGE_TYPE_CHOICES,
+        verbose_name=_('Change Type')
+    )
+    quantity_added = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Quantity Added')
+    )
+    quantity_removed = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Quantity Removed')
+    )
+    change_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Number of Changes')
+    )
+    
+    class Meta:
+        ordering = ['-date']
+        verbose_name = _('Daily Stock History')
+        verbose_name_plural = _('Daily Stock Histories')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'date', 'change_type'],
+                name='unique_stock_history_daily'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} {self.date} {self.change_type}: +{self.quantity_added}/-{self.quantity_removed}"
+
+
 class Store(models.Model):
     """Model for physical store locations."""
     name = models.CharField(max_length=255, verbose_name=_("Store Name"))
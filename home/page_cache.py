@@ -0,0 +1,191 @@
+"""
+Response caching for anonymous catalog and help pages.
+
+Anonymous visitors (no session or messages cookie) all see the same page for
+the same URL, so the rendered response is cached per path and query string.
+Logged-in users and non-GET requests always render.
+
+Keys include a version number per namespace ("catalog", "guides"). Writes
+bump the version (see home.signals) instead of deleting keys, so every page
+in the namespace is invalidated at once and old entries simply expire.
+Versions live in the 'versions' cache, which never evicts them.
+
+Hit/miss counters are kept per process and added to the shared cache at
+most every STATS_FLUSH_INTERVAL seconds, so a cached page costs no extra
+round trip.
+
+CSRF tokens in cached HTML are swapped for the current visitor's token when
+the page is served, so cached forms still post.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+
+PAGE_CACHE_TIMEOUT = 600
+STATS_FLUSH_INTERVAL = 10
+CATALOG = 'catalog'
+GUIDES = 'guides'
+NAMESPACES = (CATALOG, GUIDES)
+
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[A-Za-z0-9]+(")')
+CSRF_PLACEHOLDER = b'__page_cache_csrf_token__'
+
+
+def _version_key(namespace):
+    return f'page_cache:version:{namespace}'
+
+
+def _stats_key(namespace, outcome):
+    return f'page_cache:stats:{namespace}:{outcome}'
+
+
+def _incr(key, store=cache, delta=1):
+    try:
+        store.incr(key, delta)
+    except ValueError:
+        if not store.add(key, delta, None):
+            store.incr(key, delta)
+
+
+_pending_stats = Counter()
+_pending_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def _count(namespace, outcome):
+    global _flushed_at
+    with _pending_lock:
+        _pending_stats[_stats_key(namespace, outcome)] += 1
+        if time.monotonic() - _flushed_at < STATS_FLUSH_INTERVAL:
+            return
+        _flushed_at = time.monotonic()
+    flush_stats()
+
+
+def flush_stats():
+    """Add this process's pending hit/miss counts to the shared counters."""
+    with _pending_lock:
+        pending = dict(_pending_stats)
+        _pending_stats.clear()
+    for key, delta in pending.items():
+        _incr(key, delta=delta)
+
+
+def get_version(namespace):
+    """Current version number of a cache namespace."""
+    return caches['versions'].get(_version_key(namespace), 0)
+
+
+def bump_version(*namespaces):
+    """Invalidate every cached page and fragment in ``namespaces``."""
+    for namespace in namespaces:
+        _incr(_version_key(namespace), caches['versions'])
+
+
+def get_stats():
+    """
+    Get hit/miss counters for every namespace.
+
+    Returns:
+        dict: namespace -> {'hits', 'misses', 'hit_rate', 'version'}
+    """
+    flush_stats()
+    stats = {}
+    for namespace in NAMESPACES:
+        hits = cache.get(_stats_key(namespace, 'hit'), 0)
+        misses = cache.get(_stats_key(namespace, 'miss'), 0)
+        total = hits + misses
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 3) if total else 0.0,
+            'version': get_version(namespace),
+        }
+    return stats
+
+
+def reset_stats():
+    with _pending_lock:
+        _pending_stats.clear()
+    cache.delete_many([
+        _stats_key(namespace, outcome)
+        for namespace in NAMESPACES
+        for outcome in ('hit', 'miss')
+    ])
+
+
+def is_cacheable_request(request):
+    """Only anonymous GET/HEAD requests without a session or queued messages."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+def page_cache_key(namespace, request):
+    query = sorted(request.GET.lists())
+    digest = hashlib.md5(f'{request.path}?{query}'.encode(), usedforsecurity=False).hexdigest()
+    return f'page_cache:{namespace}:{get_version(namespace)}:{digest}'
+
+
+def cache_anonymous_page(namespace, timeout=PAGE_CACHE_TIMEOUT):
+    """
+    Cache a view's response for anonymous visitors.
+
+    Args:
+        namespace: Version namespace invalidated by related writes
+        timeout: Seconds a cached page is served for
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+
+            key = page_cache_key(namespace, request)
+            cached = cache.get(key)
+            if cached is not None:
+                _count(namespace, 'hit')
+                return _restore_response(request, cached)
+
+            _count(namespace, 'miss')
+            response = view_func(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+                and not response.has_header('Cache-Control')
+            ):
+                cache.set(key, _freeze_response(response), timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def _freeze_response(response):
+    content = CSRF_INPUT_RE.sub(rb'\g<1>' + CSRF_PLACEHOLDER + rb'\g<2>', response.content)
+    return {
+        'content': content,
+        'content_type': response['Content-Type'],
+        'uses_csrf': content != response.content,
+    }
+
+
+def _restore_response(request, cached):
+    content = cached['content']
+    if cached['uses_csrf']:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request).encode())
+    response = HttpResponse(content, content_type=cached['content_type'])
+    response['X-Page-Cache'] = 'hit'
+    return response
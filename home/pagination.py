@@ -0,0 +1,185 @@
+"""
+Keyset (cursor) pagination for the product catalog.
+
+Offset pagination gets slower the deeper a visitor scrolls because the
+database still has to walk every skipped row. Keyset pagination instead
+remembers the sort key of the last row on the page and asks for rows
+"after" it, which an index on the sort columns answers directly no matter
+how large the catalog is.
+
+The position is carried in a signed, URL-safe cursor token so it is stable
+across requests and cannot be tampered with.
+"""
+
+import datetime
+import json
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+CURSOR_SALT = 'home.pagination.cursor'
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 96
+
+
+class KeysetPage:
+    """
+    One page of keyset-paginated results.
+
+    Iterates like a list of objects and carries the cursor for the next page.
+    """
+
+    def __init__(self, object_list, next_cursor, is_first_page):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first_page = is_first_page
+        self.next_url = None
+        self.first_url = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by a fixed ordering without OFFSET.
+
+    Args:
+        queryset: Queryset to paginate
+        ordering: Sequence of non-nullable field names, '-' prefixed for
+            descending. The primary key is appended as a tie-breaker so every
+            row has a unique position.
+        per_page: Number of rows per page
+    """
+
+    def __init__(self, queryset, ordering, per_page=DEFAULT_PAGE_SIZE):
+        ordering = list(ordering)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            descending = ordering[-1].startswith('-') if ordering else True
+            ordering.append('-id' if descending else 'id')
+        self.ordering = ordering
+        self.per_page = max(1, min(int(per_page), MAX_PAGE_SIZE))
+        self.queryset = queryset.order_by(*ordering)
+
+    def _fields(self):
+        return [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+
+    def encode_cursor(self, obj):
+        """Build the cursor token pointing just after ``obj``."""
+        values = [getattr(obj, name) for name, _descending in self._fields()]
+        return signing.dumps(
+            {'o': self.ordering, 'v': values},
+            salt=CURSOR_SALT,
+            serializer=CursorSerializer,
+        )
+
+    def decode_cursor(self, token):
+        """
+        Decode a cursor token.
+
+        Returns:
+            list or None: Sort key values, or None if the token is missing,
+            tampered with or was issued for a different ordering
+        """
+        if not token:
+            return None
+        try:
+            payload = signing.loads(token, salt=CURSOR_SALT, serializer=CursorSerializer)
+        except signing.BadSignature:
+            return None
+        if payload.get('o') != self.ordering or len(payload.get('v', [])) != len(self.ordering):
+            return None
+        return payload['v']
+
+    def _after(self, values):
+        # (a, b, id) > (x, y, z) expanded into
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self._fields(), values):
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def page(self, cursor=None):
+        """
+        Get the page starting after ``cursor``.
+
+        Returns:
+            KeysetPage
+        """
+        values = self.decode_cursor(cursor)
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._after(values))
+
+        rows = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            next_cursor = self.encode_cursor(rows[-1])
+        return KeysetPage(rows, next_cursor, is_first_page=values is None)
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder for cursor values.
+
+    Keeps full microsecond precision on datetimes (DjangoJSONEncoder rounds
+    them to milliseconds, which would make the cursor skip or repeat rows).
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorSerializer:
+    """Serializer for signing cursor payloads with CursorEncoder."""
+
+    def dumps(self, obj):
+        return json.dumps(obj, cls=CursorEncoder, separators=(',', ':')).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+def paginate_request(request, queryset, ordering, per_page=DEFAULT_PAGE_SIZE):
+    """
+    Paginate ``queryset`` using the ``cursor`` and ``per_page`` query params.
+
+    The returned page has ``next_url`` and ``first_url`` set to the current
+    URL with the cursor for the following page (or without a cursor),
+    preserving the other query parameters.
+
+    Returns:
+        KeysetPage
+    """
+    try:
+        per_page = int(request.GET.get('per_page', per_page))
+    except (TypeError, ValueError):
+        pass
+    paginator = KeysetPaginator(queryset, ordering, per_page)
+    page = paginator.page(request.GET.get('cursor'))
+
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    page.first_url = f'{request.path}?{params.urlencode()}' if params else request.path
+    if page.has_next:
+        params['cursor'] = page.next_cursor
+        page.next_url = f'{request.path}?{params.urlencode()}'
+    return page
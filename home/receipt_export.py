@@ -0,0 +1,188 @@
+"""
+Bulk receipt export for finance.
+
+Completed checkouts in a date range are read in primary-key chunks, each
+with one prefetch of orders and products. Receipts missing from the receipt
+store (see home.receipt_store) are rendered in a process pool, because
+ReportLab is CPU-bound and holds the GIL. The stored PDFs are then streamed
+into a zip archive.
+
+Every rendered PDF is saved to the content-addressed store before it is
+zipped, so an interrupted export resumes by rerunning it. Receipts that are
+already stored are only read back.
+
+Exports run from ``python manage.py export_receipts``, never in a web
+worker. With ``--store`` the finished archive is saved at archive_path(),
+where the staff export page serves it from.
+"""
+
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+
+from .receipt_generator import ReceiptGenerator, load_receipt_data, receipt_queryset
+from .receipt_store import receipt_fingerprint, receipt_path
+
+
+EXPORT_CHUNK_SIZE = 200
+ZIP_READ_SIZE = 64 * 1024
+ARCHIVE_DIR = 'receipts/exports'
+
+
+def export_queryset(start_date, end_date):
+    """Completed checkouts created between ``start_date`` and ``end_date`` (inclusive)."""
+    from home.models import Checkout
+    return Checkout.objects.filter(
+        payment_status=Checkout.PaymentStatusChoices.COMPLETED,
+        created_at__date__gte=start_date,
+        created_at__date__lte=end_date,
+    )
+
+
+def archive_path(start_date, end_date):
+    """Storage path of the finished archive for a date range."""
+    return f'{ARCHIVE_DIR}/{archive_filename(start_date, end_date)}'
+
+
+def archive_filename(start_date, end_date):
+    return f'receipts_{start_date}_{end_date}.zip'
+
+
+def iter_receipt_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield lists of ReceiptData, reading ``queryset`` in primary-key order.
+
+    Each chunk costs two queries: the checkouts with their users, and the
+    orders with their products.
+    """
+    checkouts = receipt_queryset().filter(pk__in=queryset.values('pk')).order_by('pk')
+    last_pk = 0
+    while True:
+        chunk = list(checkouts.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1].pk
+        yield [load_receipt_data(checkout) for checkout in chunk]
+
+
+def receipt_filename(receipt):
+    return f'receipt_{receipt.receipt_number}.pdf'
+
+
+def _render_pdf(receipt):
+    # Runs in a worker process; ReceiptData is plain data and pickles cheaply
+    return ReceiptGenerator(receipt).generate()
+
+
+def export_receipts(queryset, workers=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Make sure every receipt in ``queryset`` is stored, rendering missing ones.
+
+    Args:
+        queryset: Checkout queryset, e.g. from export_queryset()
+        workers: Render processes; 1 renders in this process
+        chunk_size: Checkouts loaded per query
+        progress: Optional callable(done, total, rendered)
+
+    Yields:
+        tuple: (zip entry name, storage path) in checkout order
+    """
+    workers = workers or os.cpu_count() or 1
+    total = queryset.count()
+    done = rendered = 0
+    executor = None
+    if workers > 1:
+        # Forked workers must not share this process's database sockets
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for chunk in iter_receipt_chunks(queryset, chunk_size):
+            paths = [receipt_path(receipt_fingerprint(receipt)) for receipt in chunk]
+            missing = [i for i, path in enumerate(paths) if not default_storage.exists(path)]
+            pending = [chunk[i] for i in missing]
+            pdfs = executor.map(_render_pdf, pending) if executor else map(_render_pdf, pending)
+            for i, pdf in zip(missing, pdfs):
+                paths[i] = default_storage.save(paths[i], ContentFile(pdf))
+            rendered += len(missing)
+
+            for receipt, path in zip(chunk, paths):
+                done += 1
+                yield receipt_filename(receipt), path
+            if progress:
+                progress(done, total, rendered)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+
+class _ZipStream:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """
+    Yield a zip archive of stored files chunk by chunk.
+
+    Args:
+        entries: Iterable of (zip entry name, storage path)
+    """
+    stream = _ZipStream()
+    # PDFs are already compressed
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, path in entries:
+            with default_storage.open(path, 'rb') as source, archive.open(name, 'w', force_zip64=True) as target:
+                while True:
+                    data = source.read(ZIP_READ_SIZE)
+                    if not data:
+                        break
+                    target.write(data)
+                    yield from _flush(stream)
+            yield from _flush(stream)
+    yield from _flush(stream)
+
+
+def _flush(stream):
+    data = stream.pop()
+    if data:
+        yield data
+
+
+def store_archive(entries, start_date, end_date):
+    """
+    Zip ``entries`` and save the archive at archive_path().
+
+    The archive is built in a local temporary file first and uploaded once
+    every receipt is in it, replacing any older archive for the range.
+
+    Returns:
+        str: Storage path of the archive
+    """
+    path = archive_path(start_date, end_date)
+    with tempfile.TemporaryFile() as archive:
+        for data in stream_zip(entries):
+            archive.write(data)
+        archive.seek(0)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        return default_storage.save(path, File(archive, name=archive_filename(start_date, end_date)))
@@ -1,194 +1,173 @@
 """
 Receipt Generator for Montclair Wardrobe
-Generates PDF receipts for completed orders
+Generates PDF and HTML receipts for completed orders
+
+Both formats are rendered from the same ReceiptData, loaded with one
+checkout query and one prefetch of orders and products. Paragraph and table
+styles are built once per process, and PDFs are written to a spooled
+temporary file, so large receipts overflow to disk instead of memory.
 """
-from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
+import tempfile
+from dataclasses import dataclass, field
+from decimal import Decimal
+from functools import lru_cache
+
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
 from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-from django.conf import settings
-from datetime import datetime
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 
 
-class ReceiptGenerator:
-    """Generate professional PDF receipts for orders"""
-    
-    def __init__(self, checkout):
-        """
-        Initialize receipt generator
-        
-        Args:
-            checkout: Checkout instance
-        """
-        self.checkout = checkout
-        self.buffer = BytesIO()
-        self.doc = SimpleDocTemplate(
-            self.buffer,
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=0.75*inch,
-            bottomMargin=0.75*inch
-        )
-        self.styles = getSampleStyleSheet()
-        self.story = []
-        
-        # Custom styles
-        self.title_style = ParagraphStyle(
+# PDFs larger than this are spooled to disk
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+@dataclass
+class ReceiptLine:
+    name: str
+    quantity: int
+    unit_price: Decimal
+    total: Decimal
+
+
+@dataclass
+class ReceiptData:
+    """Everything a receipt shows, independent of output format."""
+    checkout_id: int
+    receipt_number: str
+    date: str
+    payment_method: str
+    payment_status: str
+    transaction_id: str
+    customer_name: str
+    customer_email: str
+    phone: str
+    location: str
+    room_number: str
+    delivery_fee: Decimal
+    lines: list = field(default_factory=list)
+
+    @property
+    def subtotal(self):
+        return sum((line.total for line in self.lines), Decimal('0'))
+
+    @property
+    def total(self):
+        return self.subtotal + self.delivery_fee
+
+
+def load_receipt_data(checkout):
+    """
+    Build ReceiptData for a checkout.
+
+    Args:
+        checkout: Checkout instance or primary key. Instances that already
+            have orders prefetched (see receipt_queryset) cost no queries.
+
+    Returns:
+        ReceiptData
+    """
+    if not hasattr(checkout, '_prefetched_objects_cache') or 'orders' not in checkout._prefetched_objects_cache:
+        checkout = receipt_queryset().get(pk=getattr(checkout, 'pk', checkout))
+
+    user = checkout.user
+    return ReceiptData(
+        checkout_id=checkout.id,
+        receipt_number=f"MW{checkout.id:06d}",
+        date=checkout.created_at.strftime('%B %d, %Y %I:%M %p'),
+        payment_method=str(checkout.get_payment_method_display()),
+        payment_status=str(checkout.get_payment_status_display()).upper(),
+        transaction_id=checkout.transaction_id or '',
+        customer_name=user.get_full_name() or user.username,
+        customer_email=user.email,
+        phone=checkout.phone_number,
+        location=str(checkout.get_location_display() or ''),
+        room_number=checkout.room_number or '',
+        delivery_fee=Decimal(str(checkout.delivery_fee)),
+        lines=[
+            ReceiptLine(order.product.name, order.quantity, order.product.price, order.total_price)
+            for order in checkout.orders.all()
+        ],
+    )
+
+
+def receipt_queryset():
+    """Checkouts with the user, orders and products a receipt needs."""
+    from home.models import Checkout, Order
+    return Checkout.objects.select_related('user').prefetch_related(
+        Prefetch('orders', queryset=Order.objects.select_related('product').order_by('pk'))
+    )
+
+
+@lru_cache(maxsize=None)
+def _styles():
+    """Paragraph and table styles, built once per process."""
+    base = getSampleStyleSheet()
+    normal = ParagraphStyle(
+        'CustomNormal',
+        parent=base['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#2D3748'),
+        spaceAfter=6
+    )
+    heading = ParagraphStyle(
+        'CustomHeading',
+        parent=base['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#1A202C'),
+        spaceAfter=12,
+        fontName='Helvetica-Bold'
+    )
+    details = TableStyle([
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#4A5568')),
+        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#2D3748')),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ])
+    return {
+        'title': ParagraphStyle(
             'CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=base['Heading1'],
             fontSize=24,
             textColor=colors.HexColor('#D4AF37'),
             spaceAfter=30,
             alignment=TA_CENTER,
             fontName='Helvetica-Bold'
-        )
-        
-        self.heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#1A202C'),
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        )
-        
-        self.normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#2D3748'),
-            spaceAfter=6
-        )
-    
-    def _add_header(self):
-        """Add company header to receipt"""
-        # Company name
-        company_name = Paragraph(
-            "<b>MONTCLAIR WARDROBE</b>",
-            self.title_style
-        )
-        self.story.append(company_name)
-        
-        # Company details
-        company_info = Paragraph(
-            "Luxury Fashion Boutique<br/>"
-            "Lusaka, Zambia<br/>"
-            "Phone: +260 XXX XXX XXX<br/>"
-            "Email: info@montclairwardrobe.com",
-            ParagraphStyle(
-                'CompanyInfo',
-                parent=self.normal_style,
-                alignment=TA_CENTER,
-                fontSize=9,
-                textColor=colors.HexColor('#718096')
-            )
-        )
-        self.story.append(company_info)
-        self.story.append(Spacer(1, 0.3*inch))
-        
-        # Receipt title
-        receipt_title = Paragraph(
-            "<b>PAYMENT RECEIPT</b>",
-            ParagraphStyle(
-                'ReceiptTitle',
-                parent=self.heading_style,
-                alignment=TA_CENTER,
-                fontSize=16,
-                textColor=colors.HexColor('#D4AF37')
-            )
-        )
-        self.story.append(receipt_title)
-        self.story.append(Spacer(1, 0.2*inch))
-    
-    def _add_receipt_info(self):
-        """Add receipt information"""
-        # Receipt details
-        receipt_data = [
-            ['Receipt Number:', f"MW{self.checkout.id:06d}"],
-            ['Date:', self.checkout.created_at.strftime('%B %d, %Y %I:%M %p')],
-            ['Payment Method:', self.checkout.get_payment_method_display()],
-            ['Payment Status:', self.checkout.get_payment_status_display().upper()],
-        ]
-        
-        if self.checkout.transaction_id:
-            receipt_data.append(['Transaction ID:', self.checkout.transaction_id])
-        
-        receipt_table = Table(receipt_data, colWidths=[2*inch, 4*inch])
-        receipt_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#4A5568')),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#2D3748')),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        
-        self.story.append(receipt_table)
-        self.story.append(Spacer(1, 0.3*inch))
-    
-    def _add_customer_info(self):
-        """Add customer information"""
-        customer_heading = Paragraph("<b>Customer Information</b>", self.heading_style)
-        self.story.append(customer_heading)
-        
-        user = self.checkout.user
-        customer_data = [
-            ['Name:', user.get_full_name() or user.username],
-            ['Email:', user.email],
-            ['Phone:', self.checkout.phone_number],
-            ['Location:', self.checkout.get_location_display()],
-        ]
-        
-        if self.checkout.room_number:
-            customer_data.append(['Room Number:', self.checkout.room_number])
-        
-        customer_table = Table(customer_data, colWidths=[2*inch, 4*inch])
-        customer_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#4A5568')),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#2D3748')),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        
-        self.story.append(customer_table)
-        self.story.append(Spacer(1, 0.3*inch))
-    
-    def _add_order_items(self):
-        """Add order items table"""
-        items_heading = Paragraph("<b>Order Items</b>", self.heading_style)
-        self.story.append(items_heading)
-        
-        # Table header
-        items_data = [
-            ['Item', 'Quantity', 'Unit Price', 'Total']
-        ]
-        
-        # Add order items
-        orders = self.checkout.orders.all()
-        subtotal = 0
-        
-        for order in orders:
-            items_data.append([
-                order.product.name,
-                str(order.quantity),
-                f"ZMW {order.product.price:,.2f}",
-                f"ZMW {order.total_price:,.2f}"
-            ])
-            subtotal += order.total_price
-        
-        # Create table
-        items_table = Table(items_data, colWidths=[3*inch, 1*inch, 1.5*inch, 1.5*inch])
-        items_table.setStyle(TableStyle([
+        ),
+        'heading': heading,
+        'normal': normal,
+        'company': ParagraphStyle(
+            'CompanyInfo',
+            parent=normal,
+            alignment=TA_CENTER,
+            fontSize=9,
+            textColor=colors.HexColor('#718096')
+        ),
+        'receipt_title': ParagraphStyle(
+            'ReceiptTitle',
+            parent=heading,
+            alignment=TA_CENTER,
+            fontSize=16,
+            textColor=colors.HexColor('#D4AF37')
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=normal,
+            alignment=TA_CENTER,
+            fontSize=9,
+            textColor=colors.HexColor('#718096'),
+            spaceAfter=0
+        ),
+        'details_table': details,
+        'items_table': TableStyle([
             # Header style
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D4AF37')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1A202C')),
@@ -196,7 +175,7 @@ class ReceiptGenerator:
             ('FONTSIZE', (0, 0), (-1, 0), 11),
             ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
+
             # Body style
             ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
             ('FONTSIZE', (0, 1), (-1, -1), 10),
@@ -205,24 +184,12 @@ class ReceiptGenerator:
             ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
             ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
             ('TOPPADDING', (0, 1), (-1, -1), 8),
-            
+
             # Grid
             ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#E2E8F0')),
             ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#B8941F')),
-        ]))
-        
-        self.story.append(items_table)
-        self.story.append(Spacer(1, 0.2*inch))
-        
-        # Add totals
-        totals_data = [
-            ['', '', 'Subtotal:', f"ZMW {subtotal:,.2f}"],
-            ['', '', 'Delivery Fee:', f"ZMW {self.checkout.delivery_fee:,.2f}"],
-            ['', '', 'TOTAL:', f"ZMW {subtotal + self.checkout.delivery_fee:,.2f}"],
-        ]
-        
-        totals_table = Table(totals_data, colWidths=[3*inch, 1*inch, 1.5*inch, 1.5*inch])
-        totals_table.setStyle(TableStyle([
+        ]),
+        'totals_table': TableStyle([
             ('FONTNAME', (2, 0), (2, 1), 'Helvetica-Bold'),
             ('FONTNAME', (3, 0), (3, 1), 'Helvetica'),
             ('FONTNAME', (2, 2), (3, 2), 'Helvetica-Bold'),
@@ -235,61 +202,188 @@ class ReceiptGenerator:
             ('TOPPADDING', (2, 2), (3, 2), 12),
             ('BOTTOMPADDING', (2, 2), (3, 2), 12),
             ('LINEABOVE', (2, 2), (3, 2), 2, colors.HexColor('#D4AF37')),
-        ]))
-        
+        ]),
+    }
+
+
+class ReceiptGenerator:
+    """Render a ReceiptData as a PDF"""
+
+    def __init__(self, receipt):
+        """
+        Initialize receipt generator
+
+        Args:
+            receipt: ReceiptData, or a Checkout instance to load it from
+        """
+        if not isinstance(receipt, ReceiptData):
+            receipt = load_receipt_data(receipt)
+        self.receipt = receipt
+        self.styles = _styles()
+        self.story = []
+
+    def _details_table(self, rows):
+        table = Table(rows, colWidths=[2*inch, 4*inch])
+        table.setStyle(self.styles['details_table'])
+        return table
+
+    def _add_header(self):
+        """Add company header to receipt"""
+        self.story.append(Paragraph("<b>MONTCLAIR WARDROBE</b>", self.styles['title']))
+        self.story.append(Paragraph(
+            "Luxury Fashion Boutique<br/>"
+            "Lusaka, Zambia<br/>"
+            "Phone: +260 XXX XXX XXX<br/>"
+            "Email: info@montclairwardrobe.com",
+            self.styles['company']
+        ))
+        self.story.append(Spacer(1, 0.3*inch))
+        self.story.append(Paragraph("<b>PAYMENT RECEIPT</b>", self.styles['receipt_title']))
+        self.story.append(Spacer(1, 0.2*inch))
+
+    def _add_receipt_info(self):
+        """Add receipt information"""
+        receipt = self.receipt
+        rows = [
+            ['Receipt Number:', receipt.receipt_number],
+            ['Date:', receipt.date],
+            ['Payment Method:', receipt.payment_method],
+            ['Payment Status:', receipt.payment_status],
+        ]
+        if receipt.transaction_id:
+            rows.append(['Transaction ID:', receipt.transaction_id])
+
+        self.story.append(self._details_table(rows))
+        self.story.append(Spacer(1, 0.3*inch))
+
+    def _add_customer_info(self):
+        """Add customer information"""
+        receipt = self.receipt
+        self.story.append(Paragraph("<b>Customer Information</b>", self.styles['heading']))
+        rows = [
+            ['Name:', receipt.customer_name],
+            ['Email:', receipt.customer_email],
+            ['Phone:', receipt.phone],
+            ['Location:', receipt.location],
+        ]
+        if receipt.room_number:
+            rows.append(['Room Number:', receipt.room_number])
+
+        self.story.append(self._details_table(rows))
+        self.story.append(Spacer(1, 0.3*inch))
+
+    def _add_order_items(self):
+        """Add order items table"""
+        receipt = self.receipt
+        self.story.append(Paragraph("<b>Order Items</b>", self.styles['heading']))
+
+        items_data = [['Item', 'Quantity', 'Unit Price', 'Total']]
+        for line in receipt.lines:
+            items_data.append([
+                line.name,
+                str(line.quantity),
+                f"ZMW {line.unit_price:,.2f}",
+                f"ZMW {line.total:,.2f}"
+            ])
+
+        items_table = Table(items_data, colWidths=[3*inch, 1*inch, 1.5*inch, 1.5*inch])
+        items_table.setStyle(self.styles['items_table'])
+        self.story.append(items_table)
+        self.story.append(Spacer(1, 0.2*inch))
+
+        totals_data = [
+            ['', '', 'Subtotal:', f"ZMW {receipt.subtotal:,.2f}"],
+            ['', '', 'Delivery Fee:', f"ZMW {receipt.delivery_fee:,.2f}"],
+            ['', '', 'TOTAL:', f"ZMW {receipt.total:,.2f}"],
+        ]
+        totals_table = Table(totals_data, colWidths=[3*inch, 1*inch, 1.5*inch, 1.5*inch])
+        totals_table.setStyle(self.styles['totals_table'])
         self.story.append(totals_table)
         self.story.append(Spacer(1, 0.4*inch))
-    
+
     def _add_footer(self):
         """Add receipt footer"""
-        footer_text = Paragraph(
+        self.story.append(Paragraph(
             "<b>Thank you for shopping with Montclair Wardrobe!</b><br/>"
             "For any inquiries, please contact us at info@montclairwardrobe.com<br/>"
             "<i>This is a computer-generated receipt and does not require a signature.</i>",
-            ParagraphStyle(
-                'Footer',
-                parent=self.normal_style,
-                alignment=TA_CENTER,
-                fontSize=9,
-                textColor=colors.HexColor('#718096'),
-                spaceAfter=0
-            )
+            self.styles['footer']
+        ))
+
+    def write_pdf(self, fileobj):
+        """Render the PDF into a writable binary file object"""
+        doc = SimpleDocTemplate(
+            fileobj,
+            pagesize=letter,
+            rightMargin=0.75*inch,
+            leftMargin=0.75*inch,
+            topMargin=0.75*inch,
+            bottomMargin=0.75*inch
         )
-        self.story.append(footer_text)
-    
-    def generate(self):
-        """
-        Generate the PDF receipt
-        
-        Returns:
-            BytesIO: PDF file buffer
-        """
-        # Build receipt
+        self.story = []
         self._add_header()
         self._add_receipt_info()
         self._add_customer_info()
         self._add_order_items()
         self._add_footer()
-        
-        # Generate PDF
-        self.doc.build(self.story)
-        
-        # Get PDF value
-        pdf = self.buffer.getvalue()
-        self.buffer.close()
-        
-        return pdf
+        doc.build(self.story)
+
+    def generate_file(self):
+        """
+        Generate the PDF receipt into a spooled temporary file
+
+        Returns:
+            SpooledTemporaryFile: PDF file, positioned at the start
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        self.write_pdf(spool)
+        spool.seek(0)
+        return spool
+
+    def generate(self):
+        """
+        Generate the PDF receipt
+
+        Returns:
+            bytes: PDF content
+        """
+        with self.generate_file() as spool:
+            return spool.read()
+
+    def generate_html(self):
+        """
+        Generate HTML receipt for email or web display
+
+        Returns:
+            str: HTML content
+        """
+        return render_to_string('receipts/receipt_template.html', {
+            'receipt': self.receipt,
+            'receipt_number': self.receipt.receipt_number,
+        })
 
 
 def generate_receipt(checkout):
     """
     Convenience function to generate receipt
-    
+
     Args:
-        checkout: Checkout instance
-    
+        checkout: Checkout instance or ReceiptData
+
     Returns:
         bytes: PDF content
     """
-    generator = ReceiptGenerator(checkout)
-    return generator.generate()
+    return ReceiptGenerator(checkout).generate()
+
+
+def generate_receipt_html(checkout):
+    """
+    Generate HTML receipt
+
+    Args:
+        checkout: Checkout instance or ReceiptData
+
+    Returns:
+        str: HTML content
+    """
+    return ReceiptGenerator(checkout).generate_html()
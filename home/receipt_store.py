@@ -0,0 +1,64 @@
+"""
+Content-addressed storage for receipt PDFs.
+
+A receipt is a pure function of its checkout, orders and products. We hash
+the loaded receipt data and keep the rendered PDF in media storage under
+``receipts/<hash>.pdf``. Later requests only reload the data (two queries)
+and stream the stored file. A receipt is rendered again only when something
+it shows changes, because that produces a new hash.
+"""
+
+import dataclasses
+import hashlib
+import json
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from .receipt_generator import ReceiptData, ReceiptGenerator, load_receipt_data
+
+
+RECEIPT_DIR = 'receipts'
+# Bump when the receipt layout changes so stored PDFs are re-rendered
+RECEIPT_LAYOUT_VERSION = 1
+
+
+def receipt_fingerprint(receipt):
+    """
+    Hash everything the receipt shows.
+
+    Args:
+        receipt: ReceiptData, or a Checkout instance to load it from
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    if not isinstance(receipt, ReceiptData):
+        receipt = load_receipt_data(receipt)
+    payload = {'layout': RECEIPT_LAYOUT_VERSION, 'receipt': dataclasses.asdict(receipt)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def receipt_path(fingerprint):
+    return f'{RECEIPT_DIR}/{fingerprint}.pdf'
+
+
+def get_receipt_file(checkout):
+    """
+    Get the stored receipt for ``checkout``, rendering it first if needed.
+
+    Returns:
+        str: Storage path of the PDF
+    """
+    receipt = load_receipt_data(checkout)
+    path = receipt_path(receipt_fingerprint(receipt))
+    if not default_storage.exists(path):
+        # Storage may append a suffix if another worker won the race
+        with ReceiptGenerator(receipt).generate_file() as pdf:
+            path = default_storage.save(path, File(pdf))
+    return path
+
+
+def open_receipt(checkout):
+    """Open the stored receipt PDF for streaming."""
+    return default_storage.open(get_receipt_file(checkout), 'rb')
@@ -3,7 +3,7 @@ Reports generation module for Montclair Wardrobe
 Handles sales reports, analytics, and data exports
 """
 import csv
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from io import BytesIO
 from django.db.models import Sum, Count, Avg, Q
 from django.http import HttpResponse
@@ -13,7 +13,26 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-from home.models import Sale, Order, Checkout, Product
+from home.models import DailySalesRollup, Sale, Order, Checkout, Product
+from home.services import SalesRollupService
+
+
+def _day_bounds(start_date, end_date):
+    """
+    Turn report bounds into whole days for the daily rollups.
+
+    Returns None when a datetime bound falls inside a day; only the raw
+    sales can answer that exactly.
+    """
+    if isinstance(start_date, datetime):
+        if start_date.time() != time.min:
+            return None
+        start_date = start_date.date()
+    if isinstance(end_date, datetime):
+        if end_date.time() < time(23, 59, 59):
+            return None
+        end_date = end_date.date()
+    return start_date, end_date
 
 
 class ReportGenerator:
@@ -31,18 +50,31 @@ class ReportGenerator:
         if end_date:
             sales = sales.filter(sale_date__lte=end_date)
         
-        summary = sales.aggregate(
-            total_sales=Sum('total_amount'),
-            total_orders=Count('id'),
-            total_quantity=Sum('quantity'),
-            average_order=Avg('total_amount')
-        )
+        # Whole-day ranges are totalled from the daily rollups; ``sales`` stays
+        # lazy for listings and CSV export
+        days = _day_bounds(start_date, end_date)
+        if days is None:
+            summary = sales.aggregate(
+                total_sales=Sum('total_amount'),
+                total_orders=Count('id'),
+                total_quantity=Sum('quantity'),
+            )
+        else:
+            rollups = SalesRollupService.queryset(*days, [DailySalesRollup.SALE_STATUS])
+            if seller:
+                rollups = rollups.filter(seller=seller)
+            summary = rollups.aggregate(
+                total_sales=Sum('revenue'),
+                total_orders=Sum('order_count'),
+                total_quantity=Sum('units'),
+            )
+        total_orders = summary['total_orders'] or 0
         
         return {
             'total_sales': summary['total_sales'] or 0,
-            'total_orders': summary['total_orders'] or 0,
+            'total_orders': total_orders,
             'total_quantity': summary['total_quantity'] or 0,
-            'average_order': summary['average_order'] or 0,
+            'average_order': (summary['total_sales'] / total_orders) if total_orders else 0,
             'sales': sales
         }
     
@@ -68,17 +100,24 @@ class ReportGenerator:
     @staticmethod
     def get_product_performance(start_date=None, end_date=None):
         """Get product performance metrics"""
-        sales = Sale.objects.all()
-        
-        if start_date:
-            sales = sales.filter(sale_date__gte=start_date)
-        if end_date:
-            sales = sales.filter(sale_date__lte=end_date)
-        
-        products = sales.values('product__name', 'product__id').annotate(
-            total_sold=Sum('quantity'),
-            total_revenue=Sum('total_amount'),
-            order_count=Count('id')
+        days = _day_bounds(start_date, end_date)
+        if days is None:
+            sales = Sale.objects.all()
+            if start_date:
+                sales = sales.filter(sale_date__gte=start_date)
+            if end_date:
+                sales = sales.filter(sale_date__lte=end_date)
+            return sales.values('product__name', 'product__id').annotate(
+                total_sold=Sum('quantity'),
+                total_revenue=Sum('total_amount'),
+                order_count=Count('id')
+            ).order_by('-total_revenue')
+        
+        rollups = SalesRollupService.queryset(*days, [DailySalesRollup.SALE_STATUS])
+        products = rollups.values('product__name', 'product__id').annotate(
+            total_sold=Sum('units'),
+            total_revenue=Sum('revenue'),
+            order_count=Sum('order_count')
         ).order_by('-total_revenue')
         
         return products
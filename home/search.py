@@ -0,0 +1,263 @@
+"""
+Full-text search for the product catalog.
+
+Every product keeps a ``search_document`` column (name, description and
+category name) that is rebuilt whenever the product is saved. The backend
+for the active database searches that column through a full-text index:
+
+- PostgreSQL: GIN index on ``to_tsvector('simple', search_document)``
+- MySQL: FULLTEXT index on ``search_document``
+- anything else (SQLite in tests): an in-process inverted index
+
+All backends match every query term as a prefix, and annotate results with
+an integer ``search_rank`` (higher is better) so ranked results can be
+keyset-paginated like any other sort key.
+"""
+
+import bisect
+import re
+import threading
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Case, FloatField, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+
+TOKEN_RE = re.compile(r'\w+')
+# Backend scores are floats; scale them to integers so cursor comparisons
+# are exact.
+RANK_SCALE = 1000000
+# Name tokens count more than description or category tokens
+NAME_WEIGHT = 3
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def build_search_document(product):
+    """Build the text indexed for a product. The name is always the first line."""
+    category = product.category.name if product.category_id else ''
+    return '\n'.join([product.name or '', product.description or '', category])
+
+
+class SearchBackend:
+    """Base class for product search backends."""
+
+    def search(self, queryset, query):
+        """
+        Filter ``queryset`` to products matching every term of ``query``.
+
+        Returns:
+            QuerySet: Matches annotated with an integer ``search_rank``
+        """
+        raise NotImplementedError
+
+    def no_matches(self, queryset):
+        """An empty result that still carries ``search_rank`` for sorting."""
+        return queryset.none().annotate(search_rank=Value(0, output_field=IntegerField()))
+
+    def index_product(self, product):
+        """Update the index after ``product`` was saved."""
+
+    def remove_product(self, product_id):
+        """Drop a deleted product from the index."""
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Prefix tsquery against the GIN-indexed tsvector of search_document."""
+
+    config = 'simple'
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        terms = tokenize(query)
+        if not terms:
+            return self.no_matches(queryset)
+        vector = SearchVector('search_document', config=self.config)
+        search_query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            config=self.config,
+            search_type='raw',
+        )
+        return queryset.annotate(
+            search_vector=vector,
+            search_rank=Cast(SearchRank(vector, search_query) * RANK_SCALE, IntegerField()),
+        ).filter(search_vector=search_query)
+
+
+class MySQLSearchBackend(SearchBackend):
+    """Boolean-mode MATCH ... AGAINST on the FULLTEXT-indexed search_document."""
+
+    MATCH = 'MATCH (search_document) AGAINST (%s IN BOOLEAN MODE)'
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return self.no_matches(queryset)
+        boolean_query = ' '.join(f'+{term}*' for term in terms)
+        return queryset.annotate(
+            search_match=RawSQL(self.MATCH, (boolean_query,), output_field=FloatField()),
+            search_rank=RawSQL(
+                f'CAST({self.MATCH} * {RANK_SCALE} AS SIGNED)',
+                (boolean_query,),
+                output_field=IntegerField(),
+            ),
+        ).filter(search_match__gt=0)
+
+
+class InvertedIndexSearchBackend(SearchBackend):
+    """
+    In-process inverted index over search_document.
+
+    Used where the database has no full-text support (SQLite). Prefix lookups
+    bisect a sorted vocabulary, so a search touches only the matching
+    postings rather than every product. The index is built lazily from the
+    database and kept current by the Product save/delete signals of this
+    process only, so it is not suitable for multi-process deployments.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._postings = {}       # token -> {product_id: weight}
+        self._documents = {}      # product_id -> Counter of token weights
+        self._vocabulary = []     # sorted tokens
+
+    def _weights(self, document):
+        name, _sep, rest = (document or '').partition('\n')
+        weights = Counter()
+        for token in tokenize(name):
+            weights[token] += NAME_WEIGHT
+        for token in tokenize(rest):
+            weights[token] += 1
+        return weights
+
+    def _add(self, product_id, document):
+        self._discard(product_id)
+        weights = self._weights(document)
+        self._documents[product_id] = weights
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+            postings[product_id] = weight
+
+    def _discard(self, product_id):
+        for token in self._documents.pop(product_id, ()):
+            postings = self._postings[token]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        from home.models import Product
+        for product_id, document in Product.objects.values_list('pk', 'search_document').iterator():
+            self._add(product_id, document)
+        self._built = True
+
+    def _prefix_scores(self, prefix):
+        scores = Counter()
+        position = bisect.bisect_left(self._vocabulary, prefix)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(prefix):
+            for product_id, weight in self._postings[self._vocabulary[position]].items():
+                scores[product_id] += weight
+            position += 1
+        return scores
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return self.no_matches(queryset)
+        with self._lock:
+            self._ensure_built()
+            scores = None
+            for term in terms:
+                term_scores = self._prefix_scores(term)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = Counter({
+                        product_id: score + term_scores[product_id]
+                        for product_id, score in scores.items()
+                        if product_id in term_scores
+                    })
+                if not scores:
+                    return self.no_matches(queryset)
+
+        return queryset.filter(pk__in=list(scores)).annotate(
+            search_rank=Case(
+                *[When(pk=product_id, then=Value(score)) for product_id, score in scores.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+    def index_product(self, product):
+        with self._lock:
+            if self._built:
+                self._add(product.pk, product.search_document)
+
+    def remove_product(self, product_id):
+        with self._lock:
+            self._discard(product_id)
+
+
+_backends = {}
+
+
+def get_search_backend():
+    """Get the search backend for the current database vendor."""
+    vendor = connection.vendor
+    if vendor not in _backends:
+        if vendor == 'postgresql':
+            _backends[vendor] = PostgresSearchBackend()
+        elif vendor == 'mysql':
+            _backends[vendor] = MySQLSearchBackend()
+        else:
+            _backends[vendor] = InvertedIndexSearchBackend()
+    return _backends[vendor]
+
+
+def search_products(queryset, query):
+    """Filter and rank ``queryset`` by a free-text ``query``."""
+    return get_search_backend().search(queryset, query)
+
+
+def refresh_search_documents(queryset, batch_size=500):
+    """
+    Rebuild ``search_document`` for the given products.
+
+    Used when something outside the product (e.g. its category name) changed.
+
+    Returns:
+        int: Number of products refreshed
+    """
+    backend = get_search_backend()
+    refreshed = 0
+    batch = []
+    for product in queryset.select_related('category').iterator(chunk_size=batch_size):
+        product.search_document = build_search_document(product)
+        batch.append(product)
+        if len(batch) >= batch_size:
+            refreshed += _write_search_documents(batch, backend)
+            batch = []
+    if batch:
+        refreshed += _write_search_documents(batch, backend)
+    return refreshed
+
+
+def _write_search_documents(products, backend):
+    from home.models import Product
+    Product.objects.bulk_update(products, ['search_document'])
+    for product in products:
+        backend.index_product(product)
+    return len(products)
@@ -0,0 +1,646 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, When, F, Q, FloatField, IntegerField, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncDate
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from home import page_cache, stock_ledger
+from home.models import (
+    Product, Checkout, DailySalesRollup, Order, Sale, Review, StockHistory, StockReservation,
+)
+
+
+class StockService:
+    """
+    Service class for stock mutations.
+
+    Stock is never read, changed and saved back from Python. Every change is
+    one conditional UPDATE built from F() expressions, and success is decided
+    by the number of rows the UPDATE matched, so concurrent workers cannot
+    oversell and no row lock is held while Python code runs.
+    """
+
+    @staticmethod
+    def decrement(product, quantity, change_type='sale', reason=None, changed_by=None, order=None):
+        """
+        Decrement stock for a single active product.
+
+        Runs ``UPDATE ... SET stock = stock - n WHERE stock >= n``.
+
+        Returns:
+            bool: True if the stock was decremented
+        """
+        orders = {product.pk: order} if order else None
+        return StockService.decrement_many(
+            [(product, quantity)], change_type, reason, changed_by, orders
+        )
+
+    @staticmethod
+    def decrement_many(items, change_type='sale', reason=None, changed_by=None, orders=None):
+        """
+        Decrement stock for several active products in one UPDATE.
+
+        Either every product is decremented or none is.
+
+        Args:
+            items: Iterable of (product, quantity) pairs
+            change_type: StockHistory change type to record
+            reason: Optional reason for the change
+            changed_by: User who made the change
+            orders: Optional dictionary of product id to related Order
+
+        Returns:
+            bool: True if every product had enough stock
+        """
+        return StockService._apply(
+            items, -1, change_type, reason, changed_by, orders, require_active=True
+        )
+
+    @staticmethod
+    def increment(product, quantity, change_type='restock', reason=None, changed_by=None, order=None):
+        """
+        Increment stock for a single product.
+
+        Returns:
+            bool: True if the stock was incremented
+        """
+        orders = {product.pk: order} if order else None
+        return StockService.increment_many(
+            [(product, quantity)], change_type, reason, changed_by, orders
+        )
+
+    @staticmethod
+    def increment_many(items, change_type='restock', reason=None, changed_by=None, orders=None):
+        """
+        Increment stock for several products in one UPDATE.
+
+        Args:
+            items: Iterable of (product, quantity) pairs
+            change_type: StockHistory change type to record
+            reason: Optional reason for the change
+            changed_by: User who made the change
+            orders: Optional dictionary of product id to related Order
+
+        Returns:
+            bool: True if every product was updated
+        """
+        for product, quantity in items:
+            if quantity < 0:
+                raise ValueError(_(f"Cannot increase stock by a negative quantity: {quantity}"))
+        return StockService._apply(
+            items, 1, change_type, reason, changed_by, orders, require_active=False
+        )
+
+    @staticmethod
+    def adjust(product, delta, reason=None, changed_by=None, change_type='adjustment'):
+        """
+        Apply a manual stock adjustment of ``delta`` units.
+
+        Negative adjustments only succeed if enough stock is left, whatever
+        the product's status.
+
+        Returns:
+            bool: True if the adjustment was applied
+        """
+        if delta == 0:
+            return True
+        sign = 1 if delta > 0 else -1
+        return StockService._apply(
+            [(product, abs(delta))], sign, change_type, reason, changed_by, None, require_active=False
+        )
+
+    @staticmethod
+    def place_orders(orders, reason=None, changed_by=None):
+        """
+        Insert new orders and take their stock, without Order.save().
+
+        Orders are written with one bulk_create and every line is decremented
+        in one conditional UPDATE, with one linked StockHistory row each.
+        Callers must run this inside a transaction so a shortage also undoes
+        the inserted orders.
+
+        Args:
+            orders: Unsaved Order instances with product and quantity set
+            reason: Optional reason for the change
+            changed_by: User who made the change
+
+        Returns:
+            list: The saved orders
+
+        Raises:
+            ValueError: If a product does not have enough stock
+        """
+        for order in orders:
+            order.total_price = order.calculate_total()
+        orders = Order.objects.bulk_create(orders)
+        if any(order.pk is None for order in orders):
+            # Backends without RETURNING (MySQL) don't set primary keys.
+            checkout_ids = {order.checkout_id for order in orders}
+            if None in checkout_ids or len(checkout_ids) != 1:
+                raise ValueError(_("Bulk order placement needs a single checkout on this database."))
+            order_ids = dict(
+                Order.objects.filter(checkout_id=checkout_ids.pop()).values_list('product_id', 'pk')
+            )
+            for order in orders:
+                order.pk = order_ids[order.product_id]
+
+        if not StockService.decrement_many(
+            [(order.product, order.quantity) for order in orders],
+            reason=reason,
+            changed_by=changed_by,
+            orders={order.product_id: order for order in orders},
+        ):
+            raise ValueError(_("Some items in your cart are no longer available in the requested quantity."))
+
+        for order in orders:
+            order._remember_values()
+        return orders
+
+    @staticmethod
+    def apply_order_quantity(order, previous_quantity):
+        """
+        Move stock for an order whose quantity went from ``previous_quantity``
+        to ``order.quantity`` (0 for a new order).
+
+        Raises:
+            ValueError: If the product cannot cover an increase
+        """
+        delta = order.quantity - previous_quantity
+        if delta > 0:
+            order.product.reduce_stock(delta, order=order)
+        elif delta < 0:
+            StockService.increment(order.product, -delta, change_type='return', order=order)
+
+    @staticmethod
+    def _apply(items, sign, change_type, reason, changed_by, orders, require_active):
+        merged = {}
+        for product, quantity in items:
+            if product.pk in merged:
+                merged[product.pk] = (merged[product.pk][0], merged[product.pk][1] + quantity)
+            else:
+                merged[product.pk] = (product, quantity)
+        lines = [line for line in merged.values() if line[1]]
+        if not lines:
+            return True
+
+        condition = Q()
+        for product, quantity in lines:
+            if sign < 0:
+                condition |= Q(pk=product.pk, stock__gte=quantity)
+            else:
+                condition |= Q(pk=product.pk)
+        queryset = Product.objects.filter(condition)
+        if require_active:
+            queryset = queryset.filter(status='active')
+
+        if len(lines) == 1:
+            stock = F('stock') + sign * lines[0][1]
+        else:
+            stock = Case(
+                *[When(pk=product.pk, then=F('stock') + sign * quantity) for product, quantity in lines],
+                output_field=IntegerField(),
+            )
+
+        with transaction.atomic():
+            if queryset.update(stock=stock) != len(lines):
+                transaction.set_rollback(True)
+                return False
+
+            orders = orders or {}
+            stock_ledger.record([
+                StockHistory(
+                    product=product,
+                    change_type=change_type,
+                    quantity_change=sign * quantity,
+                    stock_before=product.stock,
+                    stock_after=max(0, product.stock + sign * quantity),
+                    reason=reason,
+                    changed_by=changed_by,
+                    order=orders.get(product.pk),
+                )
+                for product, quantity in lines
+            ])
+
+        # Cached listings may show a count up to PAGE_CACHE_TIMEOUT old, but
+        # going in or out of stock must show at once. UPDATEs send no
+        # post_save, so bump the catalog version here when that happens.
+        crossed_zero = False
+        for product, quantity in lines:
+            stock_after = max(0, product.stock + sign * quantity)
+            crossed_zero |= (product.stock > 0) != (stock_after > 0)
+            product.stock = stock_after
+        if crossed_zero:
+            page_cache.bump_version(page_cache.CATALOG)
+        return True
+
+
+class SalesRollupService:
+    """
+    Service class for the DailySalesRollup fact table.
+
+    Order and sale writes are turned into per (date, product, status)
+    deltas. Each batch of deltas costs one SELECT, one bulk_update and one
+    bulk_create, whatever the number of lines. Reports then sum at most one
+    row per product, day and status instead of scanning orders.
+    """
+
+    @staticmethod
+    def queryset(date_from=None, date_to=None, statuses=None):
+        """Rollup rows between two dates (inclusive), optionally for some statuses."""
+        rows = DailySalesRollup.objects.all()
+        if date_from:
+            rows = rows.filter(date__gte=date_from)
+        if date_to:
+            rows = rows.filter(date__lte=date_to)
+        if statuses is not None:
+            rows = rows.filter(status__in=statuses)
+        return rows
+
+    @staticmethod
+    def order_statuses():
+        return Order.StatusChoices.values
+
+    @staticmethod
+    def record(orders=(), sales=(), sign=1):
+        """
+        Add (``sign=1``) or remove (``sign=-1``) orders and sales.
+
+        Removals use only ids, so they also work while the product is being
+        deleted.
+        """
+        facts = [
+            SalesRollupService._order_fact(order, SalesRollupService._current(order), sign)
+            for order in orders
+        ]
+        facts += [
+            (
+                timezone.localdate(sale.sale_date), sale.product_id, DailySalesRollup.SALE_STATUS,
+                sign * sale.total_amount, sign * sale.quantity, sign,
+                sale.product if sign > 0 else None,
+            )
+            for sale in sales
+        ]
+        SalesRollupService._apply(facts)
+
+    @staticmethod
+    def record_order_change(order, previous):
+        """
+        Move an order's figures from its ``previous`` stored values (None for
+        a new order) to its current ones.
+        """
+        current = SalesRollupService._current(order)
+        if previous == current:
+            return
+        facts = [SalesRollupService._order_fact(order, current, 1)]
+        if previous is not None:
+            facts.append(SalesRollupService._order_fact(order, previous, -1))
+        SalesRollupService._apply(facts)
+
+    @staticmethod
+    def move_status(orders, status, **fields):
+        """
+        Set ``status`` on every order in a queryset and move their rollup
+        figures with it, in one transaction.
+
+        Use this instead of ``orders.update(status=...)``, which skips
+        Order.save() and would leave the rollups on the old status.
+
+        Args:
+            orders: Order queryset
+            status: New status
+            **fields: Other columns to set in the same UPDATE
+
+        Returns:
+            int: Number of orders moved
+        """
+        with transaction.atomic():
+            moving = list(
+                orders.exclude(status=status)
+                .select_related('product')
+                .select_for_update(of=('self',))
+            )
+            if not moving:
+                return 0
+            Order.objects.filter(pk__in=[order.pk for order in moving]).update(status=status, **fields)
+            facts = []
+            for order in moving:
+                previous = SalesRollupService._current(order)
+                facts.append(SalesRollupService._order_fact(order, previous, -1))
+                facts.append(SalesRollupService._order_fact(order, {**previous, 'status': status}, 1))
+            SalesRollupService._apply(facts)
+        return len(moving)
+
+    @staticmethod
+    def rebuild(date_from=None, date_to=None):
+        """
+        Recompute the rollups between two dates (inclusive) from Order and
+        Sale rows.
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        orders = Order.objects.all()
+        sales = Sale.objects.all()
+        if date_from:
+            orders = orders.filter(created_at__date__gte=date_from)
+            sales = sales.filter(sale_date__date__gte=date_from)
+        if date_to:
+            orders = orders.filter(created_at__date__lte=date_to)
+            sales = sales.filter(sale_date__date__lte=date_to)
+
+        dimensions = ('day', 'product_id', 'product__category_id', 'product__seller_id')
+        order_rows = orders.order_by().annotate(day=TruncDate('created_at')).values(
+            *dimensions, 'status'
+        ).annotate(revenue=Sum('total_price'), units=Sum('quantity'), count=Count('id'))
+        sale_rows = sales.order_by().annotate(day=TruncDate('sale_date')).values(
+            *dimensions
+        ).annotate(revenue=Sum('total_amount'), units=Sum('quantity'), count=Count('id'))
+
+        rollups = [
+            DailySalesRollup(
+                date=row['day'],
+                product_id=row['product_id'],
+                category_id=row['product__category_id'],
+                seller_id=row['product__seller_id'],
+                status=row.get('status', DailySalesRollup.SALE_STATUS),
+                revenue=row['revenue'] or Decimal('0'),
+                units=row['units'] or 0,
+                order_count=row['count'],
+            )
+            for row in [*order_rows, *sale_rows]
+        ]
+        with transaction.atomic():
+            SalesRollupService.queryset(date_from, date_to).delete()
+            DailySalesRollup.objects.bulk_create(rollups, batch_size=1000)
+        return len(rollups)
+
+    @staticmethod
+    def _current(order):
+        return {name: getattr(order, name) for name in Order.TRACKED_FIELDS}
+
+    @staticmethod
+    def _order_fact(order, values, sign):
+        return (
+            timezone.localdate(values['created_at']), order.product_id, values['status'],
+            sign * values['total_price'], sign * values['quantity'], sign,
+            order.product if sign > 0 else None,
+        )
+
+    @staticmethod
+    def _apply(facts, retry=True):
+        deltas = {}
+        for day, product_id, status, revenue, units, count, product in facts:
+            delta = deltas.setdefault((day, product_id, status), [Decimal('0'), 0, 0, None])
+            delta[0] += revenue
+            delta[1] += units
+            delta[2] += count
+            delta[3] = delta[3] or product
+        deltas = {key: delta for key, delta in deltas.items() if any(delta[:3])}
+        if not deltas:
+            return
+
+        condition = Q()
+        for day, product_id, status in deltas:
+            condition |= Q(date=day, product_id=product_id, status=status)
+
+        with transaction.atomic():
+            existing = {
+                (row.date, row.product_id, row.status): row
+                for row in DailySalesRollup.objects.select_for_update().filter(condition)
+            }
+            to_update, to_create = [], []
+            for key, (revenue, units, count, product) in deltas.items():
+                row = existing.get(key)
+                if row is not None:
+                    row.revenue = F('revenue') + revenue
+                    row.units = F('units') + units
+                    row.order_count = F('order_count') + count
+                    to_update.append(row)
+                elif product is not None and count > 0:
+                    # Removals never create rows; rebuild_sales_rollup fixes any gap
+                    to_create.append(DailySalesRollup(
+                        date=key[0],
+                        product_id=key[1],
+                        category_id=product.category_id,
+                        seller_id=product.seller_id,
+                        status=key[2],
+                        revenue=revenue,
+                        units=units,
+                        order_count=count,
+                    ))
+            DailySalesRollup.objects.bulk_update(to_update, ['revenue', 'units', 'order_count'])
+            try:
+                with transaction.atomic():
+                    DailySalesRollup.objects.bulk_create(to_create)
+            except IntegrityError:
+                if not retry:
+                    raise
+                # A concurrent writer created one of these rows first; the
+                # second pass turns those into updates.
+                SalesRollupService._apply([
+                    (row.date, row.product_id, row.status, row.revenue, row.units, row.order_count,
+                     deltas[(row.date, row.product_id, row.status)][3])
+                    for row in to_create
+                ], retry=False)
+
+
+class CheckoutService:
+    """
+    Service class for turning a user's cart into a checkout.
+    """
+
+    @staticmethod
+    def place_order(user, checkout_fields, payment_fields):
+        """
+        Convert the user's cart into a checkout, payment, orders and sales.
+
+        Everything runs inside one transaction. Orders are placed through
+        StockService.place_orders, which decrements every line in a single
+        conditional UPDATE. Orders, sales and stock history are written with
+        bulk_create, so the number of queries does not grow with the cart.
+
+        Args:
+            user: User placing the order
+            checkout_fields: Dictionary of Checkout field values
+            payment_fields: Dictionary of Payment field values
+
+        Returns:
+            Checkout instance
+
+        Raises:
+            ValueError: If the cart is empty or a product cannot be sold
+        """
+        from cart.models import Cart
+        from payment.models import Payment
+
+        with transaction.atomic(), stock_ledger.batch():
+            cart_items = list(Cart.objects.filter(user=user).select_related('product'))
+            if not cart_items:
+                raise ValueError(_("Your cart is empty."))
+
+            for item in cart_items:
+                product = item.product
+                if product.status != "active":
+                    raise ValueError(_(f"Cannot reduce stock for {product.name}. Status is '{product.status}', must be 'active'."))
+                if item.quantity > product.stock:
+                    raise ValueError(_(f"Insufficient stock for {product.name}. Available: {product.stock}, Requested: {item.quantity}"))
+
+            checkout = Checkout.objects.create(user=user, **checkout_fields)
+            Payment.objects.create(user=user, **payment_fields)
+
+            # The stock check above may be stale by now; the conditional
+            # UPDATE in place_orders is what actually guards against overselling.
+            orders = StockService.place_orders([
+                Order(user=user, product=item.product, quantity=item.quantity, checkout=checkout)
+                for item in cart_items
+            ])
+
+            sales = Sale.objects.bulk_create([
+                Sale(
+                    product=item.product,
+                    seller_id=item.product.seller_id,
+                    buyer=user,
+                    total_amount=item.get_total_price(),
+                    quantity=item.quantity,
+                )
+                for item in cart_items
+            ])
+
+            # bulk_create sends no signals, so the rollups are fed here
+            SalesRollupService.record(orders=orders, sales=sales)
+
+            # Stock is now sold, so the holds taken at reservation time go.
+            StockReservation.complete_for_user(user, [item.product_id for item in cart_items])
+
+            Cart.objects.filter(user=user).delete()
+
+        return checkout
+
+
+class ReviewStatsService:
+    """
+    Service class for product review statistics.
+
+    Every product carries denormalized rating columns (rating_avg,
+    rating_count, rating_verified_count and rating_1_count..rating_5_count).
+    They are adjusted with F() expressions whenever a review is written or
+    deleted, so pages that show ratings never aggregate the reviews table.
+    rebuild() recomputes them from scratch to repair drift.
+    """
+
+    STARS = range(1, 6)
+
+    @staticmethod
+    def _aggregates():
+        aggregates = {
+            'rating_count': Count('id'),
+            'rating_verified_count': Count('id', filter=Q(is_verified_purchase=True)),
+        }
+        for star in ReviewStatsService.STARS:
+            aggregates[f'rating_{star}_count'] = Count('id', filter=Q(rating=star))
+        return aggregates
+
+    @staticmethod
+    def _average_expression():
+        # Computed from the star columns so it always agrees with them.
+        weighted = sum(star * F(f'rating_{star}_count') for star in ReviewStatsService.STARS)
+        return Coalesce(
+            Cast(weighted, FloatField()) / NullIf(F('rating_count'), 0),
+            Value(0.0),
+        )
+
+    @staticmethod
+    def review_added(review):
+        """Add a newly created review to its product's rating columns."""
+        ReviewStatsService._apply(review.product_id, review.rating, review.is_verified_purchase, 1)
+
+    @staticmethod
+    def review_removed(review):
+        """Remove a deleted review from its product's rating columns."""
+        ReviewStatsService._apply(review.product_id, review.rating, review.is_verified_purchase, -1)
+
+    @staticmethod
+    def _apply(product_id, rating, is_verified, sign):
+        counters = {
+            'rating_count': F('rating_count') + sign,
+            f'rating_{rating}_count': F(f'rating_{rating}_count') + sign,
+        }
+        if is_verified:
+            counters['rating_verified_count'] = F('rating_verified_count') + sign
+
+        with transaction.atomic():
+            queryset = Product.objects.filter(pk=product_id)
+            if sign < 0:
+                # Never drive a counter below zero if it has already drifted
+                queryset = queryset.filter(**{
+                    f'{field}__gt': 0 for field in counters
+                })
+            if queryset.update(**counters):
+                # Separate statement: MySQL evaluates SET clauses left to right.
+                Product.objects.filter(pk=product_id).update(
+                    rating_avg=ReviewStatsService._average_expression()
+                )
+
+    @staticmethod
+    def rebuild(queryset=None, batch_size=500):
+        """
+        Recompute the rating columns from the reviews table.
+
+        Args:
+            queryset: Optional Product queryset to limit the rebuild
+            batch_size: Number of products written per bulk_update
+
+        Returns:
+            int: Number of products rebuilt
+        """
+        if queryset is None:
+            queryset = Product.objects.all()
+        fields = list(ReviewStatsService._aggregates())
+
+        rows = {
+            row.pop('product'): row
+            for row in Review.objects.filter(product__in=queryset.values('pk'))
+            .order_by()
+            .values('product')
+            .annotate(**ReviewStatsService._aggregates())
+        }
+
+        products = []
+        for product in queryset.only('pk').iterator(chunk_size=batch_size):
+            row = rows.get(product.pk, {})
+            for field in fields:
+                setattr(product, field, row.get(field, 0))
+            total = row.get('rating_count', 0)
+            weighted = sum(star * row.get(f'rating_{star}_count', 0) for star in ReviewStatsService.STARS)
+            product.rating_avg = weighted / total if total else 0
+            products.append(product)
+
+        Product.objects.bulk_update(products, fields + ['rating_avg'], batch_size=batch_size)
+        return len(products)
+
+    @staticmethod
+    def for_product(product):
+        """
+        Get review statistics for a product from its rating columns.
+
+        Returns:
+            dict: average_rating, total_reviews, verified_count and
+            distribution (star -> {'count', 'percentage'})
+        """
+        total = product.rating_count
+        distribution = {}
+        for star in ReviewStatsService.STARS:
+            count = getattr(product, f'rating_{star}_count')
+            percentage = (count / total * 100) if total > 0 else 0
+            distribution[star] = {
+                'count': count,
+                'percentage': round(percentage, 1)
+            }
+        return {
+            'average_rating': round(product.rating_avg or 0, 1),
+            'total_reviews': total,
+            'verified_count': product.rating_verified_count,
+            'distribution': distribution,
+        }
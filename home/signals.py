@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+import logging
+
+from django.db.models.signals import post_save, post_delete
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.dispatch import receiver
-from .models import Profile
+from .models import Category, Checkout, Order, PlatformGuide, Product, Profile, Review, Sale
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=User)
 def save_profile(sender, instance, created, **kwargs):
@@ -20,3 +25,122 @@ def save_profile(sender, instance, created, **kwargs):
                 instance.profile.save()
         except Exception as e:
             print(f"Profile save error in signal: {e}")
+
+
+@receiver(post_save, sender=Review)
+def update_rating_summary_on_save(sender, instance, created, **kwargs):
+    from .services import ReviewStatsService
+    if created:
+        ReviewStatsService.review_added(instance)
+    else:
+        # Edited reviews may have changed rating, verification or product
+        product_ids = {instance.product_id, getattr(instance, '_loaded_product_id', instance.product_id)}
+        ReviewStatsService.rebuild(Product.objects.filter(pk__in=product_ids))
+    instance._loaded_product_id = instance.product_id
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_summary_on_delete(sender, instance, **kwargs):
+    from .services import ReviewStatsService
+    ReviewStatsService.review_removed(instance)
+
+
+@receiver(post_save, sender=Product)
+def update_search_index_on_save(sender, instance, update_fields=None, **kwargs):
+    from .search import get_search_backend
+    from .suggest import mark_catalog_changed
+    if update_fields is None or Product.SEARCH_FIELDS & update_fields:
+        get_search_backend().index_product(instance)
+    # Suggestions list active, approved products by name
+    if update_fields is None or {'name', 'status', 'approval_status'} & update_fields:
+        mark_catalog_changed()
+
+
+@receiver(post_delete, sender=Product)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    from .search import get_search_backend
+    from .suggest import mark_catalog_changed
+    get_search_backend().remove_product(instance.pk)
+    mark_catalog_changed()
+
+
+@receiver(post_save, sender=Category)
+def refresh_search_documents_on_category_save(sender, instance, created, update_fields=None, **kwargs):
+    from .categories import invalidate_category_nav
+    from .suggest import mark_catalog_changed
+    invalidate_category_nav()
+    renamed = (
+        (update_fields is None or 'name' in update_fields)
+        and getattr(instance, '_loaded_name', None) != instance.name
+    )
+    instance._loaded_name = instance.name
+    if not (created or renamed):
+        return
+    # Category names are part of every product's search document
+    if not created:
+        from .search import refresh_search_documents
+        refresh_search_documents(instance.products.all())
+    mark_catalog_changed()
+
+
+@receiver(post_delete, sender=Category)
+def update_suggestions_on_category_delete(sender, instance, **kwargs):
+    from .categories import invalidate_category_nav
+    from .suggest import mark_catalog_changed
+    invalidate_category_nav()
+    mark_catalog_changed()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_catalog_pages(sender, **kwargs):
+    from .page_cache import CATALOG, bump_version
+    bump_version(CATALOG)
+
+
+@receiver(post_save, sender=PlatformGuide)
+@receiver(post_delete, sender=PlatformGuide)
+def invalidate_guide_pages(sender, **kwargs):
+    from .page_cache import GUIDES, bump_version
+    bump_version(GUIDES)
+
+
+@receiver(post_save, sender=Checkout)
+def render_receipt_on_payment(sender, instance, **kwargs):
+    if instance.payment_status != Checkout.PaymentStatusChoices.COMPLETED:
+        return
+
+    def render():
+        from .receipt_store import get_receipt_file
+        try:
+            get_receipt_file(instance)
+        except Exception:
+            # Rendered on first download instead
+            logger.exception('Could not pre-render receipt for checkout %s', instance.pk)
+
+    transaction.on_commit(render)
+
+
+# Order inserts and updates feed the rollups from Order.save(); checkout's
+# bulk_create path feeds them from CheckoutService.
+@receiver(post_delete, sender=Order)
+def remove_order_from_rollup(sender, instance, **kwargs):
+    from .services import SalesRollupService
+    SalesRollupService.record(orders=[instance], sign=-1)
+
+
+@receiver(post_save, sender=Sale)
+def add_sale_to_rollup(sender, instance, created, **kwargs):
+    if created:
+        from .services import SalesRollupService
+        SalesRollupService.record(sales=[instance])
+
+
+@receiver(post_delete, sender=Sale)
+def remove_sale_from_rollup(sender, instance, **kwargs):
+    from .services import SalesRollupService
+    SalesRollupService.record(sales=[instance], sign=-1)
@@ -0,0 +1,46 @@
+"""
+Sort options for the product catalog.
+
+Listings only sort by the options declared here. Each option is backed by a
+composite index on ``(status, approval_status, <sort key>, id)`` declared in
+``Product.Meta.indexes``, so the catalog filter plus a keyset page is a
+bounded index range scan rather than a sort of every active product.
+"""
+
+from collections import namedtuple
+
+from django.utils.translation import gettext_lazy as _
+
+
+SortOption = namedtuple('SortOption', ['key', 'label', 'ordering'])
+
+PRODUCT_SORT_OPTIONS = [
+    SortOption('-created_at', _('Newest First'), ['-created_at']),
+    SortOption('price', _('Price Low-High'), ['price']),
+    SortOption('-price', _('Price High-Low'), ['-price']),
+    SortOption('-rating', _('Top Rated'), ['-rating_avg', '-rating_count']),
+    SortOption('-popularity', _('Most Popular'), ['-rating_count', '-rating_avg']),
+    SortOption('name', _('Name A-Z'), ['name']),
+    SortOption('-name', _('Name Z-A'), ['-name']),
+]
+PRODUCT_SORTS = {option.key: option for option in PRODUCT_SORT_OPTIONS}
+DEFAULT_PRODUCT_SORT = PRODUCT_SORTS['-created_at']
+
+# Only valid for search results, which are annotated with search_rank by
+# home.search and already narrowed by the full-text index.
+RELEVANCE_SORT = SortOption('relevance', _('Best Match'), ['-search_rank'])
+
+
+def resolve_product_sort(key, searching=False):
+    """
+    Look up a sort option by its ``sort`` query parameter value.
+
+    Unknown or missing values fall back to the default rather than raising.
+    For search results the fallback is relevance.
+
+    Returns:
+        SortOption
+    """
+    if searching and key not in PRODUCT_SORTS:
+        return RELEVANCE_SORT
+    return PRODUCT_SORTS.get(key or '', DEFAULT_PRODUCT_SORT)
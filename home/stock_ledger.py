@@ -0,0 +1,78 @@
+"""
+Append-only writer for StockHistory.
+
+Every stock mutation hands its history rows to ``record()``. Inside a
+``batch()`` block the rows are buffered and written with one bulk_create
+when the outermost block exits. Open the batch inside the transaction that
+moves the stock, so history and stock still commit or roll back together.
+Outside a batch, rows are written straight away.
+
+Old rows are compacted into StockHistoryDaily by
+``python manage.py compact_stock_history``, which keeps the raw table
+bounded.
+"""
+
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def _buffer():
+    if not hasattr(_local, 'depth'):
+        _local.depth = 0
+        _local.entries = []
+    return _local
+
+
+@contextmanager
+def batch():
+    """Buffer history rows until the outermost batch exits."""
+    state = _buffer()
+    state.depth += 1
+    try:
+        yield
+    except BaseException:
+        if state.depth == 1:
+            # The enclosing transaction is rolling back the stock changes too
+            state.entries = []
+        raise
+    else:
+        if state.depth == 1:
+            flush()
+    finally:
+        state.depth -= 1
+
+
+def record(entries):
+    """
+    Append unsaved StockHistory instances to the ledger.
+
+    Returns:
+        list: The entries, saved unless a batch is open
+    """
+    entries = list(entries)
+    state = _buffer()
+    if state.depth:
+        state.entries.extend(entries)
+        return entries
+    return _write(entries)
+
+
+def flush():
+    """Write buffered rows now. Returns the number written."""
+    state = _buffer()
+    entries, state.entries = state.entries, []
+    return len(_write(entries))
+
+
+def pending():
+    """Number of rows waiting in the current batch."""
+    return len(_buffer().entries)
+
+
+def _write(entries):
+    if not entries:
+        return entries
+    from home.models import StockHistory
+    return StockHistory.objects.bulk_create(entries)
@@ -0,0 +1,246 @@
+"""
+Search-as-you-type suggestions for the header search box.
+
+Each process keeps a prefix trie of active approved product names and
+category names. Lookups walk the trie with an optimal string alignment DP
+row per node (Levenshtein plus adjacent transpositions, so "slik" is one
+edit from "silk"). A query within a small edit distance of any name prefix
+is found without touching the database.
+
+Writes call mark_catalog_changed(), which bumps a version stamp in the
+'versions' cache (see the signals in home.signals, and the bulk admin
+actions that bypass them). A process checks the stamp at most every REFRESH_INTERVAL
+seconds and rebuilds its index when it moved. Rebuilding rather than
+loading rows by ``updated_at`` also catches QuerySet.update() writes,
+which never touch that column.
+
+Rebuilds run in a background thread; lookups keep using the old index
+until the new one is swapped in. Only a process's first build, when there
+is nothing to serve yet, happens inline.
+"""
+
+import logging
+import threading
+import time
+
+from django.core.cache import caches
+from django.db import connections
+from django.urls import reverse
+
+
+VERSION_CACHE_KEY = 'home:suggest:version'
+REFRESH_INTERVAL = 5
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT = 8
+# Completions gathered per matching trie node before ranking
+COLLECT_LIMIT = 50
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def max_edit_distance(query):
+    """Typos tolerated for a query of this length."""
+    if len(query) >= 8:
+        return 2
+    if len(query) >= 4:
+        return 1
+    return 0
+
+
+def mark_catalog_changed():
+    """Bump the version stamp so every process rebuilds its suggest index."""
+    versions = caches['versions']
+    try:
+        versions.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        if not versions.add(VERSION_CACHE_KEY, 1, None):
+            versions.incr(VERSION_CACHE_KEY)
+
+
+class TrieNode:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = set()
+
+
+class SuggestIndex:
+    """
+    Prefix trie over product and category names.
+
+    Every name is inserted once from each word start, so "summ" finds
+    "Red Summer Dress". Entries are ``(kind, id)`` keys into ``labels``.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.labels = {}
+        self._keys = {}
+
+    def add(self, kind, obj_id, label, url):
+        entry = (kind, obj_id)
+        self.remove(kind, obj_id)
+        self.labels[entry] = {'label': label, 'type': kind, 'url': url}
+        words = normalize(label).split(' ')
+        keys = [' '.join(words[i:]) for i in range(len(words))]
+        self._keys[entry] = keys
+        for key in keys:
+            node = self.root
+            for char in key:
+                node = node.children.setdefault(char, TrieNode())
+            node.entries.add(entry)
+
+    def remove(self, kind, obj_id):
+        entry = (kind, obj_id)
+        for key in self._keys.pop(entry, ()):
+            node = self.root
+            for char in key:
+                node = node.children.get(char)
+                if node is None:
+                    break
+            else:
+                node.entries.discard(entry)
+        self.labels.pop(entry, None)
+
+    def _collect(self, node, found, limit):
+        stack = [node]
+        while stack and len(found) < limit:
+            node = stack.pop()
+            found.update(node.entries)
+            stack.extend(node.children.values())
+
+    def lookup(self, query, limit=DEFAULT_LIMIT):
+        """
+        Find names with a prefix within the allowed edit distance of ``query``.
+
+        Returns:
+            list: Suggestion dicts, closest and shortest first
+        """
+        query = normalize(query)
+        if len(query) < MIN_QUERY_LENGTH:
+            return []
+        max_distance = max_edit_distance(query)
+        best = {}
+
+        # Depth-first walk carrying the DP row of query vs. the current
+        # prefix, plus the row before it and the prefix's last character for
+        # transpositions. A branch is pruned once neither row can lead back
+        # within the bound: a transposition adds 1 to a cell two rows up.
+        first_row = list(range(len(query) + 1))
+        stack = [(self.root, first_row, None, None)]
+        while stack:
+            node, row, previous_row, last_char = stack.pop()
+            distance = row[-1]
+            if distance <= max_distance:
+                found = set()
+                self._collect(node, found, COLLECT_LIMIT)
+                for entry in found:
+                    if distance < best.get(entry, max_distance + 1):
+                        best[entry] = distance
+            for char, child in node.children.items():
+                next_row = [row[0] + 1]
+                for i, query_char in enumerate(query, 1):
+                    cost = min(
+                        next_row[i - 1] + 1,
+                        row[i] + 1,
+                        row[i - 1] + (query_char != char),
+                    )
+                    if (
+                        previous_row is not None and i > 1
+                        and query_char == last_char and query[i - 2] == char
+                    ):
+                        cost = min(cost, previous_row[i - 2] + 1)
+                    next_row.append(cost)
+                if min(next_row) <= max_distance or min(row) < max_distance:
+                    stack.append((child, next_row, row, char))
+
+        ranked = sorted(
+            best.items(),
+            key=lambda item: (item[1], item[0][0] != 'category', len(self.labels[item[0]]['label'])),
+        )
+        return [self.labels[entry] for entry, _distance in ranked[:limit]]
+
+
+class SuggestService:
+    """Per-process suggest index kept in sync with the catalog."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.index = None
+        self._version = None
+        self._checked_at = 0
+        self._rebuilding = False
+
+    def _build(self):
+        from home.models import Category, Product
+
+        index = SuggestIndex()
+        products = Product.objects.filter(status='active', approval_status='approved').only('id', 'name')
+        categories = Category.objects.only('id', 'name', 'slug')
+
+        for product in products.iterator():
+            index.add('product', product.id, product.name, reverse('home:product_detail', args=[product.id]))
+        for category in categories.iterator():
+            index.add('category', category.id, category.name,
+                      reverse('home:category_products', args=[category.slug]))
+        return index
+
+    def _refresh(self):
+        # Called with self._lock held
+        now = time.monotonic()
+        if self.index is not None and now - self._checked_at < REFRESH_INTERVAL:
+            return
+        self._checked_at = now
+        version = caches['versions'].get(VERSION_CACHE_KEY, 0)
+        if self.index is not None and version == self._version:
+            return
+
+        if self.index is None:
+            self.index, self._version = self._build(), version
+        elif not self._rebuilding:
+            self._rebuilding = True
+            self._start_rebuild(version)
+
+    def _start_rebuild(self, version):
+        threading.Thread(target=self._rebuild_in_thread, args=(version,), daemon=True).start()
+
+    def _rebuild_in_thread(self, version):
+        try:
+            self._rebuild(version)
+        finally:
+            # Connections opened by this thread are not reused
+            connections.close_all()
+
+    def _rebuild(self, version):
+        """Build a new index for ``version`` and swap it in."""
+        try:
+            index = self._build()
+        except Exception:
+            # The version still differs, so the next check retries
+            logger.exception('Could not rebuild the suggest index')
+            index = None
+        with self._lock:
+            if index is not None:
+                self.index, self._version = index, version
+            self._rebuilding = False
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """Get suggestions for ``query``, refreshing the index if it is stale."""
+        with self._lock:
+            self._refresh()
+            index = self.index
+        # Indexes are never modified once swapped in
+        return index.lookup(query, limit)
+
+    def reset(self):
+        """Drop the index so the next lookup rebuilds it."""
+        with self._lock:
+            self.index = None
+
+
+suggest_service = SuggestService()
@@ -0,0 +1,20 @@
+"""
+Template tags for version-keyed fragment caching.
+
+Usage:
+    {% load cache page_cache_tags %}
+    {% page_cache_version 'catalog' as catalog_version %}
+    {% cache 600 fragment_name catalog_version %}...{% endcache %}
+"""
+
+from django import template
+
+from home.page_cache import get_version
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_cache_version(namespace):
+    """Current version of a page cache namespace, for use as a {% cache %} vary key."""
+    return get_version(namespace)
@@ -12,7 +12,7 @@ def star_rating(rating):
     """
     Convert a numeric rating to star display.
     
-    Usage: {{ product.get_average_rating|star_rating }}
+    Usage: {{ product.rating_avg|star_rating }}
     Returns: HTML string with filled and empty stars
     """
     try:
@@ -46,7 +46,7 @@ def star_rating_text(rating):
     """
     Convert numeric rating to text with stars.
     
-    Usage: {{ product.get_average_rating|star_rating_text }}
+    Usage: {{ product.rating_avg|star_rating_text }}
     Returns: "4.5 ★★★★☆"
     """
     try:
@@ -85,7 +85,7 @@ def show_star_rating(rating, show_count=False, review_count=0):
     """
     Display star rating with optional review count.
     
-    Usage: {% show_star_rating product.get_average_rating True product.get_rating_count %}
+    Usage: {% show_star_rating product.rating_avg True product.rating_count %}
     """
     try:
         rating = float(rating)
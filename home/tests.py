@@ -1,3 +1,943 @@
-from django.test import TestCase
+"""
+Home App Tests
 
-# Create your tests here.
+Tests for checkout and stock handling.
+Run with: python manage.py test home
+"""
+
+import io
+import shutil
+import tempfile
+import zipfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.db import connection
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from cart.models import Cart
+from montclair_wardrobe.cache import TwoTierCache
+from home import page_cache, receipt_export, receipt_store, stock_ledger
+from home.categories import get_categories, get_category_by_slug
+from home.models import (
+    Category, Checkout, DailySalesRollup, PlatformGuide, Product, Order, Review, Sale, StockHistory,
+    StockHistoryDaily, StockReservation,
+)
+from home.pagination import KeysetPaginator, paginate_request
+from home.receipt_generator import ReceiptGenerator, generate_receipt_html, load_receipt_data
+from home.search import InvertedIndexSearchBackend
+from home.sorting import DEFAULT_PRODUCT_SORT, PRODUCT_SORT_OPTIONS, resolve_product_sort
+from home.suggest import SuggestIndex, mark_catalog_changed, suggest_service
+from home.services import CheckoutService, ReviewStatsService, SalesRollupService, StockService
+
+
+# In-memory stand-ins for the shared tiers, so cache tests never clear or
+# read the file cache of the machine running them
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'montclair_wardrobe.cache.TwoTierCache',
+        'OPTIONS': {'L2': 'shared'},
+    },
+    'versions': {
+        'BACKEND': 'montclair_wardrobe.cache.TwoTierCache',
+        'OPTIONS': {'L2': 'version_store'},
+    },
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-shared'},
+    'version_store': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-versions'},
+}
+
+
+def make_product(seller, name='Test Dress', price='100.00', stock=10, **extra):
+    return Product.objects.create(
+        name=name,
+        price=Decimal(price),
+        seller=seller,
+        stock=stock,
+        status='active',
+        approval_status='approved',
+        **extra
+    )
+
+
+
+def use_empty_media_root(test):
+    """
+    Point MEDIA_ROOT at a fresh directory for one test.
+
+    Checkout ids are reused after each rollback, so stored receipts from an
+    earlier test could otherwise have the same content hash.
+    """
+    media_root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+    override = test.settings(MEDIA_ROOT=media_root)
+    override.enable()
+    test.addCleanup(override.disable)
+
+
+class StockServiceTests(TestCase):
+    """Tests for the conditional-UPDATE stock engine."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+
+    def test_decrement_refuses_to_oversell_from_stale_instance(self):
+        """A stale in-memory stock value cannot be used to oversell."""
+        product = make_product(self.seller, stock=3)
+        stale = Product.objects.get(pk=product.pk)
+        self.assertTrue(StockService.decrement(product, 2))
+
+        self.assertFalse(StockService.decrement(stale, 2))
+
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 1)
+        self.assertEqual(StockHistory.objects.filter(product=product).count(), 1)
+
+    def test_decrement_many_is_all_or_nothing(self):
+        """A batch decrement leaves every product untouched if one line fails."""
+        first = make_product(self.seller, name='First', stock=5)
+        second = make_product(self.seller, name='Second', stock=1)
+
+        self.assertFalse(StockService.decrement_many([(first, 2), (second, 2)]))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.stock, second.stock), (5, 1))
+        self.assertFalse(StockHistory.objects.exists())
+
+    def test_reduce_and_increase_stock_use_the_engine(self):
+        """Product.reduce_stock raises on shortfall and increase_stock restocks."""
+        product = make_product(self.seller, stock=2)
+
+        with self.assertRaises(ValueError):
+            product.reduce_stock(3)
+        product.increase_stock(4, change_type='return')
+
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 6)
+        self.assertEqual(StockHistory.objects.get(product=product).change_type, 'return')
+
+
+    def test_staff_update_with_bad_price_leaves_stock_alone(self):
+        product = make_product(self.seller, stock=5)
+        User.objects.create_superuser(username='manager', password='testpass123')
+        self.client.login(username='manager', password='testpass123')
+
+        self.client.post(f'/staff/products/{product.pk}/update/', {'stock': '9', 'price': 'abc'})
+
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 5)
+        self.assertFalse(StockHistory.objects.filter(product=product).exists())
+
+class StockLedgerTests(TestCase):
+    """Tests for the batched StockHistory writer and its daily rollups."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        self.product = make_product(self.seller, stock=10)
+
+    def test_batch_writes_history_once_on_exit(self):
+        with stock_ledger.batch():
+            for _ in range(3):
+                self.product.reduce_stock(1)
+            self.assertEqual(stock_ledger.pending(), 3)
+            self.assertFalse(StockHistory.objects.exists())
+        self.assertEqual(StockHistory.objects.filter(product=self.product).count(), 3)
+
+    def test_failed_batch_discards_buffer(self):
+        with self.assertRaises(ValueError):
+            with stock_ledger.batch():
+                self.product.reduce_stock(1)
+                raise ValueError('rolled back')
+        self.assertEqual(stock_ledger.pending(), 0)
+        self.assertFalse(StockHistory.objects.exists())
+
+    def test_compact_rolls_old_rows_into_daily_summary(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.product.reduce_stock(3)
+        self.product.increase_stock(5)
+        self.product.reduce_stock(1)
+        StockHistory.objects.filter(change_type='sale').update(created_at=timezone.now() - timedelta(days=100))
+
+        metrics = StockHistory.compact(keep_days=90)
+
+        self.assertEqual(metrics['rows_compacted'], 2)
+        self.assertEqual(StockHistory.objects.count(), 1)
+        daily = StockHistoryDaily.objects.get(product=self.product)
+        self.assertEqual((daily.change_type, daily.quantity_removed, daily.change_count), ('sale', 4, 2))
+        self.assertEqual(StockHistory.get_stock_summary(self.product), {
+            'total_added': 5, 'total_removed': 4, 'total_changes': 3, 'current_stock': 11,
+        })
+
+
+class ReservedStockCounterTests(TestCase):
+    """Tests for the denormalized Product.reserved_stock counter."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass123')
+        self.product = make_product(self.seller, stock=10)
+
+    def test_counter_follows_reservation_lifecycle(self):
+        """Creating, resizing and releasing reservations keeps the counter in sync."""
+        reservation, _ = StockReservation.create_reservation(self.buyer, self.product, 3)
+        StockReservation.create_reservation(self.buyer, self.product, 4)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_stock, 4)
+        self.assertEqual(self.product.get_available_stock(), 6)
+
+        reservation.mark_as_cancelled()
+        reservation.mark_as_cancelled()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_stock, 0)
+
+    def test_expire_batch_releases_holds_and_records_history(self):
+        """The reaper expires overdue holds in bounded batches."""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        for i in range(3):
+            buyer = User.objects.create_user(username=f'buyer{i}', password='testpass123')
+            reservation, _ = StockReservation.create_reservation(buyer, self.product, 2)
+            StockReservation.objects.filter(pk=reservation.pk).update(
+                expires_at=timezone.now() - timedelta(minutes=1)
+            )
+
+        metrics = StockReservation.expire_batch(batch_size=2)
+        self.assertEqual(metrics, {'expired': 2, 'products': 1, 'history_rows': 2})
+        self.assertEqual(StockReservation.cleanup_expired_reservations(batch_size=2), 1)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_stock, 0)
+        self.assertEqual(
+            StockHistory.objects.filter(change_type='reservation_released').count(), 3
+        )
+
+    def test_admin_delete_releases_holds(self):
+        first, _ = StockReservation.create_reservation(self.buyer, self.product, 3)
+        other = User.objects.create_user(username='other', password='testpass123')
+        StockReservation.create_reservation(other, self.product, 2)
+        User.objects.create_superuser(username='admin', password='testpass123')
+        self.client.login(username='admin', password='testpass123')
+
+        self.client.post(f'/admin/home/stockreservation/{first.pk}/delete/', {'post': 'yes'})
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_stock, 2)
+
+        self.client.post('/admin/home/stockreservation/', {
+            'action': 'delete_selected',
+            '_selected_action': list(StockReservation.objects.values_list('pk', flat=True)),
+            'post': 'yes',
+        })
+        self.product.refresh_from_db()
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(self.product.reserved_stock, 0)
+
+    def test_available_stock_for_uses_one_query(self):
+        """available_stock_for answers a whole page of products in one query."""
+        other = make_product(self.seller, name='Other', stock=2)
+        StockReservation.create_reservation(self.buyer, other, 2)
+
+        with self.assertNumQueries(1):
+            available = StockReservation.available_stock_for([self.product, other])
+
+        self.assertEqual(available, {self.product.pk: 10, other.pk: 0})
+
+
+class OrderStockTests(TestCase):
+    """Tests for stock moved by Order.save."""
+
+    def setUp(self):
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass123')
+        self.product = make_product(seller, stock=10)
+
+    def test_new_order_takes_stock_once(self):
+        order = Order.objects.create(user=self.buyer, product=self.product, quantity=3)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 7)
+        history = StockHistory.objects.get(product=self.product)
+        self.assertEqual((history.quantity_change, history.order_id), (-3, order.pk))
+
+    def test_quantity_change_moves_the_difference_without_refetch(self):
+        order = Order.objects.create(user=self.buyer, product=self.product, quantity=3)
+        order = Order.objects.select_related('product').get(pk=order.pk)
+        order.quantity = 1
+        with CaptureQueriesContext(connection) as queries:
+            order.save()
+        # The only read is the locked rollup row the order's figures move through
+        refetches = [
+            q for q in queries
+            if q['sql'].lstrip().upper().startswith('SELECT') and 'home_dailysalesrollup' not in q['sql']
+        ]
+        self.assertFalse(refetches)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 9)
+        self.assertEqual(StockHistory.objects.filter(change_type='return').get().quantity_change, 2)
+
+    def test_failed_insert_leaves_order_unsaved(self):
+        order = Order(user=self.buyer, product=self.product, quantity=11)
+        with self.assertRaises(ValueError):
+            order.save()
+        self.assertIsNone(order.pk)
+        self.assertFalse(Order.objects.exists())
+
+
+class SalesRollupTests(TestCase):
+    """Tests for the incrementally maintained DailySalesRollup table."""
+
+    def setUp(self):
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass123')
+        self.product = make_product(seller, price='50.00', stock=10)
+
+    def _rollup(self, status):
+        return DailySalesRollup.objects.filter(product=self.product, status=status).values_list(
+            'revenue', 'units', 'order_count'
+        ).first()
+
+    def test_order_writes_follow_status_and_quantity(self):
+        order = Order.objects.create(user=self.buyer, product=self.product, quantity=2)
+        self.assertEqual(self._rollup('pending'), (Decimal('100.00'), 2, 1))
+
+        order.status = 'delivered'
+        order.quantity = 3
+        order.save()
+        self.assertEqual(self._rollup('pending'), (Decimal('0.00'), 0, 0))
+        self.assertEqual(self._rollup('delivered'), (Decimal('150.00'), 3, 1))
+
+        order.delete()
+        self.assertEqual(self._rollup('delivered'), (Decimal('0.00'), 0, 0))
+
+    def test_bulk_status_move_updates_rollup(self):
+        Order.objects.create(user=self.buyer, product=self.product, quantity=1)
+        Order.objects.create(user=self.buyer, product=self.product, quantity=2)
+
+        moved = SalesRollupService.move_status(Order.objects.filter(status='pending'), 'cancelled')
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(Order.objects.filter(status='cancelled').count(), 2)
+        self.assertEqual(self._rollup('pending'), (Decimal('0.00'), 0, 0))
+        self.assertEqual(self._rollup('cancelled'), (Decimal('150.00'), 3, 2))
+
+    def test_sales_are_recorded_separately(self):
+        Sale.objects.create(product=self.product, seller=self.product.seller, buyer=self.buyer,
+                            total_amount=Decimal('50.00'))
+        self.assertEqual(self._rollup(DailySalesRollup.SALE_STATUS), (Decimal('50.00'), 1, 1))
+
+    def test_sales_summary_keeps_datetime_bounds(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from home.reports import ReportGenerator
+
+        Sale.objects.create(product=self.product, seller=self.product.seller, buyer=self.buyer,
+                            total_amount=Decimal('50.00'))
+        now = timezone.now()
+        self.assertEqual(ReportGenerator.get_sales_summary(now + timedelta(seconds=1))['total_orders'], 0)
+        self.assertEqual(ReportGenerator.get_sales_summary(now - timedelta(days=1))['total_orders'], 1)
+
+    def test_rebuild_matches_incremental_rows(self):
+        Order.objects.create(user=self.buyer, product=self.product, quantity=2)
+        Order.objects.create(user=self.buyer, product=self.product, quantity=1, status='shipped')
+        incremental = set(DailySalesRollup.objects.values_list('date', 'product', 'status', 'revenue', 'units', 'order_count'))
+
+        self.assertEqual(SalesRollupService.rebuild(), 2)
+        rebuilt = set(DailySalesRollup.objects.values_list('date', 'product', 'status', 'revenue', 'units', 'order_count'))
+        self.assertEqual(rebuilt, incremental)
+
+
+class CheckoutServiceTests(TestCase):
+    """Tests for CheckoutService.place_order."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass123')
+
+    def _place_order(self):
+        return CheckoutService.place_order(
+            self.buyer,
+            checkout_fields={
+                'location': 'inside',
+                'phone_number': '+260971234567',
+                'gps_location': '-15.4,28.3',
+                'payment_method': 'mtn',
+                'delivery_fee': Decimal('20.00'),
+                'transaction_id': f'MTN_{self.buyer.id}_{Cart.objects.count()}',
+            },
+            payment_fields={
+                'method': 'mtn',
+                'amount': Decimal('0.01'),
+                'reference': f'MTN_{self.buyer.id}_{Cart.objects.count()}',
+                'status': 'pending',
+            },
+        )
+
+    def _fill_cart(self, count):
+        products = []
+        for i in range(count):
+            product = make_product(self.seller, name=f'Product {i}', stock=5)
+            Cart.objects.create(user=self.buyer, product=product, quantity=2)
+            products.append(product)
+        return products
+
+    def test_place_order_writes_orders_sales_and_history_once(self):
+        """Each cart line produces one order, one sale and one stock decrement."""
+        products = self._fill_cart(2)
+
+        checkout = self._place_order()
+
+        self.assertEqual(Order.objects.filter(checkout=checkout).count(), 2)
+        self.assertEqual(Sale.objects.filter(buyer=self.buyer).count(), 2)
+        self.assertEqual(StockHistory.objects.filter(change_type='sale').count(), 2)
+        self.assertFalse(Cart.objects.filter(user=self.buyer).exists())
+        for product in products:
+            product.refresh_from_db()
+            self.assertEqual(product.stock, 3)
+        history = StockHistory.objects.filter(product=products[0]).get()
+        self.assertEqual((history.stock_before, history.stock_after), (5, 3))
+        self.assertIsNotNone(history.order_id)
+        self.assertEqual(
+            DailySalesRollup.objects.filter(status='pending').aggregate(units=Sum('units'))['units'], 4
+        )
+        self.assertEqual(DailySalesRollup.objects.filter(status=DailySalesRollup.SALE_STATUS).count(), 2)
+
+    def test_place_order_query_count_is_independent_of_cart_size(self):
+        """A large cart costs the same number of queries as a small one."""
+        self._fill_cart(2)
+        with CaptureQueriesContext(connection) as small:
+            self._place_order()
+
+        self._fill_cart(8)
+        with CaptureQueriesContext(connection) as large:
+            self._place_order()
+
+        self.assertEqual(len(small), len(large))
+
+    def test_place_order_rolls_back_on_insufficient_stock(self):
+        """Nothing is written when one of the lines cannot be fulfilled."""
+        products = self._fill_cart(2)
+        Product.objects.filter(pk=products[1].pk).update(stock=1)
+
+        with self.assertRaises(ValueError):
+            self._place_order()
+
+        products[0].refresh_from_db()
+        self.assertEqual(products[0].stock, 5)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Cart.objects.filter(user=self.buyer).count(), 2)
+
+
+class ReviewStatsServiceTests(TestCase):
+    """Tests for the denormalized product rating columns."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        self.product = make_product(self.seller)
+        self.reviews = []
+        for i, rating in enumerate([5, 5, 4, 1]):
+            buyer = User.objects.create_user(username=f'reviewer{i}', password='testpass123')
+            self.reviews.append(Review.objects.create(
+                product=self.product, user=buyer, rating=rating,
+                comment='Nice', is_verified_purchase=(i == 0)
+            ))
+
+    def test_columns_follow_review_writes(self):
+        """Creating and deleting reviews keeps the columns in sync."""
+        self.product.refresh_from_db()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.product.get_average_rating(), 3.8)
+            self.assertEqual(self.product.get_rating_count(), 4)
+            self.assertEqual(self.product.get_verified_review_count(), 1)
+            distribution = self.product.get_rating_distribution()
+        self.assertEqual(distribution[5], {'count': 2, 'percentage': 50.0})
+        self.assertEqual(distribution[2], {'count': 0, 'percentage': 0})
+
+        self.reviews[0].delete()
+        self.product.refresh_from_db()
+        self.assertEqual(
+            (self.product.rating_count, self.product.rating_5_count, self.product.rating_verified_count),
+            (3, 1, 0)
+        )
+        self.assertAlmostEqual(self.product.rating_avg, 10 / 3)
+
+    def test_moving_a_review_updates_both_products(self):
+        other = make_product(self.seller, name='Other Dress')
+        review = Review.objects.get(pk=self.reviews[3].pk)
+        review.product = other
+        review.save()
+
+        self.product.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_1_count), (3, 0))
+        self.assertEqual((other.rating_count, other.rating_1_count), (1, 1))
+
+    def test_rebuild_repairs_drift(self):
+        """rebuild() recomputes the columns from the reviews table."""
+        Product.objects.filter(pk=self.product.pk).update(rating_count=0, rating_avg=0, rating_1_count=7)
+        other = make_product(self.seller, name='Unreviewed')
+
+        self.assertEqual(ReviewStatsService.rebuild(), 2)
+
+        self.product.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_1_count), (4, 1))
+        self.assertEqual(self.product.rating_avg, 3.75)
+        self.assertEqual(other.rating_count, 0)
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests for cursor pagination of the catalog."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        for i in range(7):
+            make_product(self.seller, name=f'Product {i}', price=str(10 + i % 3))
+
+    def test_walking_cursors_visits_every_product_once(self):
+        """Ties on the sort key are broken by id so no row repeats or is skipped."""
+        paginator = KeysetPaginator(Product.objects.all(), ['-price'], per_page=3)
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen.extend(product.pk for product in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        expected = list(Product.objects.order_by('-price', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        """An invalid cursor token is ignored rather than raising."""
+        request = RequestFactory().get('/products/', {'cursor': 'garbage', 'sort': 'price'})
+        page = paginate_request(request, Product.objects.all(), ['price'], per_page=5)
+
+        self.assertTrue(page.is_first_page)
+        self.assertEqual(len(page), 5)
+        self.assertIn('sort=price', page.next_url)
+
+    def test_products_json_variant(self):
+        """The listing returns a JSON page with the next cursor for infinite scroll."""
+        response = self.client.get('/products/', {'format': 'json', 'per_page': 4})
+        data = response.json()
+        self.assertEqual(len(data['products']), 4)
+        self.assertTrue(data['has_next'])
+
+        response = self.client.get('/products/', {'format': 'json', 'per_page': 4, 'cursor': data['next_cursor']})
+        self.assertEqual(len(response.json()['products']), 3)
+        self.assertFalse(response.json()['has_next'])
+
+
+    def test_category_page_counts_every_match(self):
+        category = Category.objects.create(name='Shirts', created_by=self.seller)
+        Product.objects.update(category=category)
+        response = self.client.get(f'/category/{category.slug}/', {'per_page': 3})
+        self.assertEqual(len(response.context['products']), 3)
+        self.assertContains(response, '7 products found in total')
+
+class ProductSortTests(TestCase):
+    """Tests for the whitelisted catalog sort options."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        self.cheap = make_product(self.seller, name='Cheap', price='5.00')
+        self.dear = make_product(self.seller, name='Dear', price='50.00')
+
+    def test_unknown_sort_falls_back_to_default(self):
+        """Arbitrary column names are ignored instead of reaching order_by."""
+        response = self.client.get('/products/', {'sort': 'description', 'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(resolve_product_sort('description'), DEFAULT_PRODUCT_SORT)
+
+    def test_price_sort(self):
+        response = self.client.get('/products/', {'sort': '-price', 'format': 'json'})
+        ids = [product['id'] for product in response.json()['products']]
+        self.assertEqual(ids, [self.dear.pk, self.cheap.pk])
+
+    def test_every_sort_option_has_an_index(self):
+        """Each option's ordering is the prefix-filtered tail of a Product index."""
+        indexed = [tuple(index.fields) for index in Product._meta.indexes]
+        for option in PRODUCT_SORT_OPTIONS:
+            columns = tuple(field.lstrip('-') for field in option.ordering)
+            self.assertIn(('status', 'approval_status') + columns + ('id',), indexed, option.key)
+
+
+class InvertedIndexSearchTests(TestCase):
+    """Tests for the in-process full-text search fallback."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        self.dress = make_product(self.seller, name='Red Summer Dress', description='Light cotton')
+        self.shirt = make_product(self.seller, name='Cotton Shirt', description='Red collar')
+        self.shoes = make_product(self.seller, name='Leather Shoes')
+        self.backend = InvertedIndexSearchBackend()
+
+    def search(self, query):
+        results = self.backend.search(Product.objects.all(), query).order_by('-search_rank', '-id')
+        return [product.pk for product in results]
+
+    def test_prefix_match_ranks_name_hits_first(self):
+        self.assertEqual(self.search('cott'), [self.shirt.pk, self.dress.pk])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('red cotton shirt'), [self.shirt.pk])
+        self.assertEqual(self.search('leather dress'), [])
+
+    def test_index_updates_on_save_and_delete(self):
+        self.search('anything')  # build the index
+        self.shoes.name = 'Velvet Slippers'
+        self.shoes.save()
+        self.backend.index_product(self.shoes)
+        self.assertEqual(self.search('velv'), [self.shoes.pk])
+        self.assertEqual(self.search('leather'), [])
+
+        self.backend.remove_product(self.shoes.pk)
+        self.assertEqual(self.search('velv'), [])
+
+    def test_stock_save_skips_search_document(self):
+        """Saves that don't touch name, description or category leave the document alone."""
+        category = Category.objects.create(name='Shoes', slug='shoes', created_by=self.seller)
+        self.shoes.category = category
+        self.shoes.save()
+        shoes = Product.objects.get(pk=self.shoes.pk)
+        shoes.stock = 3
+        with CaptureQueriesContext(connection) as queries:
+            shoes.save(update_fields=['stock'])
+        self.assertFalse([q for q in queries if 'home_category' in q['sql']])
+        self.assertEqual(self.search('shoes'), [self.shoes.pk])
+
+    def test_search_without_matches_renders(self):
+        """Empty results still carry search_rank, which the relevance sort needs."""
+        for query in ('nomatch', '!!!'):
+            response = self.client.get('/products/', {'search': query, 'format': 'json'})
+            self.assertEqual(response.status_code, 200, query)
+            self.assertEqual(response.json()['products'], [], query)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SuggestTests(TestCase):
+    """Tests for the autocomplete trie and endpoint."""
+
+    def setUp(self):
+        self.index = SuggestIndex()
+        self.index.add('product', 1, 'Red Summer Dress', '/product/1/')
+        self.index.add('product', 2, 'Leather Sandals', '/product/2/')
+        self.index.add('category', 1, 'Dresses', '/category/dresses/')
+
+    def labels(self, query):
+        return [item['label'] for item in self.index.lookup(query)]
+
+    def test_prefix_matches_any_word(self):
+        self.assertEqual(self.labels('summ'), ['Red Summer Dress'])
+        self.assertEqual(self.labels('dres'), ['Dresses', 'Red Summer Dress'])
+
+    def test_tolerates_typos(self):
+        self.assertEqual(self.labels('lether'), ['Leather Sandals'])
+        self.assertEqual(self.labels('sandls'), ['Leather Sandals'])
+        self.assertEqual(self.labels('sadnals'), ['Leather Sandals'])
+        self.assertEqual(self.labels('xyz'), [])
+
+    def test_remove(self):
+        self.index.remove('product', 2)
+        self.assertEqual(self.labels('leath'), [])
+
+    def test_endpoint_serves_from_memory(self):
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        make_product(seller, name='Silk Scarf')
+        suggest_service.reset()
+
+        self.client.get('/api/suggest/', {'q': 'silk'})
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/suggest/', {'q': 'slik'})
+        self.assertEqual([item['label'] for item in response.json()['suggestions']], ['Silk Scarf'])
+
+    def test_bulk_update_refreshes_after_mark(self):
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        make_product(seller, name='Silk Scarf')
+        suggest_service.reset()
+        self.assertEqual([item['label'] for item in suggest_service.suggest('silk')], ['Silk Scarf'])
+
+        Product.objects.update(status='sold')
+        mark_catalog_changed()
+        suggest_service._checked_at = 0
+        with patch.object(suggest_service, '_start_rebuild') as start_rebuild:
+            # The old index answers while the new one is built
+            with self.assertNumQueries(0):
+                self.assertEqual([item['label'] for item in suggest_service.suggest('silk')], ['Silk Scarf'])
+        start_rebuild.assert_called_once()
+        suggest_service._rebuild(*start_rebuild.call_args.args)
+        self.assertEqual(suggest_service.suggest('silk'), [])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CategoryNavigationTests(TestCase):
+    """Tests for the cached category registry."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='seller', password='testpass123')
+        self.category = Category.objects.create(name="Men's Shoes", created_by=self.user)
+
+    def test_slug_lookup_is_cached(self):
+        self.assertEqual(get_category_by_slug('mens-shoes')['db_id'], self.category.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_category_by_slug('mens-shoes')['name'], "Men's Shoes")
+            self.assertIsNone(get_category_by_slug('missing'))
+
+    def test_category_writes_invalidate_cache(self):
+        get_categories()
+        self.category.name = 'Sneakers'
+        self.category.save()
+        self.assertEqual(get_category_by_slug('mens-shoes')['name'], 'Sneakers')
+
+        self.category.delete()
+        self.assertEqual(get_categories(), [])
+
+    def test_only_renames_refresh_search_documents(self):
+        category = Category.objects.get(pk=self.category.pk)
+        with patch('home.search.refresh_search_documents') as refresh:
+            category.description = 'Formal and casual'
+            category.save()
+            refresh.assert_not_called()
+
+            category.name = 'Footwear'
+            category.save()
+            refresh.assert_called_once()
+
+    def test_slug_is_generated_and_unique(self):
+        self.assertEqual(self.category.slug, 'mens-shoes')
+        clash = Category.objects.create(name="Mens Shoes", created_by=self.user)
+        self.assertEqual(clash.slug, 'mens-shoes-2')
+        self.assertEqual(self.client.get('/category/mens-shoes-2/').status_code, 200)
+
+    def test_generated_slugs_are_valid(self):
+        for name, slug in (('Shoes & Bags', 'shoes-bags'), ('T.Shirts', 'tshirts'), ('!!!', 'category')):
+            category = Category.objects.create(name=name, created_by=self.user)
+            self.assertEqual(category.slug, slug)
+            category.full_clean()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PageCacheTests(TestCase):
+    """Tests for anonymous response caching."""
+
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        self.product = make_product(self.seller, name='Linen Blazer')
+
+    def test_anonymous_hit_skips_database(self):
+        self.client.get('/products/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/products/')
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Linen Blazer')
+        self.assertEqual(page_cache.get_stats()['catalog']['hits'], 1)
+
+    def test_query_params_vary_the_key(self):
+        self.client.get('/products/', {'sort': 'price'})
+        response = self.client.get('/products/', {'sort': '-price'})
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    def test_product_save_invalidates(self):
+        self.client.get('/products/')
+        self.product.name = 'Wool Blazer'
+        self.product.save()
+        response = self.client.get('/products/')
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertContains(response, 'Wool Blazer')
+
+    def test_only_stock_crossing_zero_invalidates(self):
+        version = page_cache.get_version(page_cache.CATALOG)
+        self.assertTrue(StockService.decrement(self.product, 4))
+        self.assertEqual(page_cache.get_version(page_cache.CATALOG), version)
+
+        self.assertTrue(StockService.decrement(self.product, 6))
+        self.assertEqual(page_cache.get_version(page_cache.CATALOG), version + 1)
+        StockService.increment(self.product, 2, change_type='restock')
+        self.assertEqual(page_cache.get_version(page_cache.CATALOG), version + 2)
+
+    def test_logged_in_users_bypass_cache(self):
+        self.client.get('/products/')
+        self.client.login(username='seller', password='testpass123')
+        response = self.client.get('/products/')
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TwoTierCacheTests(TestCase):
+    """Tests for the in-process L1 in front of the shared cache."""
+
+    def setUp(self):
+        self.cache = TwoTierCache('', {'OPTIONS': {'L2': 'shared', 'L1_TIMEOUT': 60, 'L1_MAX_ENTRIES': 2}})
+        self.cache.clear()
+
+    def test_reads_fill_l1_and_writes_reach_l2(self):
+        self.cache.set('colour', 'red')
+        self.assertEqual(caches['shared'].get('colour'), 'red')
+
+        caches['shared'].set('colour', 'blue')
+        self.assertEqual(self.cache.get('colour'), 'red')  # served from L1
+
+        self.cache.delete('colour')
+        self.assertIsNone(self.cache.get('colour'))
+
+    def test_l1_evicts_least_recently_used(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, key)
+        self.assertEqual(len(self.cache._l1), 2)
+        self.assertEqual(self.cache.get('a'), 'a')  # refilled from L2
+
+    def test_incr_goes_through_l2(self):
+        self.cache.set('hits', 1)
+        self.assertEqual(self.cache.incr('hits'), 2)
+        self.assertEqual(caches['shared'].get('hits'), 2)
+        self.assertEqual(self.cache.get('hits'), 2)
+
+
+class ConditionalResponseTests(TestCase):
+    """Tests for ETag revalidation of product and guide pages."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='testpass123')
+        self.product = make_product(self.seller, name='Denim Jacket')
+        self.url = f'/product/{self.product.pk}/'
+
+    def test_unchanged_product_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_stock_change_invalidates_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        StockService.decrement(self.product, 1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_differs_per_viewer(self):
+        anonymous = self.client.get(self.url)['ETag']
+        self.client.login(username='seller', password='testpass123')
+        self.assertNotEqual(self.client.get(self.url)['ETag'], anonymous)
+
+    def test_guide_revalidates_after_login(self):
+        PlatformGuide.objects.create(
+            title='Returns', slug='returns', category='shopping',
+            description='How returns work', content='Send it back.',
+        )
+        url = '/help/returns/'
+        anonymous = self.client.get(url)
+        self.assertTrue(anonymous.has_header('Last-Modified'))
+
+        self.client.login(username='seller', password='testpass123')
+        response = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=anonymous['ETag'],
+            HTTP_IF_MODIFIED_SINCE=anonymous['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertIn('Cookie', response['Vary'])
+
+
+class ReceiptStoreTests(TestCase):
+    """Tests for the content-addressed receipt cache."""
+
+    def setUp(self):
+        use_empty_media_root(self)
+        self.buyer = User.objects.create_user(username='buyer', password='testpass123')
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        self.checkout = Checkout.objects.create(
+            user=self.buyer,
+            location='inside',
+            phone_number='+260971234567',
+            gps_location='-15.4,28.3',
+            payment_method='mtn',
+            payment_status='completed',
+            # The field default is a float, which an unrefreshed instance keeps
+            delivery_fee=Decimal('0.00'),
+        )
+        Order.objects.create(user=self.buyer, product=make_product(seller), quantity=1, checkout=self.checkout)
+        self.client.login(username='buyer', password='testpass123')
+
+    def test_receipt_is_rendered_once(self):
+        with patch('home.receipt_store.ReceiptGenerator', wraps=ReceiptGenerator) as render:
+            first = b''.join(self.client.get(f'/receipt/{self.checkout.pk}/view/').streaming_content)
+            second = b''.join(self.client.get(f'/receipt/{self.checkout.pk}/download/').streaming_content)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith(b'%PDF'))
+
+    def test_changed_payment_gets_a_new_file(self):
+        before = receipt_store.get_receipt_file(self.checkout)
+        self.checkout.transaction_id = 'MTN_123'
+        self.checkout.save()
+        self.assertNotEqual(receipt_store.get_receipt_file(self.checkout), before)
+
+    def test_pdf_and_html_share_one_load(self):
+        with self.assertNumQueries(2):
+            receipt = load_receipt_data(self.checkout)
+        with self.assertNumQueries(0):
+            html = generate_receipt_html(receipt)
+            pdf = ReceiptGenerator(receipt).generate()
+        self.assertIn(receipt.receipt_number, html)
+        self.assertIn(receipt.lines[0].name, html)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+
+
+class ReceiptExportTests(TestCase):
+    """Tests for the bulk receipt export."""
+
+    def setUp(self):
+        use_empty_media_root(self)
+        buyer = User.objects.create_user(username='buyer', password='testpass123')
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        product = make_product(seller)
+        self.checkouts = []
+        for status in ('completed', 'completed', 'pending'):
+            checkout = Checkout.objects.create(
+                user=buyer,
+                location='inside',
+                phone_number='+260971234567',
+                gps_location='-15.4,28.3',
+                payment_method='mtn',
+                payment_status=status,
+            )
+            Order.objects.create(user=buyer, product=product, quantity=1, checkout=checkout)
+            self.checkouts.append(checkout)
+        today = self.checkouts[0].created_at.date()
+        self.queryset = receipt_export.export_queryset(today, today)
+
+    def test_zip_contains_completed_receipts(self):
+        entries = receipt_export.export_receipts(self.queryset, workers=1, chunk_size=1)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(receipt_export.stream_zip(entries))))
+        self.assertEqual(archive.namelist(), [
+            f'receipt_MW{checkout.pk:06d}.pdf' for checkout in self.checkouts[:2]
+        ])
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b'%PDF'))
+
+    def test_staff_page_serves_stored_archive(self):
+        User.objects.create_superuser(username='finance', password='testpass123')
+        self.client.login(username='finance', password='testpass123')
+        today = self.checkouts[0].created_at.date()
+        params = {'start': today, 'end': today}
+        response = self.client.get('/staff/orders/receipts/export/', params)
+        self.assertContains(response, 'has not been built yet')
+
+        entries = receipt_export.export_receipts(self.queryset, workers=1)
+        receipt_export.store_archive(entries, today, today)
+        response = self.client.get('/staff/orders/receipts/export/', params)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 2)
+
+    def test_rerun_reuses_stored_receipts(self):
+        progress = []
+        list(receipt_export.export_receipts(self.queryset, workers=1))
+        list(receipt_export.export_receipts(self.queryset, workers=1, progress=lambda *args: progress.append(args)))
+        self.assertEqual(progress, [(2, 2, 0)])
@@ -13,6 +13,7 @@ urlpatterns = [
     path('home/', lambda request: redirect('/', permanent=True), name='home_redirect'),
     path('about/', views.about, name='about'),
     path('products/', views.products, name='products'),
+    path('api/suggest/', views.suggest, name='suggest'),
     path('product/<int:id>/', views.product_detail, name='product_detail'),
     path('contact/', contact_view, name='contact'),
     path('privacy/', views.privacy_policy, name='privacy_policy'),
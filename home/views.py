@@ -8,6 +8,7 @@ from io import StringIO
 
 from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
@@ -15,10 +16,12 @@ from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth.models import User
 from django.core.mail import send_mail
 from django.core.paginator import Paginator
-from django.http import HttpResponse, Http404
+from django.http import FileResponse, HttpResponse, Http404, JsonResponse
 from django.template.loader import render_to_string
-from django.views.decorators.http import require_POST
-from .receipt_generator import generate_receipt
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from django.views.decorators.vary import vary_on_cookie
+from .receipt_store import open_receipt
 from django.db import models
 from django.utils import timezone
 
@@ -26,6 +29,12 @@ from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
 from home.models import Product, Checkout, Category, Order, Sale, Profile
+from home.categories import get_categories, get_category_by_slug
+from home import conditional, page_cache
+from home.pagination import paginate_request
+from home.search import search_products
+from home.sorting import DEFAULT_PRODUCT_SORT, PRODUCT_SORT_OPTIONS, RELEVANCE_SORT, resolve_product_sort
+from home.suggest import suggest_service
 from cart.models import Cart
 from .forms import (
     ProductForm,
@@ -50,39 +59,22 @@ MTN_SUBSCRIPTION_KEY = "abc123def456ghi789jkl0mn"
 # HOME & CATEGORY VIEWS
 # ===========================
 
+@page_cache.cache_anonymous_page(page_cache.CATALOG)
 def home(request):
     """Homepage showing approved products and database categories."""
     print(f"DEBUG: Home view called at {request.path}")
 
-    products = Product.objects.filter(status='active', approval_status='approved')
+    products = catalog_queryset()
     cart_item_count = Cart.objects.filter(user=request.user).count() if request.user.is_authenticated else 0
 
-    # Get categories from database
-    db_categories = Category.objects.all()
-    categories = []
-    
-    for category in db_categories:
-        slug = category.name.lower().replace(" ", "-").replace("'", "")
-        # Use icon from database or default
-        icon = category.icon if category.icon else 'fas fa-shopping-bag'
-        
-        # Use image from database if available
-        if category.image:
-            category_image = category.image.url
-        else:
-            # Fallback to default icon display
-            category_image = None
-        
-        categories.append({
-            'name': category.name,
-            'slug': slug,
-            'icon': icon,
-            'image': category_image,
-            'db_id': category.id
-        })
+    categories = get_categories()
+
+    page = paginate_request(request, products, DEFAULT_PRODUCT_SORT.ordering)
+    if request.GET.get('format') == 'json':
+        return catalog_json_response(page)
 
     return render(request, 'home/index.html', {
-        'products': products,
+        'products': page,
         'categories': categories,
         'cart_item_count': cart_item_count,
     })
@@ -176,10 +168,57 @@ def monthly_report(request):
     return render(request, 'home/monthly_report.html', context)
 
 
+# ===========================
+# CATALOG LISTINGS
+# ===========================
+
+def catalog_queryset():
+    """Active approved products with the relations every listing card uses."""
+    return Product.objects.filter(
+        status='active', approval_status='approved'
+    ).select_related('category', 'seller')
+
+
+def catalog_json_response(page):
+    """Serialize a catalog page for infinite scroll."""
+    return JsonResponse({
+        'products': [
+            {
+                'id': product.id,
+                'name': product.name,
+                'price': str(product.price),
+                'image_url': product.get_image_url(),
+                'category': product.category.name if product.category else None,
+                'in_stock': product.is_in_stock(),
+                'stock': product.stock,
+                'rating_avg': round(product.rating_avg, 1),
+                'rating_count': product.rating_count,
+                'url': reverse('home:product_detail', args=[product.id]),
+            }
+            for product in page
+        ],
+        'has_next': page.has_next,
+        'next_cursor': page.next_cursor,
+        'next_url': page.next_url,
+    })
+
+
+def suggest(request):
+    """Autocomplete suggestions for the search box, served from the in-memory index."""
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 8)), 20))
+    except ValueError:
+        limit = 8
+    return JsonResponse({
+        'suggestions': suggest_service.suggest(request.GET.get('q', ''), limit),
+    })
+
+
+@page_cache.cache_anonymous_page(page_cache.CATALOG)
 def products(request):
     """Display all approved active products, optionally filter by category, search, and sort."""
-    products = Product.objects.filter(status='active', approval_status='approved')
-    categories = Category.objects.all()
+    products = catalog_queryset()
+    categories = get_categories()
     
     # Filter by category
     category_id = request.GET.get('category')
@@ -189,47 +228,28 @@ def products(request):
     # Search functionality
     search_query = request.GET.get('search', '').strip()
     if search_query:
-        products = products.filter(
-            models.Q(name__icontains=search_query) |
-            models.Q(description__icontains=search_query) |
-            models.Q(category__name__icontains=search_query)
-        )
+        products = search_products(products, search_query)
     
     # Sort functionality
-    sort_by = request.GET.get('sort', '')
-    if sort_by:
-        products = products.order_by(sort_by)
+    sort = resolve_product_sort(request.GET.get('sort'), searching=bool(search_query))
+    page = paginate_request(request, products, sort.ordering)
+    if request.GET.get('format') == 'json':
+        return catalog_json_response(page)
     
     return render(request, 'home/products.html', {
-        'products': products,
+        'products': page,
         'categories': categories,
         'search_query': search_query,
+        'sort_options': [RELEVANCE_SORT] + PRODUCT_SORT_OPTIONS if search_query else PRODUCT_SORT_OPTIONS,
+        'current_sort': sort.key,
     })
 
 
+@page_cache.cache_anonymous_page(page_cache.CATALOG)
 def category_products(request, category_slug):
     """Display products for a specific category using database categories."""
-    # Get all categories from database
-    db_categories = Category.objects.all()
-    categories = []
-    selected_category = None
-    
-    for category in db_categories:
-        slug = category.slug if hasattr(category, 'slug') and category.slug else category.name.lower().replace(" ", "-").replace("'", "")
-        icon = category.icon if category.icon else 'fas fa-shopping-bag'
-        
-        cat_data = {
-            'name': category.name,
-            'slug': slug,
-            'icon': icon,
-            'image': category.image.url if category.image else None,
-            'db_id': category.id
-        }
-        categories.append(cat_data)
-        
-        if slug == category_slug:
-            selected_category = cat_data
-            selected_db_category = category
+    categories = get_categories()
+    selected_category = get_category_by_slug(category_slug)
 
     if not selected_category:
         raise Http404("Category not found")
@@ -239,27 +259,23 @@ def category_products(request, category_slug):
     
     # Get products - search across all products if search query exists
     if search_query:
-        products = Product.objects.filter(
-            status='active',
-            approval_status='approved'
-        ).filter(
-            models.Q(name__icontains=search_query) |
-            models.Q(description__icontains=search_query) |
-            models.Q(category__name__icontains=search_query)
-        )
+        products = search_products(catalog_queryset(), search_query)
         search_performed = True
     else:
         # Get products for this category only
-        products = Product.objects.filter(
-            status='active',
-            approval_status='approved',
-            category=selected_db_category
-        )
+        products = catalog_queryset().filter(category_id=selected_category['db_id'])
         search_performed = False
 
+    sort = resolve_product_sort(request.GET.get('sort'), searching=search_performed)
+    page = paginate_request(request, products, sort.ordering)
+    if request.GET.get('format') == 'json':
+        return catalog_json_response(page)
+
     return render(request, 'home/category_products.html', {
         'selected_category': selected_category,
-        'products': products,
+        'products': page,
+        # The page holds one keyset slice; the heading counts every match
+        'total_count': products.count(),
         'categories': categories,
         'search_query': search_query,
         'search_performed': search_performed,
@@ -343,9 +359,12 @@ def manage_products(request):
     return render(request, 'home/manage_products.html', {'products': products})
 
 
+@cache_control(private=True, no_cache=True)
+@vary_on_cookie
+@condition(etag_func=conditional.product_etag)
 def product_detail(request, id):
     product = get_object_or_404(Product, id=id)
-    categories = Category.objects.all()
+    categories = get_categories()
     return render(request, 'home/product_detail.html', {'product': product, 'categories': categories})
 
 
@@ -610,7 +629,7 @@ def checkout_process(request):
             print(f"DEBUG: POST data: {request.POST}")
             
             # Get cart items
-            cart_items = Cart.objects.filter(user=request.user)
+            cart_items = Cart.objects.filter(user=request.user).select_related('product')
             print(f"DEBUG: Found {cart_items.count()} cart items for user {request.user}")
             
             if not cart_items.exists():
@@ -670,73 +689,40 @@ def checkout_process(request):
                 messages.error(request, "Invalid total price format.")
                 return redirect('home:checkout')
             
-            # Import the correct Checkout model
-            from home.models import Checkout
-            from payment.models import Payment
+            from home.services import CheckoutService
             import time
             
             # Generate unique transaction reference
             transaction_ref = f"{payment_method.upper()}_{request.user.id}_{int(time.time())}"
             
-            # Create checkout record
-            print("DEBUG: Creating checkout record...")
-            checkout = Checkout.objects.create(
-                user=request.user,
-                location=location,
-                phone_number=phone_number,
-                gps_location=gps_location,
-                delivery_address=street_address,
-                payment_method=payment_method,
-                delivery_fee=delivery_fee,
-                transaction_id=transaction_ref,
-                payment_status='pending'
+            # Create checkout, payment, orders and sales in one transaction
+            logger.debug("Placing order for user %s", request.user.pk)
+            checkout = CheckoutService.place_order(
+                request.user,
+                checkout_fields={
+                    'location': location,
+                    'phone_number': phone_number,
+                    'gps_location': gps_location,
+                    'delivery_address': street_address,
+                    'payment_method': payment_method,
+                    'delivery_fee': delivery_fee,
+                    'transaction_id': transaction_ref,
+                    'payment_status': 'pending',
+                },
+                payment_fields={
+                    'method': payment_method,
+                    'amount': total_price_decimal,
+                    'reference': transaction_ref,
+                    'status': 'pending',
+                    'phone_number': phone_number,
+                    'location': location,
+                    'gps_location': gps_location,
+                    'hostel_name': area_name,
+                    'room_number': street_address,
+                },
             )
             print(f"DEBUG: Checkout created with ID: {checkout.id}")
             
-            # Create payment record for admin verification
-            print("DEBUG: Creating payment record...")
-            payment = Payment.objects.create(
-                user=request.user,
-                method=payment_method,
-                amount=total_price_decimal,
-                reference=transaction_ref,
-                status='pending',
-                phone_number=phone_number,
-                location=location,
-                gps_location=gps_location,
-                hostel_name=area_name,
-                room_number=street_address
-            )
-            print(f"DEBUG: Payment created with ID: {payment.id}, Reference: {payment.reference}")
-            
-            # Create orders for each cart item
-            print("DEBUG: Creating orders...")
-            for cart_item in cart_items:
-                Order.objects.create(
-                    user=request.user,
-                    product=cart_item.product,
-                    quantity=cart_item.quantity,
-                    total_price=cart_item.get_total_price(),
-                    checkout=checkout
-                )
-                
-                # Reduce product stock
-                cart_item.product.reduce_stock(cart_item.quantity)
-                
-                # Create sale record
-                Sale.objects.create(
-                    product=cart_item.product,
-                    seller=cart_item.product.seller,
-                    buyer=request.user,
-                    total_amount=cart_item.get_total_price(),
-                    quantity=cart_item.quantity
-                )
-                print(f"DEBUG: Created order for product: {cart_item.product.name}")
-            
-            # Clear cart
-            cart_items.delete()
-            print("DEBUG: Cart cleared")
-            
             # Store order details in session for confirmation page
             request.session['last_order'] = {
                 'checkout_id': checkout.id,
@@ -871,24 +857,22 @@ def product_reviews(request, product_id):
     Display all reviews for a product.
     """
     from home.models import Product, Review
-    from django.db.models import Avg, Count
     
     product = get_object_or_404(Product, id=product_id)
     
     # Get all reviews for the product
     reviews = Review.objects.filter(product=product).select_related('user')
     
-    # Calculate statistics
-    stats = reviews.aggregate(
-        average_rating=Avg('rating'),
-        total_reviews=Count('id'),
-        verified_count=Count('id', filter=models.Q(is_verified_purchase=True))
-    )
-    
-    # Rating distribution
-    rating_distribution = {}
-    for i in range(1, 6):
-        rating_distribution[i] = reviews.filter(rating=i).count()
+    # Average, counts and distribution in a single aggregate query
+    review_stats = product.get_review_stats()
+    stats = {
+        'average_rating': review_stats['average_rating'],
+        'total_reviews': review_stats['total_reviews'],
+        'verified_count': review_stats['verified_count'],
+    }
+    rating_distribution = {
+        star: data['count'] for star, data in review_stats['distribution'].items()
+    }
     
     # Pagination
     paginator = Paginator(reviews, 10)  # 10 reviews per page
@@ -914,6 +898,8 @@ def product_reviews(request, product_id):
 
 # Receipt Generation Views
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=conditional.receipt_etag, last_modified_func=conditional.receipt_last_modified)
 def download_receipt(request, checkout_id):
     """
     Generate and download PDF receipt for a checkout
@@ -927,14 +913,13 @@ def download_receipt(request, checkout_id):
         return redirect('home:user_checkouts')
     
     try:
-        # Generate PDF receipt
-        pdf_content = generate_receipt(checkout)
-        
-        # Create HTTP response with PDF
-        response = HttpResponse(pdf_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="receipt_MW{checkout.id:06d}.pdf"'
-        
-        return response
+        # Stream the stored PDF; it is only rendered if the receipt changed
+        return FileResponse(
+            open_receipt(checkout),
+            content_type='application/pdf',
+            as_attachment=True,
+            filename=f'receipt_MW{checkout.id:06d}.pdf',
+        )
         
     except Exception as e:
         messages.error(request, f'Error generating receipt: {str(e)}')
@@ -942,6 +927,8 @@ def download_receipt(request, checkout_id):
 
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=conditional.receipt_etag, last_modified_func=conditional.receipt_last_modified)
 def view_receipt(request, checkout_id):
     """
     View PDF receipt inline in browser
@@ -955,14 +942,13 @@ def view_receipt(request, checkout_id):
         return redirect('home:user_checkouts')
     
     try:
-        # Generate PDF receipt
-        pdf_content = generate_receipt(checkout)
-        
-        # Create HTTP response with PDF for inline viewing
-        response = HttpResponse(pdf_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'inline; filename="receipt_MW{checkout.id:06d}.pdf"'
-        
-        return response
+        # Stream the stored PDF; it is only rendered if the receipt changed
+        return FileResponse(
+            open_receipt(checkout),
+            content_type='application/pdf',
+            as_attachment=False,
+            filename=f'receipt_MW{checkout.id:06d}.pdf',
+        )
         
     except Exception as e:
         messages.error(request, f'Error generating receipt: {str(e)}')
@@ -1004,6 +990,7 @@ def download_product_manual(request, product_id):
 from home.models import PlatformGuide, ProductManual
 
 
+@page_cache.cache_anonymous_page(page_cache.GUIDES)
 def help_center(request):
     """Display help center with guide categories and featured guides."""
     # Get featured guides
@@ -1039,11 +1026,19 @@ def help_center(request):
 
 def guide_detail(request, slug):
     """Display full guide content and increment view count."""
+    # Counted here so cached renders still register the view
+    if not PlatformGuide.objects.filter(slug=slug, is_published=True).update(view_count=models.F('view_count') + 1):
+        raise Http404("Guide not found")
+    return _render_guide_detail(request, slug)
+
+
+@cache_control(no_cache=True)
+@vary_on_cookie
+@condition(etag_func=conditional.guide_etag, last_modified_func=conditional.guide_last_modified)
+@page_cache.cache_anonymous_page(page_cache.GUIDES)
+def _render_guide_detail(request, slug):
     guide = get_object_or_404(PlatformGuide, slug=slug, is_published=True)
     
-    # Increment view count
-    guide.increment_view_count()
-    
     # Get related guides from same category
     related_guides = PlatformGuide.objects.filter(
         is_published=True,
@@ -1296,12 +1291,17 @@ def admin_chat_dashboard(request):
     # Order by priority: unread first, then by last activity
     sessions = sessions.order_by('-last_message_at')
     
-    # Get statistics
+    # Get statistics: one GROUP BY for the status counts, one COUNT for unread messages
+    status_counts = dict(
+        ChatSession.objects.order_by().values('status').annotate(count=models.Count('id')).values_list('status', 'count')
+    )
     stats = {
-        'active': ChatSession.objects.filter(status='active').count(),
-        'waiting': ChatSession.objects.filter(status='waiting').count(),
-        'closed': ChatSession.objects.filter(status='closed').count(),
-        'total_unread': sum(s.get_unread_count(for_admin=True) for s in ChatSession.objects.filter(status='active'))
+        'active': status_counts.get('active', 0),
+        'waiting': status_counts.get('waiting', 0),
+        'closed': status_counts.get('closed', 0),
+        'total_unread': ChatMessage.objects.filter(
+            session__status='active', is_read=False, is_admin=False
+        ).count()
     }
     
     context = {
@@ -0,0 +1,171 @@
+"""
+Two-tier cache backend.
+
+Reads are served from a small in-process LRU (L1) when possible and fall
+back to the shared cache (L2) that every gunicorn worker talks to. Writes go
+to L2 and refresh L1. L1 entries live for at most L1_TIMEOUT seconds, which
+bounds how stale another worker's write can look from this process.
+
+Configured in settings.CACHES as the 'default' alias:
+
+    'default': {
+        'BACKEND': 'montclair_wardrobe.cache.TwoTierCache',
+        'OPTIONS': {'L2': 'shared', 'L1_TIMEOUT': 5, 'L1_MAX_ENTRIES': 1000},
+    }
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class LRUStore:
+    """Size-bounded, TTL-aware in-process store of pickled values."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return payload
+
+    def set(self, key, payload, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoTierCache(BaseCache):
+    """In-process LRU in front of a shared cache alias."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', 'shared')
+        self._l1_timeout = options.get('L1_TIMEOUT', 5)
+        self._l1 = LRUStore(options.get('L1_MAX_ENTRIES', 1000))
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _l1_key(self, key, version):
+        return self.make_and_validate_key(key, version=version)
+
+    def _l1_ttl(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self._l1_timeout
+        return min(self._l1_timeout, timeout)
+
+    def _remember(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._l1_ttl(timeout)
+        if ttl > 0:
+            self._l1.set(self._l1_key(key, version), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ttl)
+        else:
+            self._l1.delete(self._l1_key(key, version))
+
+    def get(self, key, default=None, version=None):
+        payload = self._l1.get(self._l1_key(key, version))
+        if payload is not None:
+            return pickle.loads(payload)
+        sentinel = object()
+        value = self.l2.get(key, sentinel, version=version)
+        if value is sentinel:
+            return default
+        self._remember(key, value, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            payload = self._l1.get(self._l1_key(key, version))
+            if payload is None:
+                missing.append(key)
+            else:
+                found[key] = pickle.loads(payload)
+        if missing:
+            shared = self.l2.get_many(missing, version=version)
+            for key, value in shared.items():
+                self._remember(key, value, version=version)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version=version)
+        self._remember(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._remember(key, value, timeout, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version=version)
+        if added:
+            self._remember(key, value, timeout, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version=version)
+        # The shared entry keeps its own expiry; only refresh the short L1 copy
+        self._remember(key, value, None, version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def has_key(self, key, version=None):
+        if self._l1.get(self._l1_key(key, version)) is not None:
+            return True
+        return self.l2.has_key(key, version=version)
+
+    def delete(self, key, version=None):
+        self._l1.delete(self._l1_key(key, version))
+        return self.l2.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._l1.delete(self._l1_key(key, version))
+        self.l2.delete_many(keys, version=version)
+
+    def clear(self):
+        self._l1.clear()
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
@@ -91,6 +91,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.media',  # Added for media file URLs
+                'home.context_processors.category_navigation',
                 
             ],
         },
@@ -141,6 +142,68 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# 'shared' is seen by every worker: Redis (REDIS_URL, needs the redis package)
+# or Memcached (MEMCACHED_LOCATION, needs pymemcache) when configured,
+# otherwise a file-based cache on local disk. 'default' keeps a small
+# in-process LRU in front of it; all cache users go through 'default'.
+#
+# Version stamps (page cache namespaces, suggest index) go through
+# 'versions' instead. Its file-based fallback lives in its own directory and
+# never culls: the file cache evicts entries at random once MAX_ENTRIES is
+# reached, and an evicted stamp would restart at 0 and bring back pages
+# cached under an old version. The file cache's incr is not atomic, so two
+# workers bumping at once may land on the same new value; both writes are
+# committed by then, so the stamp still moves past them.
+
+CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, '.django_cache'))
+
+if os.environ.get('REDIS_URL'):
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+    VERSION_STORE = SHARED_CACHE
+elif os.environ.get('MEMCACHED_LOCATION'):
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.environ['MEMCACHED_LOCATION'],
+    }
+    VERSION_STORE = SHARED_CACHE
+else:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+    VERSION_STORE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'versions'),
+        # A handful of keys; the limit only exists to switch culling off
+        'OPTIONS': {'MAX_ENTRIES': 10 ** 9},
+    }
+
+CACHE_L1_TIMEOUT = int(os.environ.get('CACHE_L1_TIMEOUT', 5))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'montclair_wardrobe.cache.TwoTierCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_TIMEOUT': CACHE_L1_TIMEOUT,
+            'L1_MAX_ENTRIES': int(os.environ.get('CACHE_L1_MAX_ENTRIES', 1000)),
+        },
+    },
+    'versions': {
+        'BACKEND': 'montclair_wardrobe.cache.TwoTierCache',
+        'OPTIONS': {'L2': 'version_store', 'L1_TIMEOUT': CACHE_L1_TIMEOUT, 'L1_MAX_ENTRIES': 100},
+    },
+    'shared': SHARED_CACHE,
+    'version_store': VERSION_STORE,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -295,3 +358,7 @@ STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY', '')
 
 # Google Maps API Key
 GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY', '')
+
+
+# Seconds a cached report (reports.ReportCache) is served before it is recomputed
+REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', 900))
@@ -4,10 +4,10 @@ from .models import ReportCache, ReportSchedule, ReportAccess
 
 @admin.register(ReportCache)
 class ReportCacheAdmin(admin.ModelAdmin):
-    list_display = ('report_type', 'date_from', 'date_to', 'generated_at', 'is_expired')
+    list_display = ('report_type', 'date_from', 'date_to', 'params', 'generated_at', 'is_expired')
     list_filter = ('report_type', 'generated_at')
     search_fields = ('report_type',)
-    readonly_fields = ('generated_at', 'expires_at')
+    readonly_fields = ('generated_at', 'expires_at', 'params', 'params_key')
     
     def is_expired(self, obj):
         return obj.is_expired()
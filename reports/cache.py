@@ -0,0 +1,239 @@
+"""
+Read-through cache for ReportService results, stored in ReportCache.
+
+``cached_report`` wraps a report method. Calls are keyed by report type,
+the resolved date range and any other arguments, so serving a fresh row is
+one lookup on the unique (report_type, date_from, date_to, params_key)
+index.
+
+A missing or expired row is recomputed by one caller at a time. The caller
+that wins the lock (an atomic cache.add) recomputes and stores the row.
+Everyone else serves the expired row if there is one. When there is not,
+they wait at most LOCK_WAIT seconds for the winner's row and then compute
+the report themselves, so a sync worker is never parked on someone else's
+recompute.
+
+Expired rows are evicted by ``python manage.py sweep_report_cache``.
+Hit/stale/miss counters live in the shared cache (see get_stats()).
+"""
+
+import hashlib
+import inspect
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+DEFAULT_RANGE_DAYS = 30
+LOCK_TIMEOUT = 120
+LOCK_WAIT = 0.5
+LOCK_POLL_INTERVAL = 0.1
+OUTCOMES = ('hit', 'stale', 'miss')
+DATE_ARGUMENTS = ('date', 'date_from', 'date_to')
+
+
+def report_range(date_from=None, date_to=None):
+    """Fill in the default range: the last 30 days up to today."""
+    today = timezone.now().date()
+    if date_from is None:
+        date_from = today - timedelta(days=DEFAULT_RANGE_DAYS)
+    if date_to is None:
+        date_to = today
+    return date_from, date_to
+
+
+def _stats_key(outcome):
+    return f'report_cache:stats:{outcome}'
+
+
+def _lock_key(report_type, date_from, date_to, params_key):
+    return f'report_cache:lock:{report_type}:{date_from}:{date_to}:{params_key}'
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def _to_json(data):
+    # Cache hits come back from a JSONField, so misses return the same shapes
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+def _resolve(arguments):
+    """
+    Split bound arguments into the cached date range and the other params.
+
+    Reports take either ``date`` (one day), ``date_from``/``date_to``, or no
+    dates at all (a snapshot as of today). Defaults are filled in here so
+    that "no dates" and the explicit default range share one row.
+    """
+    if 'date' in arguments:
+        arguments['date'] = arguments['date'] or timezone.now().date()
+        date_from = date_to = arguments['date']
+    elif 'date_from' in arguments or 'date_to' in arguments:
+        date_from, date_to = report_range(arguments.get('date_from'), arguments.get('date_to'))
+        arguments['date_from'], arguments['date_to'] = date_from, date_to
+    else:
+        date_from = date_to = timezone.now().date()
+    params = {name: value for name, value in arguments.items() if name not in DATE_ARGUMENTS}
+    return date_from, date_to, _to_json(params)
+
+
+def params_key(params):
+    """Stable digest of a report's non-date parameters ('' when there are none)."""
+    if not params:
+        return ''
+    encoded = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def cached_report(report_type, ttl=None):
+    """
+    Serve a report method's result from ReportCache.
+
+    The undecorated method stays reachable as ``.uncached``.
+
+    Args:
+        report_type: ReportCache.report_type of the rows written
+        ttl: Seconds a row stays fresh (default: settings.REPORT_CACHE_TTL)
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            date_from, date_to, params = _resolve(arguments)
+            return _read_through(
+                report_type, date_from, date_to, params,
+                compute=lambda: func(**arguments),
+                ttl=settings.REPORT_CACHE_TTL if ttl is None else ttl,
+            )
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def _read_through(report_type, date_from, date_to, params, compute, ttl):
+    from .models import ReportCache
+
+    lookup = {
+        'report_type': report_type,
+        'date_from': date_from,
+        'date_to': date_to,
+        'params_key': params_key(params),
+    }
+    entry = _find(lookup)
+    if entry is not None and not entry.is_expired():
+        _incr(_stats_key('hit'))
+        return entry.data
+
+    lock = _lock_key(**lookup)
+    if not cache.add(lock, 1, LOCK_TIMEOUT):
+        # Someone else is recomputing this report
+        if entry is not None:
+            _incr(_stats_key('stale'))
+            return entry.data
+        entry = _wait_for(lookup)
+        if entry is not None:
+            _incr(_stats_key('hit'))
+            return entry.data
+        # The winner is still computing; don't hold the worker any longer
+        _incr(_stats_key('miss'))
+        return _to_json(compute())
+
+    try:
+        _incr(_stats_key('miss'))
+        data = _to_json(compute())
+        now = timezone.now()
+        ReportCache.objects.update_or_create(
+            **lookup,
+            defaults={
+                'params': params,
+                'data': data,
+                'generated_at': now,
+                'expires_at': now + timedelta(seconds=ttl),
+            },
+        )
+    finally:
+        cache.delete(lock)
+    return data
+
+
+def _find(lookup):
+    from .models import ReportCache
+
+    try:
+        return ReportCache.objects.only('data', 'expires_at').get(**lookup)
+    except ReportCache.DoesNotExist:
+        return None
+
+
+def _wait_for(lookup):
+    """Poll for a fresh row written by the lock holder, for up to LOCK_WAIT seconds."""
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = _find(lookup)
+        if entry is not None and not entry.is_expired():
+            return entry
+    return None
+
+
+def sweep(grace=timedelta(0)):
+    """
+    Delete rows that expired more than ``grace`` ago.
+
+    Rows inside the grace period are still served while they are being
+    recomputed.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    from .models import ReportCache
+
+    deleted, _ = ReportCache.objects.filter(expires_at__lt=timezone.now() - grace).delete()
+    return deleted
+
+
+def get_stats():
+    """
+    Get cache counters and row counts.
+
+    Returns:
+        dict: hits, stale, misses, hit_rate, rows, expired_rows
+    """
+    from .models import ReportCache
+
+    counts = cache.get_many([_stats_key(outcome) for outcome in OUTCOMES])
+    hits, stale, misses = (counts.get(_stats_key(outcome), 0) for outcome in OUTCOMES)
+    total = hits + stale + misses
+    rows = ReportCache.objects.aggregate(
+        rows=Count('id'),
+        expired_rows=Count('id', filter=Q(expires_at__lte=timezone.now())),
+    )
+    return {
+        'hits': hits,
+        'stale': stale,
+        'misses': misses,
+        'hit_rate': round((hits + stale) / total, 3) if total else 0.0,
+        **rows,
+    }
+
+
+def reset_stats():
+    cache.delete_many([_stats_key(outcome) for outcome in OUTCOMES])
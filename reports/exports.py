@@ -0,0 +1,221 @@
+"""
+CSV and PDF renderings of ReportService reports.
+
+Used by the export view and by the scheduled report runner
+(reports.scheduler), so neither needs a request to render a report.
+"""
+
+import csv
+from io import BytesIO, StringIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .services import ReportService
+
+
+SUMMARY_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#d4af37')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+]
+
+
+def get_report_data(report_type, date_from, date_to):
+    """
+    Fetch a report through the cached ReportService.
+
+    The daily sales report covers one day, ``date_to``. The stock level
+    report is a snapshot and ignores the dates.
+    """
+    if report_type == 'daily_sales':
+        return ReportService.get_daily_sales_report(date_to)
+    if report_type == 'order_status':
+        return ReportService.get_order_status_report(date_from, date_to)
+    if report_type == 'product_sales':
+        return ReportService.get_product_sales_report(date_from, date_to)
+    if report_type == 'stock_level':
+        return ReportService.get_stock_level_report()
+    if report_type == 'customer_growth':
+        return ReportService.get_customer_growth_report(date_from, date_to)
+    raise ValueError(f'Unknown report type: {report_type}')
+
+
+def write_csv(out, report_type, report_data, date_from, date_to):
+    """Write a report as CSV rows to the text file ``out``."""
+    writer = csv.writer(out)
+
+    if report_type == 'daily_sales':
+        writer.writerow(['Daily Sales Report', date_to])
+        writer.writerow([])
+        writer.writerow(['Metric', 'Value'])
+        writer.writerow(['Total Sales', report_data['total_sales']])
+        writer.writerow(['Total Revenue', f"ZMW {report_data['total_revenue']:.2f}"])
+        writer.writerow(['Unique Customers', report_data['unique_customers']])
+        writer.writerow(['Average Order Value', f"ZMW {report_data['average_order_value']:.2f}"])
+
+    elif report_type == 'order_status':
+        writer.writerow(['Order Status Report', f'{date_from} to {date_to}'])
+        writer.writerow([])
+        writer.writerow(['Metric', 'Value'])
+        writer.writerow(['Total Orders', report_data['total_orders']])
+        writer.writerow(['Total Revenue', f"ZMW {report_data['total_revenue']:.2f}"])
+        writer.writerow(['Pending Orders', report_data['pending_orders']])
+        writer.writerow(['Cancellation Rate', f"{report_data['cancellation_rate']:.1f}%"])
+
+    elif report_type == 'product_sales':
+        writer.writerow(['Product Sales Report', f'{date_from} to {date_to}'])
+        writer.writerow([])
+        writer.writerow(['Product Name', 'Category', 'Units Sold', 'Revenue', 'Average Price'])
+        for product in report_data['products']:
+            writer.writerow([
+                product['name'],
+                product['category'],
+                product['units_sold'],
+                f"ZMW {product['revenue']:.2f}",
+                f"ZMW {product['average_price']:.2f}",
+            ])
+
+    elif report_type == 'stock_level':
+        writer.writerow(['Stock Level Report'])
+        writer.writerow([])
+        writer.writerow(['Metric', 'Value'])
+        writer.writerow(['Total Products', report_data['total_products']])
+        writer.writerow(['In Stock', report_data['in_stock']])
+        writer.writerow(['Out of Stock', report_data['out_of_stock']])
+        writer.writerow(['Low Stock', report_data['low_stock']])
+        writer.writerow(['Total Inventory Value', f"ZMW {report_data['total_inventory_value']:.2f}"])
+
+    elif report_type == 'customer_growth':
+        writer.writerow(['Customer Growth Report', f'{date_from} to {date_to}'])
+        writer.writerow([])
+        writer.writerow(['Metric', 'Value'])
+        writer.writerow(['New Customers', report_data['new_customers']])
+        writer.writerow(['Total Active Customers', report_data['total_customers']])
+        writer.writerow(['Customers with Orders', report_data['customers_with_orders']])
+        writer.writerow(['Repeat Customers', report_data['repeat_customers']])
+        writer.writerow(['Average LTV', f"ZMW {report_data['average_ltv']:.2f}"])
+
+
+def render_csv(report_type, report_data, date_from, date_to):
+    """Return a report as CSV text."""
+    out = StringIO()
+    write_csv(out, report_type, report_data, date_from, date_to)
+    return out.getvalue()
+
+
+def _summary_table(rows, style=SUMMARY_TABLE_STYLE):
+    table = Table(rows, colWidths=[3*inch, 2*inch])
+    table.setStyle(TableStyle(style))
+    return table
+
+
+def render_pdf(report_type, report_data, date_from, date_to):
+    """Return a report as PDF bytes."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#d4af37'),
+        spaceAfter=30,
+    )
+
+    # Heading style
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#d4af37'),
+        spaceAfter=12,
+    )
+
+    if report_type == 'daily_sales':
+        elements.append(Paragraph(f'Daily Sales Report - {date_to}', title_style))
+        elements.append(Spacer(1, 0.3*inch))
+
+        elements.append(_summary_table([
+            ['Metric', 'Value'],
+            ['Total Sales', str(report_data['total_sales'])],
+            ['Total Revenue', f"ZMW {report_data['total_revenue']:.2f}"],
+            ['Unique Customers', str(report_data['unique_customers'])],
+            ['Average Order Value', f"ZMW {report_data['average_order_value']:.2f}"],
+        ], style=SUMMARY_TABLE_STYLE + [
+            ('FONTSIZE', (0, 0), (-1, 0), 14),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+        ]))
+        elements.append(Spacer(1, 0.3*inch))
+
+        # Top products
+        if report_data.get('top_products'):
+            elements.append(Paragraph('Top 5 Products Sold', heading_style))
+            products_data = [['Product Name', 'Quantity', 'Revenue']]
+            for product in report_data['top_products']:
+                products_data.append([
+                    product['name'][:30],
+                    str(product['quantity']),
+                    f"ZMW {product['revenue']:.2f}"
+                ])
+
+            products_table = Table(products_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
+            products_table.setStyle(TableStyle(SUMMARY_TABLE_STYLE))
+            elements.append(products_table)
+
+    elif report_type == 'order_status':
+        elements.append(Paragraph(f'Order Status Report - {date_from} to {date_to}', title_style))
+        elements.append(Spacer(1, 0.3*inch))
+        elements.append(_summary_table([
+            ['Metric', 'Value'],
+            ['Total Orders', str(report_data['total_orders'])],
+            ['Total Revenue', f"ZMW {report_data['total_revenue']:.2f}"],
+            ['Pending Orders', str(report_data['pending_orders'])],
+            ['Cancellation Rate', f"{report_data['cancellation_rate']:.1f}%"],
+        ]))
+
+    elif report_type == 'product_sales':
+        elements.append(Paragraph(f'Product Sales Report - {date_from} to {date_to}', title_style))
+        elements.append(Spacer(1, 0.3*inch))
+        elements.append(_summary_table([
+            ['Metric', 'Value'],
+            ['Products Sold', str(report_data['total_products_sold'])],
+            ['Total Units', str(report_data['total_units'])],
+            ['Total Revenue', f"ZMW {report_data['total_revenue']:.2f}"],
+        ]))
+
+    elif report_type == 'stock_level':
+        elements.append(Paragraph('Stock Level Report', title_style))
+        elements.append(Spacer(1, 0.3*inch))
+        elements.append(_summary_table([
+            ['Metric', 'Value'],
+            ['Total Products', str(report_data['total_products'])],
+            ['In Stock', str(report_data['in_stock'])],
+            ['Out of Stock', str(report_data['out_of_stock'])],
+            ['Low Stock', str(report_data['low_stock'])],
+            ['Total Inventory Value', f"ZMW {report_data['total_inventory_value']:.2f}"],
+        ]))
+
+    elif report_type == 'customer_growth':
+        elements.append(Paragraph(f'Customer Growth Report - {date_from} to {date_to}', title_style))
+        elements.append(Spacer(1, 0.3*inch))
+        elements.append(_summary_table([
+            ['Metric', 'Value'],
+            ['New Customers', str(report_data['new_customers'])],
+            ['Total Active Customers', str(report_data['total_customers'])],
+            ['Customers with Orders', str(report_data['customers_with_orders'])],
+            ['Repeat Customers', str(report_data['repeat_customers'])],
+            ['Average LTV', f"ZMW {report_data['average_ltv']:.2f}"],
+        ]))
+
+    doc.build(elements)
+    return buffer.getvalue()
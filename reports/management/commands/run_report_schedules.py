@@ -0,0 +1,62 @@
+"""
+Management command to send due scheduled reports.
+Run with: python manage.py run_report_schedules
+Schedule it via cron (e.g. every 15 minutes), or add --loop to keep it
+running and check for due schedules every --interval seconds.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from reports.scheduler import run_due_schedules
+
+
+class Command(BaseCommand):
+    help = 'Render and email ReportSchedule entries that are due'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, checking for due schedules every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=300,
+            help='Seconds between checks with --loop (default: 300)'
+        )
+
+    def handle(self, *args, **options):
+        if options['interval'] < 1:
+            raise CommandError('--interval must be at least 1')
+
+        if not options['loop']:
+            self.run_once()
+            return
+
+        self.stdout.write(f"Checking for due reports every {options['interval']} seconds...")
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    self.run_once()
+                except Exception as e:
+                    # Keep looping; the failed schedules are retried next time
+                    self.stdout.write(self.style.ERROR(f'Run failed: {e}'))
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
+
+    def run_once(self):
+        metrics = run_due_schedules()
+        if not any(metrics.values()):
+            self.stdout.write('No reports due.')
+            return
+        style = self.style.WARNING if metrics['failed'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Sent {metrics['sent']} report(s) from {metrics['rendered']} rendering(s); "
+            f"{metrics['failed']} failed, {metrics['skipped']} skipped."
+        ))
@@ -0,0 +1,51 @@
+"""
+Management command to evict expired rows from the report cache.
+Run with: python manage.py sweep_report_cache
+Can be scheduled via cron. Rows that expired less than --grace minutes ago
+are kept so they can still be served while a report is being recomputed.
+Add --stats to print the hit/miss counters, --reset-stats to zero them.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from reports import cache as report_cache
+
+
+class Command(BaseCommand):
+    help = 'Delete expired ReportCache rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=60,
+            help='Minutes an expired row is kept before eviction (default: 60)'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print cache counters after sweeping'
+        )
+        parser.add_argument(
+            '--reset-stats',
+            action='store_true',
+            help='Reset the cache counters after sweeping'
+        )
+
+    def handle(self, *args, **options):
+        if options['grace'] < 0:
+            raise CommandError('--grace must not be negative')
+
+        deleted = report_cache.sweep(timedelta(minutes=options['grace']))
+        self.stdout.write(self.style.SUCCESS(f'Evicted {deleted} expired report(s).'))
+
+        if options['stats']:
+            stats = report_cache.get_stats()
+            self.stdout.write(
+                f"hits={stats['hits']} stale={stats['stale']} misses={stats['misses']} "
+                f"hit_rate={stats['hit_rate']:.1%} rows={stats['rows']} expired={stats['expired_rows']}"
+            )
+        if options['reset_stats']:
+            report_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
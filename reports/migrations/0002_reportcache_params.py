@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='reportcache',
+            name='reports_rep_report__92ab15_idx',
+        ),
+        migrations.AddField(
+            model_name='reportcache',
+            name='params',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='reportcache',
+            name='params_key',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='reportcache',
+            constraint=models.UniqueConstraint(fields=('report_type', 'date_from', 'date_to', 'params_key'), name='unique_report_cache_entry'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+
+def set_send_day(apps, schema_editor):
+    ReportSchedule = apps.get_model('reports', 'ReportSchedule')
+    for schedule in ReportSchedule.objects.only('pk', 'next_send'):
+        ReportSchedule.objects.filter(pk=schedule.pk).update(send_day=schedule.next_send.day)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_reportcache_params'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportschedule',
+            name='send_day',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(set_send_day, migrations.RunPython.noop),
+    ]
@@ -2,11 +2,16 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 
 
 class ReportCache(models.Model):
-    """Cache for generated reports to improve performance"""
+    """
+    Cache for generated reports to improve performance.
+
+    Rows are written and read by reports.cache.cached_report; one row per
+    report type, date range and extra parameters.
+    """
     REPORT_TYPES = [
         ('daily_sales', _('Daily Sales Report')),
         ('order_status', _('Order Status Report')),
@@ -18,14 +23,22 @@ class ReportCache(models.Model):
     report_type = models.CharField(max_length=50, choices=REPORT_TYPES)
     date_from = models.DateField()
     date_to = models.DateField()
+    params = models.JSONField(default=dict, blank=True)
+    params_key = models.CharField(max_length=64, blank=True, default='')
     data = models.JSONField()
     generated_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
     
     class Meta:
         ordering = ['-generated_at']
+        constraints = [
+            # Also the index behind the one-query cache lookup
+            models.UniqueConstraint(
+                fields=['report_type', 'date_from', 'date_to', 'params_key'],
+                name='unique_report_cache_entry',
+            ),
+        ]
         indexes = [
-            models.Index(fields=['report_type', 'date_from', 'date_to']),
             models.Index(fields=['expires_at']),
         ]
     
@@ -60,12 +73,26 @@ class ReportSchedule(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_sent = models.DateTimeField(null=True, blank=True)
     next_send = models.DateTimeField()
+    # Day of month monthly sends return to after a shorter month clamps them
+    send_day = models.PositiveSmallIntegerField(editable=False, default=1)
     
     class Meta:
         ordering = ['next_send']
     
     def __str__(self):
         return f"{self.get_report_type_display()} - {self.get_frequency_display()}"
+    
+    def save(self, *args, **kwargs):
+        # The runner advances next_send with update(), so this only sees
+        # send times chosen by people
+        self.send_day = timezone.localtime(self.next_send, dt_timezone.utc).day
+        if kwargs.get('update_fields') is not None and 'next_send' in kwargs['update_fields']:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'send_day'}
+        super().save(*args, **kwargs)
+    
+    def get_recipients(self):
+        """Recipient addresses, with blanks dropped"""
+        return [email.strip() for email in self.email_recipients.split(',') if email.strip()]
 
 
 class ReportAccess(models.Model):
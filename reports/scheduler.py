@@ -0,0 +1,187 @@
+"""
+Runs due ReportSchedule entries off the request path.
+
+``run_due_schedules()`` picks active schedules whose next_send has passed.
+Each report is computed through the cached ReportService for the period the
+schedule covers. CSV and PDF are rendered once per (report, period) and
+shared by every schedule that needs them. All mail in a run goes over a
+single SMTP connection.
+
+A schedule is claimed by moving next_send forward with a conditional
+UPDATE before anything is sent, so overlapping runners (cron plus a loop)
+never send one period twice. If rendering or sending fails, the claim is
+undone and the next run retries.
+
+Run with ``python manage.py run_report_schedules``.
+"""
+
+import calendar
+import logging
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from . import exports
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_DAYS = {'daily': 1, 'weekly': 7}
+
+
+def advance(frequency, when, send_day=None):
+    """
+    The send time one schedule period after ``when``.
+
+    Monthly sends land on ``send_day`` (default: ``when``'s day), clamped to
+    the length of the month, so a schedule for the 31st goes out on
+    28 February and on 31 March again.
+    """
+    if frequency == 'monthly':
+        when = when.astimezone(dt_timezone.utc)
+        year, month = (when.year + 1, 1) if when.month == 12 else (when.year, when.month + 1)
+        day = min(send_day or when.day, calendar.monthrange(year, month)[1])
+        return when.replace(year=year, month=month, day=day)
+    return when + timedelta(days=FREQUENCY_DAYS[frequency])
+
+
+def latest_slot(frequency, next_send, now, send_day=None):
+    """
+    The most recent send time due at ``now``, starting from ``next_send``.
+
+    A runner that was down for several periods sends only the latest one.
+    """
+    slot = next_send
+    while advance(frequency, slot, send_day) <= now:
+        slot = advance(frequency, slot, send_day)
+    return slot
+
+
+def schedule_period(frequency, day):
+    """
+    Dates covered by a report sent on ``day``.
+
+    The last full day, the seven days before ``day``, or the previous
+    calendar month.
+    """
+    end = day - timedelta(days=1)
+    if frequency == 'monthly':
+        end = day.replace(day=1) - timedelta(days=1)
+        return end.replace(day=1), end
+    return end - timedelta(days=FREQUENCY_DAYS[frequency] - 1), end
+
+
+def _claim(schedule, next_send):
+    from .models import ReportSchedule
+    return ReportSchedule.objects.filter(
+        pk=schedule.pk, next_send=schedule.next_send
+    ).update(next_send=next_send)
+
+
+def _release(schedule, next_send):
+    from .models import ReportSchedule
+    ReportSchedule.objects.filter(pk=schedule.pk, next_send=next_send).update(next_send=schedule.next_send)
+
+
+def _build_message(schedule, date_from, date_to, files):
+    csv_data, pdf_data = files
+    name = schedule.get_report_type_display()
+    stem = f'report_{schedule.report_type}_{date_from}_{date_to}'
+    message = EmailMessage(
+        subject=f'{name} ({date_from} to {date_to})',
+        body=(
+            f'Your {schedule.get_frequency_display().lower()} {name} for '
+            f'{date_from} to {date_to} is attached as CSV and PDF.\n\n'
+            'Montclair Wardrobe Team'
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=schedule.get_recipients(),
+    )
+    message.attach(f'{stem}.csv', csv_data, 'text/csv')
+    message.attach(f'{stem}.pdf', pdf_data, 'application/pdf')
+    return message
+
+
+def run_due_schedules(now=None, connection=None):
+    """
+    Render and mail every due schedule.
+
+    Args:
+        now: Time to run as (default: now)
+        connection: Mail connection to reuse (default: get_connection())
+
+    Returns:
+        dict: sent, failed, skipped (claimed elsewhere or no recipients)
+        and rendered (CSV/PDF pairs built)
+    """
+    from .models import ReportSchedule
+
+    now = now or timezone.now()
+    metrics = {'sent': 0, 'failed': 0, 'skipped': 0, 'rendered': 0}
+    due = ReportSchedule.objects.filter(is_active=True, next_send__lte=now).order_by('next_send')
+
+    files = {}
+    outgoing = []
+    for schedule in due:
+        slot = latest_slot(schedule.frequency, schedule.next_send, now, schedule.send_day)
+        next_send = advance(schedule.frequency, slot, schedule.send_day)
+        if not _claim(schedule, next_send):
+            # Another runner got here first
+            metrics['skipped'] += 1
+            continue
+        if not schedule.get_recipients():
+            metrics['skipped'] += 1
+            continue
+
+        date_from, date_to = schedule_period(schedule.frequency, timezone.localdate(slot))
+        if schedule.report_type == 'daily_sales':
+            # A one-day report; send the last day of the period
+            date_from = date_to
+        key = (schedule.report_type, date_from, date_to)
+        try:
+            if key not in files:
+                report_data = exports.get_report_data(*key)
+                files[key] = (
+                    exports.render_csv(schedule.report_type, report_data, date_from, date_to),
+                    exports.render_pdf(schedule.report_type, report_data, date_from, date_to),
+                )
+                metrics['rendered'] += 1
+        except Exception:
+            logger.exception('Could not render scheduled report %s', schedule.pk)
+            _release(schedule, next_send)
+            metrics['failed'] += 1
+            continue
+        outgoing.append((schedule, next_send, _build_message(schedule, date_from, date_to, files[key])))
+
+    if not outgoing:
+        return metrics
+
+    # Rendering is done, so the SMTP session is only held open while sending
+    connection = connection or get_connection()
+    attempted = 0
+    try:
+        with connection:
+            for schedule, next_send, message in outgoing:
+                attempted += 1
+                try:
+                    connection.send_messages([message])
+                except Exception:
+                    logger.exception('Could not send scheduled report %s', schedule.pk)
+                    _release(schedule, next_send)
+                    metrics['failed'] += 1
+                    continue
+                metrics['sent'] += 1
+                try:
+                    ReportSchedule.objects.filter(pk=schedule.pk).update(last_sent=now)
+                except Exception:
+                    # The mail is out and the claim stands; only the timestamp is lost
+                    logger.exception('Could not record scheduled report %s as sent', schedule.pk)
+    except Exception:
+        # The connection failed to open or close; give back what was not tried
+        logger.exception('Could not connect to the mail server')
+        for schedule, next_send, message in outgoing[attempted:]:
+            _release(schedule, next_send)
+        raise
+
+    return metrics
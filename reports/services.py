@@ -1,16 +1,26 @@
 from django.db.models import Sum, Count, Avg, Q
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
-from home.models import Product, Order, Category
+from home.models import DailySalesRollup, Product, Order, Category
+from home.services import SalesRollupService
 from django.contrib.auth.models import User
 import json
 
+from .cache import cached_report, report_range
+
 
 class ReportService:
-    """Service for generating various reports"""
+    """
+    Service for generating various reports.
+
+    Every report is served through ReportCache (see reports.cache); call
+    ``ReportService.get_..._report.uncached(...)`` to bypass it.
+    """
     
     @staticmethod
+    @cached_report('daily_sales')
     def get_daily_sales_report(date=None):
         """Generate daily sales report"""
         if date is None:
@@ -24,46 +34,35 @@ class ReportService:
             created_at__lte=end_of_day,
             status__in=['completed', 'shipped']
         )
+        rollups = SalesRollupService.queryset(date, date, ['completed', 'shipped'])
+        
+        # Distinct customers cannot be summed from per-product rollup rows,
+        # and the rollups are not split by payment method, so those two
+        # figures read the day's orders through the (created_at, status) index.
         
-        total_sales = orders.count()
-        total_revenue = orders.aggregate(Sum('total_price'))['total_price__sum'] or Decimal('0')
+        totals = rollups.aggregate(count=Sum('order_count'), revenue=Sum('revenue'))
+        total_sales = totals['count'] or 0
+        total_revenue = totals['revenue'] or Decimal('0')
         unique_customers = orders.values('user').distinct().count()
         
         # Average order value
         avg_order_value = total_revenue / total_sales if total_sales > 0 else Decimal('0')
         
         # Top 5 products sold today
-        top_products = []
-        order_items = []
-        for order in orders:
-            if hasattr(order, 'items'):
-                order_items.extend(order.items.all())
-        
-        product_sales = {}
-        for item in order_items:
-            if item.product.id not in product_sales:
-                product_sales[item.product.id] = {
-                    'name': item.product.name,
-                    'quantity': 0,
-                    'revenue': Decimal('0')
-                }
-            product_sales[item.product.id]['quantity'] += item.quantity
-            product_sales[item.product.id]['revenue'] += item.price * item.quantity
-        
-        top_products = sorted(
-            product_sales.values(),
-            key=lambda x: x['revenue'],
-            reverse=True
-        )[:5]
+        top_products = [
+            {'name': row['product__name'], 'quantity': row['quantity'], 'revenue': float(row['revenue'])}
+            for row in rollups.values('product__name').annotate(
+                quantity=Sum('units'), revenue=Sum('revenue')
+            ).order_by('-revenue')[:5]
+        ]
         
         # Payment method breakdown
         payment_methods = {}
-        for order in orders:
-            method = order.payment_method if hasattr(order, 'payment_method') else 'Unknown'
-            if method not in payment_methods:
-                payment_methods[method] = {'count': 0, 'revenue': Decimal('0')}
-            payment_methods[method]['count'] += 1
-            payment_methods[method]['revenue'] += order.total_price
+        for row in orders.order_by().values('checkout__payment_method').annotate(
+            count=Count('id'), revenue=Sum('total_price')
+        ):
+            method = row['checkout__payment_method'] or 'Unknown'
+            payment_methods[method] = {'count': row['count'], 'revenue': row['revenue'] or Decimal('0')}
         
         return {
             'date': str(date),
@@ -76,25 +75,29 @@ class ReportService:
         }
     
     @staticmethod
+    @cached_report('order_status')
     def get_order_status_report(date_from=None, date_to=None):
         """Generate order status report"""
-        if date_from is None:
-            date_from = timezone.now().date() - timedelta(days=30)
-        if date_to is None:
-            date_to = timezone.now().date()
+        date_from, date_to = report_range(date_from, date_to)
         
-        start_date = timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
-        end_date = timezone.make_aware(datetime.combine(date_to, datetime.max.time()))
-        
-        orders = Order.objects.filter(created_at__gte=start_date, created_at__lte=end_date)
+        rollups = SalesRollupService.queryset(date_from, date_to, Order.StatusChoices.values)
         
-        total_orders = orders.count()
-        total_revenue = orders.aggregate(Sum('total_price'))['total_price__sum'] or Decimal('0')
+        # One GROUP BY pass; every other figure is derived from it
+        totals = {
+            row['status']: row
+            for row in rollups.order_by().values('status').annotate(
+                count=Sum('order_count'),
+                revenue=Sum('revenue'),
+            )
+        }
+        total_orders = sum(row['count'] for row in totals.values())
+        total_revenue = sum((row['revenue'] or Decimal('0') for row in totals.values()), Decimal('0'))
         
         status_breakdown = {}
-        for status in ['pending', 'processing', 'shipped', 'delivered', 'cancelled']:
-            count = orders.filter(status=status).count()
-            revenue = orders.filter(status=status).aggregate(Sum('total_price'))['total_price__sum'] or Decimal('0')
+        for status in Order.StatusChoices.values:
+            row = totals.get(status, {})
+            count = row.get('count', 0)
+            revenue = row.get('revenue') or Decimal('0')
             percentage = (count / total_orders * 100) if total_orders > 0 else 0
             status_breakdown[status] = {
                 'count': count,
@@ -102,9 +105,8 @@ class ReportService:
                 'percentage': percentage
             }
         
-        # Calculate average time in each status (simplified)
-        pending_orders = orders.filter(status='pending').count()
-        cancelled_orders = orders.filter(status='cancelled').count()
+        pending_orders = status_breakdown['pending']['count']
+        cancelled_orders = status_breakdown['cancelled']['count']
         
         return {
             'date_from': str(date_from),
@@ -118,32 +120,26 @@ class ReportService:
         }
     
     @staticmethod
+    @cached_report('product_sales')
     def get_product_sales_report(date_from=None, date_to=None):
         """Generate product sales report"""
-        if date_from is None:
-            date_from = timezone.now().date() - timedelta(days=30)
-        if date_to is None:
-            date_to = timezone.now().date()
+        date_from, date_to = report_range(date_from, date_to)
         
-        start_date = timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
-        end_date = timezone.make_aware(datetime.combine(date_to, datetime.max.time()))
-        
-        orders = Order.objects.filter(created_at__gte=start_date, created_at__lte=end_date)
+        rollups = SalesRollupService.queryset(date_from, date_to, Order.StatusChoices.values)
         
         product_sales = {}
-        for order in orders:
-            if hasattr(order, 'items'):
-                for item in order.items.all():
-                    if item.product.id not in product_sales:
-                        product_sales[item.product.id] = {
-                            'name': item.product.name,
-                            'category': item.product.category.name if item.product.category else 'Uncategorized',
-                            'units_sold': 0,
-                            'revenue': Decimal('0'),
-                            'average_price': Decimal('0'),
-                        }
-                    product_sales[item.product.id]['units_sold'] += item.quantity
-                    product_sales[item.product.id]['revenue'] += item.price * item.quantity
+        for row in rollups.values('product_id', 'product__name', 'category__name').annotate(
+            units_sold=Sum('units'), revenue=Sum('revenue')
+        ):
+            data = product_sales.setdefault(row['product_id'], {
+                'name': row['product__name'],
+                'category': row['category__name'] or 'Uncategorized',
+                'units_sold': 0,
+                'revenue': Decimal('0'),
+                'average_price': 0.0,
+            })
+            data['units_sold'] += row['units_sold'] or 0
+            data['revenue'] += row['revenue'] or Decimal('0')
         
         # Calculate average price
         for product_id, data in product_sales.items():
@@ -168,6 +164,7 @@ class ReportService:
         }
     
     @staticmethod
+    @cached_report('stock_level', ttl=300)
     def get_stock_level_report():
         """Generate stock level report"""
         products = Product.objects.filter(status='active')
@@ -206,21 +203,23 @@ class ReportService:
         }
     
     @staticmethod
+    @cached_report('customer_growth')
     def get_customer_growth_report(date_from=None, date_to=None):
         """Generate customer growth report"""
-        if date_from is None:
-            date_from = timezone.now().date() - timedelta(days=30)
-        if date_to is None:
-            date_to = timezone.now().date()
+        date_from, date_to = report_range(date_from, date_to)
         
         start_date = timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
         end_date = timezone.make_aware(datetime.combine(date_to, datetime.max.time()))
         
-        # New customers in period
-        new_customers = User.objects.filter(
-            date_joined__gte=start_date,
-            date_joined__lte=end_date
-        ).count()
+        # New customers per day, in one GROUP BY
+        joined_per_day = dict(
+            User.objects.filter(date_joined__gte=start_date, date_joined__lte=end_date)
+            .annotate(day=TruncDate('date_joined'))
+            .values('day')
+            .annotate(count=Count('id'))
+            .values_list('day', 'count')
+        )
+        new_customers = sum(joined_per_day.values())
         
         # Total active customers
         total_customers = User.objects.filter(is_active=True).count()
@@ -231,34 +230,25 @@ class ReportService:
             created_at__lte=end_date
         ).values('user').distinct().count()
         
-        # Repeat customers (made more than 1 purchase)
-        repeat_customers = 0
-        customer_order_counts = Order.objects.values('user').annotate(order_count=Count('id'))
-        for customer_data in customer_order_counts:
-            if customer_data['order_count'] > 1:
-                repeat_customers += 1
+        # Repeat customers (made more than 1 purchase), counted over a HAVING subquery
+        repeat_customers = Order.objects.values('user').annotate(
+            order_count=Count('id')
+        ).filter(order_count__gt=1).count()
         
         # Average customer lifetime value
-        total_revenue = Order.objects.aggregate(Sum('total_price'))['total_price__sum'] or Decimal('0')
+        total_revenue = SalesRollupService.queryset(
+            statuses=Order.StatusChoices.values
+        ).aggregate(Sum('revenue'))['revenue__sum'] or Decimal('0')
         avg_ltv = total_revenue / total_customers if total_customers > 0 else Decimal('0')
         
-        # Daily customer growth
+        # Daily customer growth, with zero-filled days
         daily_growth = []
         current_date = date_from
         while current_date <= date_to:
-            day_start = timezone.make_aware(datetime.combine(current_date, datetime.min.time()))
-            day_end = timezone.make_aware(datetime.combine(current_date, datetime.max.time()))
-            
-            day_new_customers = User.objects.filter(
-                date_joined__gte=day_start,
-                date_joined__lte=day_end
-            ).count()
-            
             daily_growth.append({
                 'date': str(current_date),
-                'new_customers': day_new_customers,
+                'new_customers': joined_per_day.get(current_date, 0),
             })
-            
             current_date += timedelta(days=1)
         
         return {
@@ -1,3 +1,263 @@
+"""
+Reports App Tests
+
+Tests for report generation.
+Run with: python manage.py test reports
+"""
+
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
 from django.test import TestCase
+from django.utils import timezone
+
+from home.models import Order, Product
+from reports import cache as report_cache
+from reports import scheduler
+from reports.models import ReportCache, ReportSchedule
+from reports.services import ReportService
+
+
+class CustomerGrowthReportTests(TestCase):
+    """Tests for the set-based customer growth report."""
+
+    def setUp(self):
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass123')
+        self.product = Product.objects.create(
+            name='Test Dress', price=Decimal('100.00'), seller=seller, stock=10,
+            status='active', approval_status='approved',
+        )
+
+    def test_query_count_does_not_depend_on_range(self):
+        today = timezone.localdate()
+        with self.assertNumQueries(5):
+            report = ReportService.get_customer_growth_report.uncached(today - timedelta(days=364), today)
+        self.assertEqual(len(report['daily_growth']), 365)
+
+    def test_counts(self):
+        Order.objects.create(user=self.buyer, product=self.product, quantity=1)
+        Order.objects.create(user=self.buyer, product=self.product, quantity=1)
+        today = timezone.localdate()
+        report = ReportService.get_customer_growth_report(today - timedelta(days=1), today)
+
+        self.assertEqual(report['new_customers'], 2)
+        self.assertEqual(report['daily_growth'][-1], {'date': str(today), 'new_customers': 2})
+        self.assertEqual(report['daily_growth'][0]['new_customers'], 0)
+        self.assertEqual(report['customers_with_orders'], 1)
+        self.assertEqual(report['repeat_customers'], 1)
+
+
+class OrderStatusReportTests(TestCase):
+    """Tests for the single-pass order status report."""
+
+    def setUp(self):
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        buyer = User.objects.create_user(username='buyer', password='testpass123')
+        product = Product.objects.create(
+            name='Test Dress', price=Decimal('100.00'), seller=seller, stock=10,
+            status='active', approval_status='approved',
+        )
+        for status in ('pending', 'pending', 'delivered', 'cancelled'):
+            Order.objects.create(user=buyer, product=product, quantity=1, status=status)
+
+    def test_report_is_one_query(self):
+        today = timezone.localdate()
+        with self.assertNumQueries(1):
+            report = ReportService.get_order_status_report.uncached(today, today)
+
+        self.assertEqual(report['total_orders'], 4)
+        self.assertEqual(report['total_revenue'], 400.0)
+        self.assertEqual(report['pending_orders'], 2)
+        self.assertEqual(report['cancelled_orders'], 1)
+        self.assertEqual(report['cancellation_rate'], 25.0)
+        self.assertEqual(report['status_breakdown']['pending'], {'count': 2, 'revenue': 200.0, 'percentage': 50.0})
+        self.assertEqual(report['status_breakdown']['shipped']['count'], 0)
+
+
+class ReportCacheTests(TestCase):
+    """Tests for the read-through report cache."""
+
+    def setUp(self):
+        seller = User.objects.create_user(username='seller', password='testpass123')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass123')
+        self.product = Product.objects.create(
+            name='Test Dress', price=Decimal('100.00'), seller=seller, stock=10,
+            status='active', approval_status='approved',
+        )
+        Order.objects.create(user=self.buyer, product=self.product, quantity=1)
+        self.today = timezone.localdate()
+        report_cache.reset_stats()
+        self.addCleanup(report_cache.reset_stats)
+
+    def lock_key(self, report_type, date_from, date_to):
+        return report_cache._lock_key(report_type, date_from, date_to, '')
+
+    def test_repeated_report_is_one_lookup(self):
+        report = ReportService.get_order_status_report(self.today, self.today)
+        self.assertEqual(ReportCache.objects.get().report_type, 'order_status')
+
+        with self.assertNumQueries(1):
+            cached = ReportService.get_order_status_report(self.today, self.today)
+        self.assertEqual(cached, report)
+
+        stats = report_cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+    def test_default_range_shares_row_with_explicit_range(self):
+        date_from, date_to = report_cache.report_range()
+        ReportService.get_product_sales_report()
+        ReportService.get_product_sales_report(date_from, date_to)
+        self.assertEqual(ReportCache.objects.count(), 1)
+        self.assertEqual(report_cache.get_stats()['hits'], 1)
+
+    def test_expired_row_is_recomputed(self):
+        ReportService.get_order_status_report(self.today, self.today)
+        ReportCache.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        Order.objects.create(user=self.buyer, product=self.product, quantity=1)
+
+        report = ReportService.get_order_status_report(self.today, self.today)
+
+        self.assertEqual(report['total_orders'], 2)
+        entry = ReportCache.objects.get()
+        self.assertFalse(entry.is_expired())
+        self.assertEqual(entry.data['total_orders'], 2)
+
+    def test_expired_row_served_while_another_caller_recomputes(self):
+        ReportService.get_order_status_report(self.today, self.today)
+        ReportCache.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        Order.objects.create(user=self.buyer, product=self.product, quantity=1)
+        lock = self.lock_key('order_status', self.today, self.today)
+        cache.add(lock, 1, 60)
+        self.addCleanup(cache.delete, lock)
+
+        report = ReportService.get_order_status_report(self.today, self.today)
+
+        self.assertEqual(report['total_orders'], 1)
+        self.assertEqual(report_cache.get_stats()['stale'], 1)
+
+    def test_cold_key_computes_after_a_short_wait(self):
+        lock = self.lock_key('order_status', self.today, self.today)
+        cache.add(lock, 1, 60)
+        self.addCleanup(cache.delete, lock)
+
+        started = time.monotonic()
+        report = ReportService.get_order_status_report(self.today, self.today)
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(report['total_orders'], 1)
+        self.assertEqual(report_cache.get_stats()['misses'], 1)
+
+    def test_params_are_part_of_the_key(self):
+        calls = []
+
+        @report_cache.cached_report('stock_level')
+        def report(limit=10):
+            calls.append(limit)
+            return {'limit': limit}
+
+        self.assertEqual(report(limit=5), {'limit': 5})
+        self.assertEqual(report(limit=20), {'limit': 20})
+        self.assertEqual(report(5), {'limit': 5})
+        self.assertEqual(calls, [5, 20])
+        self.assertEqual(ReportCache.objects.count(), 2)
+
+    def test_sweep_evicts_expired_rows(self):
+        ReportService.get_order_status_report(self.today, self.today)
+        ReportService.get_stock_level_report()
+        ReportCache.objects.filter(report_type='stock_level').update(
+            expires_at=timezone.now() - timedelta(hours=2)
+        )
+
+        self.assertEqual(report_cache.sweep(timedelta(hours=1)), 1)
+        self.assertEqual(list(ReportCache.objects.values_list('report_type', flat=True)), ['order_status'])
+
+
+class ReportSchedulerTests(TestCase):
+    """Tests for the scheduled report runner."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='testpass123')
+        self.now = timezone.now()
+
+    def schedule(self, **kwargs):
+        fields = {
+            'report_type': 'order_status',
+            'frequency': 'weekly',
+            'email_recipients': 'owner@example.com, ',
+            'created_by': self.admin,
+            'next_send': self.now - timedelta(minutes=5),
+        }
+        fields.update(kwargs)
+        return ReportSchedule.objects.create(**fields)
+
+    def test_periods(self):
+        self.assertEqual(scheduler.schedule_period('daily', date(2026, 3, 1)), (date(2026, 2, 28), date(2026, 2, 28)))
+        self.assertEqual(scheduler.schedule_period('weekly', date(2026, 3, 8)), (date(2026, 3, 1), date(2026, 3, 7)))
+        self.assertEqual(scheduler.schedule_period('monthly', date(2026, 3, 15)), (date(2026, 2, 1), date(2026, 2, 28)))
+
+    def test_advance_clamps_month_end(self):
+        when = timezone.make_aware(datetime(2026, 1, 31, 6, 0))
+        self.assertEqual(scheduler.advance('monthly', when).date(), date(2026, 2, 28))
+        self.assertEqual(scheduler.advance('weekly', when).date(), date(2026, 2, 7))
+
+    def test_monthly_sends_return_to_anchor_day(self):
+        when = datetime(2026, 1, 31, 6, 0, tzinfo=dt_timezone.utc)
+        february = scheduler.advance('monthly', when, send_day=31)
+        self.assertEqual(february.date(), date(2026, 2, 28))
+        self.assertEqual(scheduler.advance('monthly', february, send_day=31).date(), date(2026, 3, 31))
+
+        schedule = self.schedule(frequency='monthly', next_send=when)
+        self.assertEqual(schedule.send_day, 31)
+
+    def test_missed_periods_send_once(self):
+        schedule = self.schedule(frequency='daily', next_send=self.now - timedelta(days=3, minutes=5))
+
+        metrics = scheduler.run_due_schedules(self.now)
+
+        self.assertEqual(metrics['sent'], 1)
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_send, self.now - timedelta(minutes=5) + timedelta(days=1))
+        self.assertEqual(schedule.last_sent, self.now)
+
+    def test_shared_period_renders_once_over_one_connection(self):
+        first = self.schedule()
+        second = self.schedule(email_recipients='finance@example.com')
+
+        with mock.patch('reports.scheduler.get_connection', wraps=get_connection) as connect:
+            metrics = scheduler.run_due_schedules(self.now)
+
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(metrics, {'sent': 2, 'failed': 0, 'skipped': 0, 'rendered': 1})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertEqual(
+            [mimetype for name, content, mimetype in mail.outbox[0].attachments],
+            ['text/csv', 'application/pdf'],
+        )
+        self.assertTrue(ReportCache.objects.filter(report_type='order_status').exists())
+        for schedule in (first, second):
+            schedule.refresh_from_db()
+            self.assertGreater(schedule.next_send, self.now)
+
+        self.assertEqual(scheduler.run_due_schedules(self.now)['sent'], 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_send_is_retried(self):
+        schedule = self.schedule()
+        due_at = schedule.next_send
+        connection = get_connection()
+
+        with mock.patch.object(connection, 'send_messages', side_effect=OSError('refused')):
+            metrics = scheduler.run_due_schedules(self.now, connection=connection)
 
-# Create your tests here.
+        self.assertEqual(metrics['failed'], 1)
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_send, due_at)
+        self.assertIsNone(schedule.last_sent)
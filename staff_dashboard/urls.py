@@ -11,6 +11,7 @@ urlpatterns = [
     path('orders/', views.staff_orders_list, name='orders_list'),
     path('orders/<int:order_id>/', views.staff_order_detail, name='order_detail'),
     path('orders/<int:order_id>/update-status/', views.staff_order_update_status, name='order_update_status'),
+    path('orders/receipts/export/', views.staff_receipt_export, name='receipt_export'),
     
     # Product management
     path('products/', views.staff_products_list, name='products_list'),
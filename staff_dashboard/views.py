@@ -1,11 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
+from django.http import FileResponse
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Sum, Count, Q
-from datetime import datetime, timedelta
-from decimal import Decimal
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
 
 from home.models import Order, Product
+from home.services import SalesRollupService
+from home.receipt_export import archive_filename, archive_path, export_queryset
 from staff_dashboard.models import StaffApproval, CustomerInquiry, StaffAuditLog
 from staff_dashboard.services import StaffApprovalService, AuditLogService
 
@@ -22,27 +27,25 @@ def staff_dashboard_home(request):
     cached_stats = cache.get(cache_key)
     
     if cached_stats is None:
-        # Get current date and time
-        today = timezone.now().date()
-        start_of_day = timezone.make_aware(datetime.combine(today, datetime.min.time()))
-        end_of_day = timezone.make_aware(datetime.combine(today, datetime.max.time()))
+        # Get current date and month
+        today = timezone.localdate()
+        start_of_month = today.replace(day=1)
         
-        # Get current month
-        start_of_month = timezone.make_aware(
-            datetime(today.year, today.month, 1, 0, 0, 0)
+        # Calculate statistics from the daily sales rollups in one query
+        stats = SalesRollupService.queryset(statuses=Order.StatusChoices.values).aggregate(
+            # Total orders count for current day
+            total_orders_today=Sum('order_count', filter=Q(date=today)),
+            # Pending orders count
+            pending_orders_count=Sum('order_count', filter=Q(status='pending')),
+            # Total revenue for current month
+            total_revenue=Sum(
+                'revenue',
+                filter=Q(date__gte=start_of_month, status__in=['delivered', 'shipped', 'processing'])
+            ),
         )
-        
-        # Calculate statistics
-        # Total orders count for current day
-        total_orders_today = Order.objects.filter(
-            created_at__gte=start_of_day,
-            created_at__lte=end_of_day
-        ).count()
-        
-        # Pending orders count
-        pending_orders_count = Order.objects.filter(
-            status='pending'
-        ).count()
+        total_orders_today = stats['total_orders_today'] or 0
+        pending_orders_count = stats['pending_orders_count'] or 0
+        total_revenue = stats['total_revenue'] or Decimal('0.00')
         
         # Low stock products count (stock <= 5)
         low_stock_count = Product.objects.filter(
@@ -51,15 +54,6 @@ def staff_dashboard_home(request):
             status='active'
         ).count()
         
-        # Total revenue for current month
-        revenue_data = Order.objects.filter(
-            created_at__gte=start_of_month,
-            status__in=['delivered', 'shipped', 'processing']
-        ).aggregate(
-            total=Sum('total_price')
-        )
-        total_revenue = revenue_data['total'] or Decimal('0.00')
-        
         cached_stats = {
             'total_orders_today': total_orders_today,
             'pending_orders_count': pending_orders_count,
@@ -201,6 +195,55 @@ def staff_order_update_status(request, order_id):
     return redirect('staff_dashboard:order_detail', order_id=order_id)
 
 
+@login_required
+def staff_receipt_export(request):
+    """
+    Download the receipt archive of a date range.
+
+    Archives are built off the request path by
+    ``manage.py export_receipts --store``; this view only serves them.
+    """
+    from django.core.files.storage import default_storage
+
+    start = request.GET.get('start', '')
+    end = request.GET.get('end', '')
+    context = {'start': start, 'end': end}
+
+    if start and end:
+        try:
+            start_date = date.fromisoformat(start)
+            end_date = date.fromisoformat(end)
+        except ValueError:
+            messages.error(request, 'Please enter valid dates.')
+            return render(request, 'staff/receipt_export.html', context)
+
+        if start_date > end_date:
+            messages.error(request, 'The start date must not be after the end date.')
+            return render(request, 'staff/receipt_export.html', context)
+
+        path = archive_path(start_date, end_date)
+        if default_storage.exists(path):
+            return FileResponse(
+                default_storage.open(path, 'rb'),
+                as_attachment=True,
+                filename=archive_filename(start_date, end_date),
+                content_type='application/zip',
+            )
+
+        if not export_queryset(start_date, end_date).exists():
+            messages.info(request, 'No completed checkouts in that range.')
+        else:
+            messages.info(
+                request,
+                'That export has not been built yet. Run '
+                f'"python manage.py export_receipts --start {start_date} --end {end_date} --store" '
+                'on the server, then download it here.'
+            )
+        return render(request, 'staff/receipt_export.html', context)
+
+    return render(request, 'staff/receipt_export.html', context)
+
+
 @login_required
 def staff_products_list(request):
     """List all products with filtering and pagination."""
@@ -297,53 +340,60 @@ def staff_product_update(request, product_id):
         status = request.POST.get('status')
         price = request.POST.get('price')
         
-        changes = {}
-        
-        # Validate and update stock
+        # Validate every field before anything is written
+        new_stock = None
         if stock is not None and stock != '':
             try:
                 new_stock = int(stock)
-                if new_stock < 0:
-                    messages.error(request, 'Stock quantity cannot be negative')
-                    return redirect('staff_dashboard:product_detail', product_id=product_id)
-                
-                if new_stock != product.stock:
-                    old_stock = product.stock
-                    product.stock = new_stock
-                    changes['stock'] = {'old': old_stock, 'new': new_stock}
-                    
-                    # Record in stock history
-                    from home.models import StockHistory
-                    StockHistory.record_change(
-                        product=product,
-                        change_type='adjustment',
-                        quantity_change=new_stock - old_stock,
-                        reason='Staff adjustment',
-                        changed_by=request.user
-                    )
             except ValueError:
                 messages.error(request, 'Invalid stock quantity')
                 return redirect('staff_dashboard:product_detail', product_id=product_id)
-        
-        # Update status
-        if status and status != product.status:
-            changes['status'] = {'old': product.status, 'new': status}
-            product.status = status
-        
-        # Update price
+            if new_stock < 0:
+                messages.error(request, 'Stock quantity cannot be negative')
+                return redirect('staff_dashboard:product_detail', product_id=product_id)
+
+        if status and status not in dict(Product.STATUS_CHOICES):
+            messages.error(request, 'Invalid status')
+            return redirect('staff_dashboard:product_detail', product_id=product_id)
+
+        new_price = None
         if price:
             try:
                 new_price = Decimal(price)
-                if new_price != product.price:
-                    changes['price'] = {'old': str(product.price), 'new': str(new_price)}
-                    product.price = new_price
-            except:
+            except InvalidOperation:
+                new_price = None
+            if new_price is None or not new_price.is_finite():
                 messages.error(request, 'Invalid price')
                 return redirect('staff_dashboard:product_detail', product_id=product_id)
-        
-        # Save product
+
+        changes = {}
+        if new_stock is not None and new_stock != product.stock:
+            changes['stock'] = {'old': product.stock, 'new': new_stock}
+        if status and status != product.status:
+            changes['status'] = {'old': product.status, 'new': status}
+            product.status = status
+        if new_price is not None and new_price != product.price:
+            changes['price'] = {'old': str(product.price), 'new': str(new_price)}
+            product.price = new_price
+
         if changes:
-            product.save()
+            from home.services import StockService
+            with transaction.atomic():
+                # Apply stock as a delta through the stock engine so sales made
+                # since the form was loaded are not overwritten.
+                if 'stock' in changes and not StockService.adjust(
+                    product,
+                    changes['stock']['new'] - changes['stock']['old'],
+                    reason='Staff adjustment',
+                    changed_by=request.user
+                ):
+                    messages.error(request, 'Stock changed while you were editing. Please try again.')
+                    return redirect('staff_dashboard:product_detail', product_id=product_id)
+
+                # Stock has already been written by the stock engine
+                update_fields = [field for field in changes if field != 'stock']
+                if update_fields:
+                    product.save(update_fields=update_fields + ['updated_at'])
             
             # Log the action
             AuditLogService.log_action(